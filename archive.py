@@ -0,0 +1,163 @@
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from flag_bits import FLAGS_DTYPE
+from rollups import DIMENSIONS, MEASURES, RollupCube
+
+# Columns kept per archived attendance row; flags stay packed as in the cache
+COLUMNS = ["id", "child_id", "session_date", "flags", "version"]
+
+# Rows per Parquet row group; rows are sorted by date, so a date range reads only the groups it overlaps
+ROW_GROUP_SIZE = 50000
+
+PARTITION = re.compile(r"^year=(\d{4})$")
+
+
+def year_bounds(year):
+    """First day of the year and of the next, as ISO date strings"""
+    return f"{int(year):04d}-01-01", f"{int(year) + 1:04d}-01-01"
+
+
+def summarize(children_rows, rows):
+    """Rollup cube cells (dimensions and measures) over attendance rows kept packed, as archived"""
+    cube = RollupCube()
+    cube.rebuild(children_rows, pd.DataFrame(rows, columns=COLUMNS).to_dict("records"))
+    summary = cube.slice(DIMENSIONS)
+    for dim in DIMENSIONS:
+        # Parquet columns hold one type; a dimension mixing them (e.g. grades 3 and "3A") is kept as text
+        if len({type(value) for value in summary[dim].dropna()}) > 1:
+            summary[dim] = summary[dim].map(lambda value: value if pd.isna(value) else str(value))
+    return summary
+
+
+class AttendanceArchive:
+    """Closed years of attendance as immutable, date-partitioned Parquet files
+
+    Each year is one directory, year=YYYY, holding the rows (rows.parquet),
+    the rollup cube cells over them (summary.parquet) and a small meta.json.
+    A partition is written once, to a temporary directory that is renamed
+    into place, and never changed. Reads open only the partitions that
+    overlap the requested dates.
+    """
+
+    def __init__(self, root="archive"):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def years(self):
+        """Archived years, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        found = (PARTITION.match(name) for name in os.listdir(self.root))
+        return sorted(int(match.group(1)) for match in found if match)
+
+    def _path(self, year, name=""):
+        return os.path.join(self.root, f"year={int(year):04d}", name)
+
+    def covers(self, start, end=None):
+        """Whether every date from start up to (not including) end is in an archived year"""
+        start = pd.Timestamp(start)
+        last = pd.Timestamp(end) - pd.Timedelta(days=1) if end is not None else start
+        years = set(self.years())
+        return all(year in years for year in range(start.year, last.year + 1))
+
+    def overlapping(self, start=None, end=None):
+        """Archived years with dates in [start, end); None leaves that side open"""
+        first = pd.Timestamp(start).year if start is not None else None
+        last = (pd.Timestamp(end) - pd.Timedelta(days=1)).year if end is not None else None
+        return [
+            year for year in self.years()
+            if (first is None or year >= first) and (last is None or year <= last)
+        ]
+
+    def write(self, year, rows, children_rows):
+        """Write one closed year's attendance rows (packed, as cached) and their summary
+
+        Raises ValueError if the year is already archived or a row falls
+        outside it. Returns the partition's metadata.
+        """
+        start, end = year_bounds(year)
+        frame = pd.DataFrame(rows, columns=COLUMNS)
+        if not frame.empty and not frame["session_date"].astype(str).between(start, end, inclusive="left").all():
+            raise ValueError(f"Rows outside {year} given for its partition")
+        frame = frame.astype({"id": "int64", "child_id": "int64", "session_date": str,
+                              "flags": FLAGS_DTYPE, "version": "int32"})
+        frame = frame.sort_values(["session_date", "child_id"], ignore_index=True)
+
+        summary = summarize(children_rows, frame)
+        meta = {
+            "year": int(year),
+            "rows": len(frame),
+            "children": int(frame["child_id"].nunique()),
+            "first_date": frame["session_date"].min() if len(frame) else None,
+            "last_date": frame["session_date"].max() if len(frame) else None,
+            "sessions": int(frame["session_date"].nunique()),
+            "archived_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        with self._lock:
+            final = self._path(year)
+            if os.path.exists(final):
+                raise ValueError(f"{year} is already archived in {final}")
+            staging = final.rstrip(os.sep) + ".tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            frame.to_parquet(os.path.join(staging, "rows.parquet"), index=False, row_group_size=ROW_GROUP_SIZE)
+            summary.to_parquet(os.path.join(staging, "summary.parquet"), index=False)
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2)
+            os.rename(staging, final)
+        return meta
+
+    def discard(self, year):
+        """Remove a partition that failed verification right after it was written"""
+        with self._lock:
+            shutil.rmtree(self._path(year), ignore_errors=True)
+
+    def read(self, start=None, end=None, child_ids=None):
+        """Archived rows with dates in [start, end), optionally for some children only
+
+        Only overlapping partitions are opened, and within them only the row
+        groups whose date statistics overlap the range are read.
+        """
+        filters = []
+        if start is not None:
+            filters.append(("session_date", ">=", pd.Timestamp(start).strftime("%Y-%m-%d")))
+        if end is not None:
+            filters.append(("session_date", "<", pd.Timestamp(end).strftime("%Y-%m-%d")))
+        if child_ids is not None:
+            filters.append(("child_id", "in", [int(child_id) for child_id in child_ids]))
+        frames = [
+            pd.read_parquet(self._path(year, "rows.parquet"), filters=filters or None)
+            for year in self.overlapping(start, end)
+        ]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def ids(self, year):
+        """Ids of one archived year's rows, read from the id column alone"""
+        return pd.read_parquet(self._path(year, "rows.parquet"), columns=["id"])["id"]
+
+    def summary(self, years=None):
+        """Rollup cells (dimensions and measures) of the archived years, from their precomputed summaries"""
+        years = self.years() if years is None else years
+        frames = [pd.read_parquet(self._path(year, "summary.parquet")) for year in years]
+        if not frames:
+            return pd.DataFrame(columns=DIMENSIONS + MEASURES)
+        return pd.concat(frames, ignore_index=True)
+
+    def meta(self):
+        """Metadata of every partition, oldest first"""
+        result = []
+        for year in self.years():
+            with open(self._path(year, "meta.json")) as f:
+                result.append(json.load(f))
+        return result
@@ -1,54 +1,96 @@
-import streamlit as st
-from database import get_supabase_client
+from datastore import get_supabase_client, clear_cache
+from errors import DataError
 import pandas as pd
 from datetime import datetime
 import os
 
-def backup_data():
-    """Backup data from Supabase to local CSV files"""
+# Tables written to backups and read back by restore_data, in restore order
+BACKUP_TABLES = ["children", "attendance", "sessions"]
+
+# Rows sent per upsert request when restoring
+RESTORE_CHUNK = 500
+
+# Columns the database computes, left out of restored rows (migrations/add_attendance_flags.sql)
+GENERATED_COLUMNS = {"attendance": ["flags"]}
+
+def backup_data(backup_dir="backups"):
+    """Backup data from Supabase to local CSV files
+
+    Returns the paths written, by table.
+    """
     print("Starting backup...")
-    
+
     # Create backups directory if it doesn't exist
-    backup_dir = "backups"
     if not os.path.exists(backup_dir):
         os.makedirs(backup_dir)
-    
+
     # Generate timestamp for backup files
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
+    written = {}
+
     try:
         # Get Supabase client
         supabase = get_supabase_client()
-        if not supabase:
-            print("Error: Could not connect to Supabase")
-            return
-        
-        # Backup children data
-        print("Backing up children data...")
-        children_response = supabase.table('children').select("*").execute()
-        if children_response.data:
-            children_df = pd.DataFrame(children_response.data)
-            children_file = os.path.join(backup_dir, f"children_backup_{timestamp}.csv")
-            children_df.to_csv(children_file, index=False)
-            print(f"✓ Children data backed up to {children_file}")
-        else:
-            print("No children data to backup")
-        
-        # Backup attendance data
-        print("\nBacking up attendance data...")
-        attendance_response = supabase.table('attendance').select("*").execute()
-        if attendance_response.data:
-            attendance_df = pd.DataFrame(attendance_response.data)
-            attendance_file = os.path.join(backup_dir, f"attendance_backup_{timestamp}.csv")
-            attendance_df.to_csv(attendance_file, index=False)
-            print(f"✓ Attendance data backed up to {attendance_file}")
+    except DataError as e:
+        print(str(e))
+        raise
+
+    for table in BACKUP_TABLES:
+        print(f"Backing up {table} data...")
+        try:
+            response = supabase.table(table).select("*").execute()
+        except Exception as e:
+            if table == "sessions":
+                # Calendar table not migrated yet
+                print(f"Skipped {table}: {str(e)}")
+                continue
+            raise DataError(f"backing up {table}", e) from e
+        if response.data:
+            backup_file = os.path.join(backup_dir, f"{table}_backup_{timestamp}.csv")
+            pd.DataFrame(response.data).to_csv(backup_file, index=False)
+            written[table] = backup_file
+            print(f"✓ {table.capitalize()} data backed up to {backup_file}")
         else:
-            print("No attendance data to backup")
-        
-        print("\nBackup completed successfully!")
-        
-    except Exception as e:
-        print(f"Error during backup: {str(e)}")
+            print(f"No {table} data to backup")
+
+    print("\nBackup completed successfully!")
+    return written
+
+def _csv_value(value):
+    # Cells are read as text so contacts keep their leading zeros; flags go back to booleans
+    if value == "":
+        return None
+    return {"True": True, "False": False}.get(value, value)
+
+def _csv_records(path, skip=()):
+    """Rows of a backup CSV as dicts, with empty cells as None"""
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df = df.drop(columns=[col for col in skip if col in df.columns])
+    return [{key: _csv_value(value) for key, value in row.items()} for row in df.to_dict("records")]
+
+def restore_data(files):
+    """Upsert rows from backup CSVs, given as {table: path}, keeping their ids
+
+    Existing rows with the same id are overwritten; other rows are left alone.
+    Returns the number of rows restored per table.
+    """
+    supabase = get_supabase_client()
+    restored = {}
+    for table in BACKUP_TABLES:
+        path = files.get(table)
+        if not path:
+            continue
+        records = _csv_records(path, GENERATED_COLUMNS.get(table, ()))
+        print(f"Restoring {len(records)} {table} rows from {path}...")
+        try:
+            for start in range(0, len(records), RESTORE_CHUNK):
+                supabase.table(table).upsert(records[start:start + RESTORE_CHUNK]).execute()
+        except Exception as e:
+            raise DataError(f"restoring {table}", e) from e
+        restored[table] = len(records)
+        print(f"✓ Restored {len(records)} {table} rows")
+    clear_cache(*restored, resync=True)
+    return restored
 
 if __name__ == "__main__":
-    backup_data() 
\ No newline at end of file
+    backup_data()
@@ -0,0 +1,297 @@
+"""Load test: concurrent simulated teachers driving app.py headlessly
+
+Each simulated session is a Streamlit AppTest in its own thread: it logs in,
+then keeps switching pages, marking attendance for a few children of one
+class and opening the Sunday and Monthly reports. Sessions share one
+process, so they share the table cache and report cache the way sessions
+of one Streamlit server do. The number of sessions is stepped up level by
+level; each level records per-action latency percentiles, the process CPU
+and memory, and throughput, and the run reports where throughput stops
+growing.
+
+    python -m benchmarks.load --children 1000 --sessions 1 2 4 8 16 --duration 60
+
+CPU and memory include the AppTest machinery itself (it parses every
+rendered element), so they are an upper bound for a real server.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Allow `python benchmarks/load.py` as well as `python -m benchmarks.load`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from urllib import parse
+
+from benchmarks.run import git_revision
+from benchmarks.synthetic import generate_children, generate_attendance, load_into
+from local_backend import LocalClient
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Password of the shared teacher login in app.py
+DEFAULT_PASSWORD = "Sundayschool2025"
+
+
+def concurrent_app_test():
+    """AppTest class whose runs can overlap in one process
+
+    AppTest installs a mock Streamlit runtime before each run and removes it
+    after, so a second session running meanwhile loses it. This subclass
+    installs one shared mock instead and leaves it in place. It relies on
+    AppTest internals of the pinned Streamlit release (1.31).
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import AppTest
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    class ConcurrentAppTest(AppTest):
+        def _run(self, widget_state=None, timeout=None):
+            Runtime._instance = runtime
+            runner = LocalScriptRunner(self._script_path, self.session_state)
+            self._tree = runner.run(widget_state, self.query_params, timeout or self.default_timeout)
+            self._tree._runner = self
+            self.query_params = parse.parse_qs(runner.event_data[-1]["client_state"].query_string)
+            return self
+
+    return ConcurrentAppTest
+
+
+class Teacher:
+    """One simulated session; every action is timed into samples as (action, ms, error)"""
+
+    def __init__(self, app_test, password, rng, samples, timeout=120):
+        self.at = app_test(APP_PATH, default_timeout=timeout)
+        self.password = password
+        self.rng = rng
+        self.samples = samples
+
+    def _timed(self, action, func):
+        """Run and time one action; returns whether it succeeded"""
+        start = time.perf_counter()
+        error = None
+        try:
+            func()
+        except Exception as e:
+            error = repr(e)
+        if self.at.exception:
+            error = self.at.exception[0].value
+        self.samples.append((action, (time.perf_counter() - start) * 1000, error))
+        return error is None
+
+    def _widget(self, kind, label):
+        return next(widget for widget in getattr(self.at, kind) if widget.label == label)
+
+    def login(self):
+        def run():
+            self.at.run()
+            self.at.text_input[0].input(self.password).run()
+        return self._timed("login", run)
+
+    def open_page(self, page):
+        return self._timed(f"page:{page}", lambda: self.at.sidebar.selectbox[0].select(page).run())
+
+    def mark_attendance(self, marks=5):
+        """Mark a few children of one class present, as a teacher does during the service"""
+        def run():
+            class_box = self._widget("selectbox", "Filter by Class Group")
+            classes = [option for option in class_box.options if option != "All Classes"]
+            class_box.select(self.rng.choice(classes)).run()
+            boxes = [box for box in self.at.checkbox if box.key and box.key.startswith("present_")]
+            for box in self.rng.sample(boxes, min(marks, len(boxes))):
+                box.check()
+            self._widget("button", "Save Attendance").click().run()
+        return self.open_page("🗓️ Attendance") and self._timed("mark_attendance", run)
+
+    def open_report(self, report_type):
+        return self._timed(
+            f"report:{report_type}", lambda: self._widget("selectbox", "Select Report Type").select(report_type).run()
+        )
+
+    def cycle(self):
+        """One round of typical use; stops at the first failed action, as a user would start over"""
+        return (
+            self.open_page("👤 Profile")
+            and self.mark_attendance()
+            and self.open_page("📊 Reports")
+            and self.open_report("Sunday Attendance")
+            and self.open_report("Monthly Summary")
+        )
+
+
+class ResourceMonitor:
+    """Sample the process's resident memory in the background; CPU comes from getrusage"""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.rss = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-monitor", daemon=True)
+
+    @staticmethod
+    def rss_mb():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except OSError:
+            # Not Linux: the peak is the best available figure
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss / 2**20 if sys.platform == "darwin" else maxrss / 1024
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.rss.append(self.rss_mb())
+
+    def __enter__(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self._cpu = usage.ru_utime + usage.ru_stime
+        self._wall = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.wall_seconds = time.perf_counter() - self._wall
+        self.cpu_seconds = usage.ru_utime + usage.ru_stime - self._cpu
+        self.rss.append(self.rss_mb())
+
+
+def run_level(sessions, args, app_test):
+    """Drive the given number of sessions for args.duration seconds; returns the level summary"""
+    samples = []
+    deadline = time.monotonic() + args.duration
+
+    def session(index):
+        rng = random.Random(args.seed * 1000 + sessions * 100 + index)
+        teacher = Teacher(app_test, args.password, rng, samples, timeout=args.timeout)
+        if not teacher.login():
+            return
+        while time.monotonic() < deadline:
+            if not teacher.cycle():
+                # A fresh session after a failure, like a user reloading the page
+                teacher = Teacher(app_test, args.password, rng, samples, timeout=args.timeout)
+                if not teacher.login():
+                    return
+            if args.think_time:
+                time.sleep(rng.uniform(0, 2 * args.think_time))
+
+    threads = [threading.Thread(target=session, args=(i,), name=f"teacher-{i}") for i in range(sessions)]
+    with ResourceMonitor() as monitor:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    frame = pd.DataFrame(samples, columns=["action", "ms", "error"])
+    ok = frame[frame["error"].isna()]
+    actions = {}
+    for action, group in ok.groupby("action"):
+        p50, p95, p99 = np.percentile(group["ms"], [50, 95, 99])
+        actions[action] = {"count": len(group), "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "p99_ms": round(p99, 1)}
+    overall = np.percentile(ok["ms"], [50, 95, 99]) if len(ok) else [None] * 3
+    return {
+        "sessions": sessions,
+        "seconds": round(monitor.wall_seconds, 2),
+        "actions": len(ok),
+        "errors": int(frame["error"].notna().sum()),
+        "first_errors": frame["error"].dropna().unique()[:3].tolist(),
+        "throughput": round(len(ok) / monitor.wall_seconds, 2),
+        "p50_ms": None if overall[0] is None else round(overall[0], 1),
+        "p95_ms": None if overall[1] is None else round(overall[1], 1),
+        "p99_ms": None if overall[2] is None else round(overall[2], 1),
+        "cpu_percent": round(100 * monitor.cpu_seconds / monitor.wall_seconds, 1),
+        "rss_peak_mb": round(max(monitor.rss), 1),
+        "by_action": actions,
+    }
+
+
+def saturation(levels, min_gain, max_p95_ms):
+    """Sessions at which throughput stops growing by min_gain, or p95 latency passes max_p95_ms"""
+    best = None
+    for level in levels:
+        if max_p95_ms and level["p95_ms"] is not None and level["p95_ms"] > max_p95_ms:
+            return best or level, f"p95 latency above {max_p95_ms:.0f}ms at {level['sessions']} sessions"
+        if best is not None and level["throughput"] < best["throughput"] * (1 + min_gain):
+            return best, f"throughput grew less than {min_gain:.0%} from {best['sessions']} to {level['sessions']} sessions"
+        best = level
+    return best, "throughput still growing at the largest level tried"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with concurrent simulated teachers")
+    parser.add_argument("--children", type=int, default=1000, help="children in the synthetic roster")
+    parser.add_argument("--years", type=int, default=1, help="years of Sundays to generate")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="concurrent sessions per level")
+    parser.add_argument("--duration", type=float, default=60, help="seconds per level")
+    parser.add_argument("--think-time", type=float, default=0.5,
+                        help="mean seconds a teacher pauses between rounds (0 for none)")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds before one rerun counts as failed")
+    parser.add_argument("--min-gain", type=float, default=0.1,
+                        help="throughput growth below which the previous level counts as saturated")
+    parser.add_argument("--max-p95-ms", type=float, default=0, help="p95 latency that counts as saturated (0 disables)")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-dir", default=tempfile.gettempdir(), help="where to create the database")
+    parser.add_argument("--output", default="load_results.json", help="machine-readable results file")
+    args = parser.parse_args(argv)
+
+    children_df = generate_children(args.children, seed=args.seed)
+    attendance_df = generate_attendance(children_df, years=args.years, seed=args.seed)
+    print(f"{len(children_df)} children, {len(attendance_df)} attendance rows")
+    db_path = os.path.join(args.db_dir, "load_test.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    load_into(LocalClient(db_path), children_df, attendance_df)
+    os.environ["SUNDAY_SCHOOL_SQLITE"] = db_path
+
+    app_test = concurrent_app_test()
+    levels = []
+    for sessions in sorted(args.sessions):
+        level = run_level(sessions, args, app_test)
+        levels.append(level)
+        print(f"  {sessions} sessions: {level['throughput']} actions/s, p50 {level['p50_ms']}ms "
+              f"p95 {level['p95_ms']}ms p99 {level['p99_ms']}ms, CPU {level['cpu_percent']}%, "
+              f"RSS {level['rss_peak_mb']} MB, {level['errors']} errors")
+        for error in level["first_errors"]:
+            print(f"    {error}")
+
+    saturated, reason = saturation(levels, args.min_gain, args.max_p95_ms)
+    print(f"Saturates at {saturated['sessions']} sessions ({saturated['throughput']} actions/s): {reason}")
+
+    output = {
+        "timestamp": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "db_dir", "password")},
+        "levels": levels,
+        "saturation": {"sessions": saturated["sessions"], "throughput": saturated["throughput"], "reason": reason},
+    }
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Allow `python benchmarks/run.py` as well as `python -m benchmarks.run`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_children, generate_attendance, load_into
+from local_backend import LocalClient
+from replica import AnalyticsReplica
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def timeit(func, repeat=1, setup=None):
+    """Run func `repeat` times and return (best seconds, last result), calling setup before each run"""
+    best, result = None, None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def attendance_footprint(client):
+    """Payload and memory size of the attendance table as full rows and with packed flags"""
+    from flag_bits import unpack_frame
+    from metrics import estimate_bytes
+
+    full = client.table("attendance").select("*").execute().data
+    compact = client.table("attendance_compact").select("id, child_id, session_date, flags").execute().data
+    packed = pd.DataFrame(compact)
+    packed["flags"] = packed["flags"].astype("uint8")
+    sample = min(len(full), 1000)
+    return {
+        "full_payload_bytes": estimate_bytes(full),
+        "compact_payload_bytes": estimate_bytes(compact),
+        # Shallow dict sizes, scaled up from a sample: what the table cache holds per row
+        "full_cache_bytes": sum(sys.getsizeof(row) for row in full[:sample]) * len(full) // max(sample, 1),
+        "compact_cache_bytes": sum(sys.getsizeof(row) for row in compact[:sample]) * len(compact) // max(sample, 1),
+        "full_frame_bytes": int(pd.DataFrame(full).memory_usage(deep=True).sum()),
+        "packed_frame_bytes": int(packed.memory_usage(deep=True).sum()),
+        "unpacked_frame_bytes": int(unpack_frame(packed).memory_usage(deep=True).sum()),
+    }
+
+
+def run_scale(scale, args, skip):
+    """Generate, load and time every benchmarked step for one roster size"""
+    import datastore
+    import memo
+    from reports import sunday_report, monthly_report, monthly_class_details, child_profile
+
+    results = []
+
+    def record(step, func, rows=None, repeat=args.repeat, cold=True):
+        if step in skip:
+            print(f"  {step}: skipped (exceeded {args.max_seconds}s at a smaller scale)")
+            results.append({"scale": scale, "step": step, "seconds": None, "skipped": True})
+            return None
+        # Memoized results would turn repeats into cache hits, so start each run cold
+        seconds, result = timeit(func, repeat, setup=memo.cache.clear if cold else None)
+        count = rows(result) if rows else None
+        print(f"  {step}: {seconds:.3f}s" + (f" ({count} rows)" if count is not None else ""))
+        results.append({"scale": scale, "step": step, "seconds": round(seconds, 6), "rows": count})
+        if args.max_seconds and seconds > args.max_seconds:
+            skip.add(step)
+        return result
+
+    children_df = generate_children(scale, sponsored_ratio=args.sponsored_ratio, seed=args.seed)
+    attendance_df = generate_attendance(children_df, years=args.years, seed=args.seed)
+    print(f"Scale {scale}: {len(children_df)} children, {len(attendance_df)} attendance rows")
+
+    db_path = os.path.join(args.db_dir, f"bench_{scale}.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    client = LocalClient(db_path)
+    record("load_into_backend", lambda: load_into(client, children_df, attendance_df), repeat=1)
+
+    # Point the data layer at the freshly loaded database
+    os.environ["SUNDAY_SCHOOL_SQLITE"] = db_path
+    datastore.reset_client()
+
+    def cold_load():
+        datastore.clear_cache()
+        return datastore.load_attendance()
+
+    attendance = record("load_attendance_cold", cold_load, rows=len)
+    footprint = attendance_footprint(client)
+    print("  attendance_footprint: " + ", ".join(f"{k} {v / 2**20:.1f} MiB" for k, v in footprint.items()))
+    results.append({"scale": scale, "step": "attendance_footprint", **footprint})
+    record("load_attendance_warm", datastore.load_attendance, rows=len)
+    children = datastore.load_children()
+
+    last_sunday = pd.to_datetime(attendance["session_date"]).max()
+    record("sunday_report", lambda: sunday_report(children, attendance, last_sunday.date()))
+    report = record(
+        "monthly_report",
+        lambda: monthly_report(children, attendance, last_sunday.year, last_sunday.month)
+    )
+    record(
+        "monthly_report_memoized",
+        lambda: monthly_report(children, attendance, last_sunday.year, last_sunday.month),
+        cold=False
+    )
+    if report is not None:
+        section = next(s for s in report["classes"] if not s["attendance"].empty)
+        record(
+            "monthly_class_details",
+            lambda: monthly_class_details(attendance, section["children"], section["attendance"], report["total_sessions"]),
+            rows=lambda df: 0 if df is None else len(df)
+        )
+
+    # The same reports aggregated by the database functions instead of pandas
+    record("sunday_summary_rpc", lambda: datastore.call_report_function(
+        "sunday_summary", p_date=last_sunday.strftime("%Y-%m-%d")))
+    record("monthly_summary_rpc", lambda: datastore.call_report_function(
+        "monthly_summary", p_year=last_sunday.year, p_month=last_sunday.month))
+    if report is not None:
+        record(
+            "monthly_child_tallies_rpc",
+            lambda: datastore.call_report_function(
+                "monthly_child_tallies", p_year=last_sunday.year, p_month=last_sunday.month,
+                p_class_group=section["name"]),
+            rows=len
+        )
+
+    # The same report functions on a local analytics replica, built once from the cached rows
+    replica = AnalyticsReplica()
+    datastore.get_table_cache().observe(replica.record)
+
+    def build_replica():
+        replica.stale = True
+        return replica.sync(datastore.get_table_cache())
+
+    record("replica_build", build_replica, rows=lambda count: count, cold=False)
+    record("sunday_summary_replica", lambda: replica.rpc("sunday_summary", p_date=last_sunday.strftime("%Y-%m-%d")))
+    record("monthly_summary_replica", lambda: replica.rpc(
+        "monthly_summary", p_year=last_sunday.year, p_month=last_sunday.month))
+
+    # Rollup cube: one full build, then slices answered from the cube's cells
+    def build_rollup():
+        datastore.rollup_cube.stale = True
+        return datastore.load_rollup()
+
+    cube = record("rollup_build", build_rollup, rows=len, cold=False)
+    if cube is not None:
+        record("rollup_slice", lambda: cube.slice(["month", "class_group", "sponsored"]), rows=len, cold=False)
+
+    child_info = children.iloc[len(children) // 2]
+    record("child_profile", lambda: child_profile(children, attendance, child_info))
+
+    # Save path: one class worth of marks for a new Sunday, written row by row like the form
+    next_sunday = (last_sunday + pd.Timedelta(days=7)).strftime("%Y-%m-%d")
+    sample = children.head(args.save_batch)
+
+    def save_batch():
+        for child_id in sample["id"]:
+            datastore.save_attendance({
+                "child_id": int(child_id), "session_date": next_sunday, "present": True,
+                "early": True, "has_book": False, "has_pen": True, "has_bible": False, "gave_offering": True,
+            })
+        return sample
+
+    record("save_attendance_batch", save_batch, rows=len, repeat=1)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark data loading and reports on synthetic congregations")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="numbers of children to benchmark")
+    parser.add_argument("--years", type=int, default=1, help="years of Sundays to generate")
+    parser.add_argument("--sponsored-ratio", type=float, default=0.3, help="share of OCM sponsored children")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per step; the best time is kept")
+    parser.add_argument("--save-batch", type=int, default=50, help="attendance rows saved in the save-path step")
+    parser.add_argument("--max-seconds", type=float, default=120,
+                        help="skip a step at larger scales once it takes longer than this (0 disables)")
+    parser.add_argument("--db-dir", default=tempfile.gettempdir(), help="where to create the benchmark databases")
+    parser.add_argument("--output", default="bench_results.json", help="machine-readable results file")
+    args = parser.parse_args(argv)
+
+    results, skip = [], set()
+    for scale in sorted(args.scales):
+        results.extend(run_scale(scale, args, skip))
+
+    output = {
+        "timestamp": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("output", "db_dir")},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
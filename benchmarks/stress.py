@@ -0,0 +1,146 @@
+"""Concurrent attendance saves against the local backend
+
+Many teachers save marks for the same children and date at once, first each
+setting one flag on unmarked children, then each clearing one flag from the
+same (soon stale) copy of the marks. Afterwards every child must have exactly
+one row holding every teacher's change; anything else is a lost update.
+
+    python -m benchmarks.stress --children 100 --workers 32
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Allow `python benchmarks/stress.py` as well as `python -m benchmarks.stress`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_children, load_into
+from flag_bits import FLAG_BITS, FLAG_COLUMNS
+from local_backend import LocalClient
+
+
+def fire(saves, workers):
+    """Run save callables concurrently in random order; returns (seconds, latencies in ms, errors)"""
+    random.shuffle(saves)
+    latencies, errors = [], []
+
+    def timed_save(save):
+        start = time.perf_counter()
+        try:
+            save()
+        except Exception as e:
+            errors.append(e)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(timed_save, saves))
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(phase, seconds, latencies, errors):
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"  {phase}: {len(latencies)} saves in {seconds:.2f}s ({len(latencies) / seconds:.0f}/s), "
+          f"p50 {p50:.1f}ms p95 {p95:.1f}ms p99 {p99:.1f}ms, {len(errors)} errors")
+    for error in errors[:3]:
+        print(f"    {error}")
+
+
+def check(db_path, session_date, expected):
+    """Rows per child for the date and their packed flags; returns the list of violations"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT child_id, COUNT(*), MAX(flags) FROM attendance WHERE session_date = ? GROUP BY child_id",
+        [session_date]
+    ).fetchall()
+    conn.close()
+    found = {child_id: (count, flags) for child_id, count, flags in rows}
+    problems = []
+    for child_id in expected:
+        count, flags = found.get(child_id, (0, None))
+        if count != 1:
+            problems.append(f"child {child_id}: {count} rows")
+        elif flags != expected[child_id]:
+            problems.append(f"child {child_id}: flags {flags}, expected {expected[child_id]}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress concurrent attendance saves on the local backend")
+    parser.add_argument("--children", type=int, default=100, help="children marked by every teacher")
+    parser.add_argument("--workers", type=int, default=32, help="saves in flight at once")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db-dir", default=tempfile.gettempdir(), help="where to create the database")
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    db_path = os.path.join(args.db_dir, "stress_attendance.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    children = generate_children(args.children, seed=args.seed)
+    load_into(LocalClient(db_path), children, pd.DataFrame())
+
+    os.environ["SUNDAY_SCHOOL_SQLITE"] = db_path
+    import datastore
+    import metrics
+    datastore.reset_client()
+
+    session_date = "2025-06-01"
+    child_ids = [int(child_id) for child_id in children["id"]]
+    problems = []
+
+    # Phase 1: one teacher per flag marks each unmarked child; all six flags must land
+    saves = [
+        lambda child_id=child_id, flag=flag: datastore.save_attendance(
+            {"child_id": child_id, "session_date": session_date, flag: True}
+        )
+        for child_id in child_ids for flag in FLAG_COLUMNS
+    ]
+    report("set one flag each", *fire(saves, args.workers))
+    problems += check(db_path, session_date, {child_id: sum(FLAG_BITS.values()) for child_id in child_ids})
+
+    # Phase 2: every teacher works from the same loaded marks and clears a different flag
+    day = datastore.load_attendance_on(session_date)
+    marks = {row["child_id"]: row for row in day.to_dict("records")}
+    cleared = FLAG_COLUMNS[1:]
+    saves = [
+        lambda child_id=child_id, flag=flag: datastore.save_attendance(
+            {"child_id": child_id, "session_date": session_date, **{
+                name: bool(marks[child_id][name]) and name != flag for name in FLAG_COLUMNS
+            }},
+            marks[child_id]
+        )
+        for child_id in child_ids for flag in cleared
+    ]
+    report("clear one flag each from a stale copy", *fire(saves, args.workers))
+    problems += check(db_path, session_date, {child_id: FLAG_BITS["present"] for child_id in child_ids})
+
+    merged = metrics.registry.snapshot()
+    merged = merged.loc[merged["Operation"] == "db.save_attendance.merged", "Calls"]
+    print(f"  stale saves merged: {int(merged.iloc[0]) if len(merged) else 0}")
+
+    cache = datastore.get_table_cache()
+    cached = {row["child_id"]: row["flags"] for row in cache.with_rows(["attendance"], lambda rows: rows)}
+    stale_cache = [child_id for child_id in child_ids if cached.get(child_id) != FLAG_BITS["present"]]
+    if stale_cache:
+        problems.append(f"{len(stale_cache)} children differ between the table cache and the database")
+
+    if problems:
+        print(f"FAILED: {len(problems)} lost or duplicated updates")
+        for problem in problems[:10]:
+            print(f"  {problem}")
+        return 1
+    print("OK: one row per child, no lost updates")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+# Class groups and the grades that belong to each, as offered on the registration form
+CLASS_GRADES = {
+    "Chosen Generation(grade PP1–PP2)": ["PP1", "PP2"],
+    "Chosen Nation(grade 1–3)": ["Grade 1", "Grade 2", "Grade 3"],
+    "Priesthood (grade 4–6)": ["Grade 4", "Grade 5", "Grade 6"],
+    "Preisthood 2(grade 7–12)": ["Grade 7", "Grade 8", "Grade 9", "Grade 10", "Grade 11", "Grade 12"],
+    "Priesthood 2(form 1–4)": ["Form 1", "Form 2", "Form 3", "Form 4"],
+}
+
+FIRST_NAMES = [
+    "Amani", "Baraka", "Chebet", "Daudi", "Esther", "Faith", "Grace", "Hassan", "Imani", "Jabari",
+    "Kamau", "Lulu", "Makena", "Neema", "Otieno", "Pendo", "Rehema", "Sifa", "Tumaini", "Wanjiru",
+]
+LAST_NAMES = [
+    "Achieng", "Barasa", "Cheruiyot", "Gitau", "Kariuki", "Kiptoo", "Mutua", "Mwangi", "Njeri",
+    "Odhiambo", "Omondi", "Onyango", "Wafula", "Wambui", "Wekesa",
+]
+AREAS = ["Kibera", "Kawangware", "Dagoretti", "Riruta", "Ngando", "Waithaka", "Uthiru"]
+
+# Probability of each flag given the child attended
+FLAG_PROBABILITIES = {
+    "early": 0.45,
+    "has_book": 0.6,
+    "has_pen": 0.55,
+    "has_bible": 0.5,
+    "gave_offering": 0.35,
+}
+
+
+def generate_children(count, classes=None, sponsored_ratio=0.3, seed=0):
+    """Generate a children table with realistic names, classes and contacts"""
+    rng = np.random.default_rng(seed)
+    class_names = list(classes or CLASS_GRADES)
+    class_group = rng.choice(class_names, size=count)
+    grade = [rng.choice(CLASS_GRADES.get(c, [""])) for c in class_group]
+    first = rng.choice(FIRST_NAMES, size=count)
+    last = rng.choice(LAST_NAMES, size=count)
+    parent_last = rng.choice(LAST_NAMES, size=count)
+    ids = np.arange(1, count + 1)
+    dob = pd.Timestamp("2008-01-01") + pd.to_timedelta(rng.integers(0, 365 * 14, size=count), unit="D")
+
+    return pd.DataFrame({
+        "id": ids,
+        # Suffix the id so names stay unique, as the app selects children by name
+        "full_name": [f"{f} {l} {i}" for f, l, i in zip(first, last, ids)],
+        "gender": rng.choice(["Male", "Female"], size=count),
+        "date_of_birth": dob.strftime("%Y-%m-%d"),
+        "school": rng.choice([f"{a} Primary" for a in AREAS], size=count),
+        "grade": grade,
+        "class_group": class_group,
+        "residence": rng.choice(AREAS, size=count),
+        "parent1_name": [f"{rng.choice(FIRST_NAMES)} {l}" for l in parent_last],
+        "parent1_contact": [f"07{n:08d}" for n in rng.integers(0, 10**8, size=count)],
+        "parent2_name": "",
+        "parent2_contact": "",
+        "sponsored": rng.random(count) < sponsored_ratio,
+    })
+
+
+def sundays(years, end=None):
+    """Sundays in the given number of years up to the end date (today by default)"""
+    end = pd.Timestamp(end or pd.Timestamp.now().normalize())
+    return pd.date_range(end - pd.DateOffset(years=years), end, freq="W-SUN")
+
+
+def generate_attendance(children_df, years=1, end=None, flag_probabilities=None, seed=0):
+    """Generate attendance rows for every Sunday, one row per child present
+
+    Each child has their own attendance propensity, and late joiners only
+    attend from their join date, so new-child rules are exercised too.
+    """
+    rng = np.random.default_rng(seed + 1)
+    probabilities = {**FLAG_PROBABILITIES, **(flag_probabilities or {})}
+    dates = sundays(years, end)
+    child_ids = children_df["id"].to_numpy()
+    n_children, n_dates = len(child_ids), len(dates)
+
+    # Regular attenders cluster around 80%, with a tail of occasional visitors
+    propensity = rng.beta(4, 1.5, size=n_children)
+    joined = rng.integers(0, max(n_dates, 1), size=n_children)
+    joined[rng.random(n_children) < 0.7] = 0
+
+    frames = []
+    for i, session_date in enumerate(dates):
+        present = (rng.random(n_children) < propensity) & (joined <= i)
+        ids = child_ids[present]
+        if not len(ids):
+            continue
+        day = pd.DataFrame({"child_id": ids, "session_date": session_date.strftime("%Y-%m-%d"), "present": True})
+        for flag, p in probabilities.items():
+            day[flag] = rng.random(len(ids)) < p
+        frames.append(day)
+
+    if not frames:
+        return pd.DataFrame(columns=["child_id", "session_date", "present"] + list(probabilities))
+    attendance = pd.concat(frames, ignore_index=True)
+    attendance.insert(0, "id", np.arange(1, len(attendance) + 1))
+    return attendance
+
+
+def load_into(client, children_df, attendance_df, chunk_size=10000):
+    """Bulk-insert generated tables into a (local) database client"""
+    for table, df in (("children", children_df), ("attendance", attendance_df)):
+        records = df.to_dict("records")
+        for start in range(0, len(records), chunk_size):
+            chunk = [
+                {k: (v.item() if hasattr(v, "item") else v) for k, v in row.items()}
+                for row in records[start:start + chunk_size]
+            ]
+            client.table(table).insert(chunk, returning="minimal").execute()
@@ -0,0 +1,244 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import datastore
+from metrics import track
+from resilient_client import is_transient
+
+# Check-ins kept for the kiosk's recent list
+RECENT = 20
+
+# Seconds before the children already present on a date are reloaded, to see teachers' marks
+PRESENT_REFRESH = 60
+
+# Check-ins that could not be saved, kept for the kiosk page
+MAX_DEAD_LETTERS = 200
+
+
+def parse_cutoff(value):
+    """'HH:MM' early check-in cutoff as a time; None disables early marks"""
+    if not value:
+        return None
+    return datetime.strptime(str(value), "%H:%M").time()
+
+
+def local_now(timezone=None):
+    """Current wall-clock time in the given IANA timezone (e.g. "Africa/Nairobi"), else the server's"""
+    if not timezone:
+        return datetime.now()
+    return datetime.now(ZoneInfo(timezone)).replace(tzinfo=None)
+
+
+def checkin_code(child_id, width=4):
+    """Short code a child types or scans at the kiosk: their id, zero-padded"""
+    return f"{int(child_id):0{width}d}"
+
+
+def parse_code(text):
+    """Child id from a typed or scanned code, or None if it is not one"""
+    text = str(text or "").strip()
+    return int(text) if text.isdigit() else None
+
+
+def _is_transient(error):
+    cause = getattr(error, "cause", None) or error
+    return isinstance(cause, ConnectionError) or is_transient(cause)
+
+
+class CheckInQueue:
+    """Coalesce kiosk check-ins into batched attendance upserts on a background thread
+
+    check_in() only records the check-in in memory and returns, so the
+    kiosk answers at once; the worker saves whatever is pending every
+    flush_seconds (or as soon as batch_size are waiting) in one upsert.
+    A child is checked in once per day: repeats, including children a
+    teacher already marked present, are answered without a write. The
+    children present on a date are loaded on its first check-in and
+    refreshed by the worker every PRESENT_REFRESH seconds, never while a
+    check-in waits. A batch that keeps failing is retried with backoff,
+    then saved row by row: rows refused by the database (e.g. a deleted
+    child) go to dead_letters, rows hit by an outage stay pending.
+    """
+
+    def __init__(self, save, present_on, batch_size=200, flush_seconds=0.5, retries=3,
+                 base_delay=1.0, max_delay=30.0, timezone=None):
+        self.save = save
+        self.present_on = present_on
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timezone = timezone
+        self.recent = []
+        self.dead_letters = []
+        self._pending = OrderedDict()
+        self._present = {}
+        self._loaded_at = {}
+        self._checked_in = {}
+        self._stats = {"checked_in": 0, "repeats": 0, "saved": 0, "batches": 0, "failures": 0}
+        self._last_error = None
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="checkin-writer", daemon=True)
+        self._worker.start()
+
+    def _load_present(self, session_date):
+        """Reload the children present on a date; the read runs outside the lock"""
+        present = set(self.present_on(session_date))
+        with self._lock:
+            self._present[session_date] = present
+            self._loaded_at[session_date] = time.monotonic()
+
+    def check_in(self, child_id, session_date, early, name=None):
+        """Record a check-in; returns False if the child was already checked in that day"""
+        if session_date not in self._present:
+            self._load_present(session_date)
+        key = (int(child_id), session_date)
+        with self._lock:
+            checked_in = self._checked_in.setdefault(session_date, set())
+            if key[0] in checked_in or key[0] in self._present[session_date]:
+                self._stats["repeats"] += 1
+                return False
+            checked_in.add(key[0])
+            self._pending[key] = {"child_id": key[0], "session_date": session_date, "early": bool(early)}
+            self._stats["checked_in"] += 1
+            self.recent = [{
+                "Time": local_now(self.timezone).strftime("%H:%M:%S"), "Name": name, "Early": bool(early),
+            }] + self.recent[:RECENT - 1]
+            ready = len(self._pending) >= self.batch_size
+        if ready:
+            self._wake.set()
+        return True
+
+    def _refresh_present(self):
+        with self._lock:
+            due = [day for day, at in self._loaded_at.items() if time.monotonic() - at >= PRESENT_REFRESH]
+        for session_date in due:
+            try:
+                self._load_present(session_date)
+            except Exception as e:
+                # Keep the last loaded set; check-ins made here are tracked anyway
+                with self._lock:
+                    self._loaded_at[session_date] = time.monotonic()
+                    self._last_error = str(e)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self._refresh_present()
+            with self._lock:
+                keys = list(self._pending)[:self.batch_size]
+                batch = [self._pending[key] for key in keys]
+            if batch:
+                self._flush(keys, batch)
+            with self._lock:
+                if not self._pending:
+                    self._idle.notify_all()
+                elif len(self._pending) >= self.batch_size:
+                    self._wake.set()
+
+    def _flush(self, keys, batch):
+        with track("checkin.flush") as span:
+            span.rows = len(batch)
+            try:
+                saved = self.save(batch)
+            except Exception as e:
+                span.error = True
+                with self._lock:
+                    self._stats["failures"] += 1
+                    self._failures += 1
+                    self._last_error = str(e)
+                    give_up = self._failures > self.retries
+                if give_up:
+                    self._save_rows(keys, batch)
+                else:
+                    self._backoff()
+                return
+        self._saved(keys, saved)
+
+    def _save_rows(self, keys, batch):
+        """Save a batch that keeps failing one row at a time, so one bad row cannot hold up the rest"""
+        outage = False
+        for key, checkin in zip(keys, batch):
+            try:
+                self._saved([key], self.save([checkin]))
+            except Exception as e:
+                if _is_transient(e):
+                    outage = True
+                    break
+                with self._lock:
+                    self._pending.pop(key, None)
+                    self.dead_letters = (self.dead_letters + [{**checkin, "error": str(e)}])[-MAX_DEAD_LETTERS:]
+        if outage:
+            self._backoff()
+        else:
+            with self._lock:
+                self._failures = 0
+
+    def _saved(self, keys, saved):
+        with self._lock:
+            for key in keys:
+                self._pending.pop(key, None)
+            self._stats["saved"] += saved or 0
+            self._stats["batches"] += 1
+            self._failures = 0
+            self._last_error = None
+
+    def _backoff(self):
+        # Full-jitter exponential backoff, as for database retries; check-ins stay pending
+        attempt = min(self._failures, 10)
+        time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
+
+    def flush(self, timeout=None):
+        """Wait until every pending check-in is saved or dead-lettered; returns False on timeout"""
+        self._wake.set()
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._pending, timeout)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending), **self._stats,
+                "dead_letters": len(self.dead_letters), "last_error": self._last_error,
+            }
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+
+def _present_on(session_date):
+    attendance_df = datastore.load_attendance_on(session_date)
+    if attendance_df.empty:
+        return []
+    return attendance_df.loc[attendance_df['present'].astype(bool), 'child_id'].astype(int).tolist()
+
+
+# One queue per process, so check-ins from every kiosk share the batches
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_checkin_queue(config):
+    """Shared check-in queue built from the [kiosk] config section on first use"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = CheckInQueue(
+                datastore.save_checkins,
+                _present_on,
+                batch_size=config.get("batch_size", 200),
+                flush_seconds=config.get("flush_seconds", 0.5),
+                retries=config.get("retries", 3),
+                timezone=config.get("timezone"),
+            )
+        return _queue
@@ -0,0 +1,158 @@
+"""Headless entry point for scheduled jobs, without Streamlit
+
+    python cli.py backup [--dir backups]
+    python cli.py restore --children children.csv --attendance attendance.csv [--sessions sessions.csv]
+    python cli.py rollup [--group-by month class_group] [--output rollup.csv]
+    python cli.py warm
+    python cli.py import register.xlsx [--dry-run] [--dayfirst] [--rejects rejects.csv]
+    python cli.py archive [YEAR] [--keep | --delete]
+
+Secrets come from .streamlit/secrets.toml (or SUNDAY_SCHOOL_SECRETS), and
+SUPABASE_URL/SUPABASE_KEY or SUNDAY_SCHOOL_SQLITE from the environment.
+Modules are imported per command so a job only loads what it uses.
+"""
+import argparse
+import sys
+
+
+def backup(args):
+    from backup_data import backup_data
+    backup_data(args.dir)
+
+
+def restore(args):
+    from backup_data import restore_data
+    files = {"children": args.children, "attendance": args.attendance, "sessions": args.sessions}
+    if not any(files.values()):
+        raise SystemExit("Nothing to restore: pass --children, --attendance and/or --sessions")
+    restore_data(files)
+
+
+def rollup(args):
+    import datastore
+    from rollups import DIMENSIONS
+
+    unknown = [dim for dim in args.group_by if dim not in DIMENSIONS]
+    if unknown:
+        raise SystemExit(f"Unknown dimensions {unknown}; choose from {DIMENSIONS}")
+    cube = datastore.load_rollup()
+    table = cube.slice(args.group_by, extra=datastore.load_archive_summary())
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"✓ {len(table)} rollup rows written to {args.output}")
+    else:
+        print(table.to_string(index=False))
+
+
+def warm(args):
+    """Load every table and run each report query once, e.g. after a deploy
+
+    Runs the same steps as the app's warm-up, which fills the database's own
+    caches and checks the report functions work; prints how long each step took.
+    """
+    import datastore
+    from warmup import Warmup, warm_steps
+
+    datastore.apply_settings()
+    print("Warming up...")
+    run = Warmup().run_once(warm_steps())
+    for step in run["steps"]:
+        print(f"  {step['step']}: {step['seconds']:.3f}s" + (f" ({step['error']})" if step["error"] else ""))
+    if any(step["error"] for step in run["steps"]):
+        return 1
+
+
+def import_register(args):
+    """Import a wide attendance register (see register_import.py), printing the reject report"""
+    import datastore
+    from register_import import read_sheet, plan_import
+
+    try:
+        plan = plan_import(read_sheet(args.file), datastore.load_children(), dayfirst=args.dayfirst)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    marks, rejects = plan["marks"], plan["rejects"]
+    fuzzy = plan["matches"][plan["matches"]["Match"] == "fuzzy"]
+    print(f"{len(marks)} marks for {marks['child_id'].nunique()} children on {marks['session_date'].nunique()} "
+          f"Sundays, {len(fuzzy)} names matched by spelling, {len(rejects)} rejected")
+    if not fuzzy.empty:
+        print(fuzzy.to_string(index=False))
+    if args.rejects:
+        rejects.to_csv(args.rejects, index=False)
+        print(f"Reject report written to {args.rejects}")
+    elif not rejects.empty:
+        print(rejects.to_string(index=False))
+    if args.dry_run or marks.empty:
+        return
+    saved = datastore.import_attendance(marks)
+    print(f"✓ {saved} marks saved")
+
+
+def archive(args):
+    """Move a closed year's attendance into the archive, or list the archived years"""
+    import datastore
+
+    if args.year is None:
+        for meta in datastore.get_archive().meta():
+            print(f"{meta['year']}: {meta['rows']} rows, {meta['children']} children, {meta['sessions']} sessions "
+                  f"({meta['first_date']} to {meta['last_date']}), archived {meta['archived_at']}")
+        return
+    try:
+        delete = datastore.archive_deletes() if args.delete is None else args.delete
+        meta = datastore.archive_year(args.year, delete=delete)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    where = "removed from the database" if delete else "kept in the database too"
+    print(f"✓ {meta['rows']} rows of {args.year} archived in {datastore.get_archive().root}, {where}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sunday School data jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_backup = commands.add_parser("backup", help="write every table to timestamped CSV files")
+    parser_backup.add_argument("--dir", default="backups", help="directory for the backup files")
+    parser_backup.set_defaults(run=backup)
+
+    parser_restore = commands.add_parser("restore", help="upsert rows from backup CSV files")
+    parser_restore.add_argument("--children", help="children backup CSV")
+    parser_restore.add_argument("--attendance", help="attendance backup CSV")
+    parser_restore.add_argument("--sessions", help="sessions backup CSV")
+    parser_restore.set_defaults(run=restore)
+
+    parser_rollup = commands.add_parser("rollup", help="rebuild the attendance rollup and print or save a slice")
+    parser_rollup.add_argument("--group-by", nargs="+", default=["month", "class_group"],
+                               help="dimensions: month class_group sponsored gender grade")
+    parser_rollup.add_argument("--output", help="CSV file to write instead of printing")
+    parser_rollup.set_defaults(run=rollup)
+
+    parser_warm = commands.add_parser("warm", help="load tables and run the report queries once")
+    parser_warm.set_defaults(run=warm)
+
+    parser_import = commands.add_parser("import", help="import attendance from a register spreadsheet")
+    parser_import.add_argument("file", help="CSV or Excel register: a Name column, then one column per date")
+    parser_import.add_argument("--dry-run", action="store_true", help="only show what would be saved")
+    parser_import.add_argument("--dayfirst", action="store_true", help="read dates like 01/06/2025 as 1 June")
+    parser_import.add_argument("--rejects", help="CSV file for the reject report instead of printing it")
+    parser_import.set_defaults(run=import_register)
+
+    parser_archive = commands.add_parser("archive", help="move a past year's attendance to the Parquet archive")
+    parser_archive.add_argument("year", nargs="?", type=int, help="year to archive; lists the archive when omitted")
+    keep_or_delete = parser_archive.add_mutually_exclusive_group()
+    keep_or_delete.add_argument("--delete", dest="delete", action="store_const", const=True,
+                                help="delete the archived rows from the database (the default unless [archive] delete = false)")
+    keep_or_delete.add_argument("--keep", dest="delete", action="store_const", const=False,
+                                help="keep the archived rows in the database too")
+    parser_archive.set_defaults(run=archive)
+
+    args = parser.parse_args(argv)
+    from errors import DataError
+    try:
+        return args.run(args) or 0
+    except DataError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import os
+import threading
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+from errors import ConfigError
+
+# Secrets file read outside Streamlit; SUNDAY_SCHOOL_SECRETS points elsewhere
+SECRETS_PATH = os.path.join(".streamlit", "secrets.toml")
+
+_source = None
+_secrets = None
+_lock = threading.Lock()
+
+
+def _read_secrets_file():
+    path = os.environ.get("SUNDAY_SCHOOL_SECRETS", SECRETS_PATH)
+    if not os.path.exists(path):
+        return {}
+    if tomllib is not None:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    import toml
+    return toml.load(path)
+
+
+def set_source(source):
+    """Read secrets from source() instead of the secrets file (the Streamlit adapter passes st.secrets)"""
+    global _source, _secrets
+    with _lock:
+        _source = source
+        _secrets = None
+
+
+def load_secrets():
+    """All secrets as a dict, read once"""
+    global _secrets
+    with _lock:
+        if _secrets is None:
+            try:
+                _secrets = dict((_source or _read_secrets_file)())
+            except Exception:
+                _secrets = {}
+        return _secrets
+
+
+def get_config(section):
+    """Return a secrets section as a dict, or an empty dict when it is not configured"""
+    value = load_secrets().get(section, {})
+    return dict(value) if hasattr(value, "items") else {}
+
+
+def get_secret(section, key):
+    """A required secret; the SECTION_KEY environment variable (e.g. SUPABASE_URL) takes precedence"""
+    value = os.environ.get(f"{section}_{key}".upper()) or get_config(section).get(key)
+    if not value:
+        raise ConfigError(f"reading [{section}] {key}", "not set in secrets.toml or the environment")
+    return value
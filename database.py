@@ -1,141 +1,95 @@
+import functools
 import streamlit as st
-from supabase import create_client
 import pandas as pd
-from datetime import datetime
+import config
+import datastore
+from datastore import (
+    CACHE_TTL,
+    apply_settings,
+    FLAG_COLUMNS,
+    get_config,
+    get_table_cache,
+    data_version,
+    clear_cache,
+    call_report_function,
+    is_archived,
+    archived_years
+)
+from errors import DataError
+from session_calendar import SessionCalendar
 
-@st.cache_resource
-def get_supabase_client():
-    """Initialize and return Supabase client"""
-    try:
-        # Get credentials from secrets
-        url = st.secrets["supabase"]["url"]
-        key = st.secrets["supabase"]["key"]
-        return create_client(url, key)
-    except Exception as e:
-        st.error(f"Error connecting to Supabase: {str(e)}")
-        return None
+# Streamlit adapter for datastore: the same functions, with failures shown in the
+# page (st.error) and a safe default returned, as the views expect.
 
-@st.cache_data(ttl=30)
-def load_children():
-    """Load children data from Supabase"""
-    try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return pd.DataFrame()
-        
-        response = supabase.table('children').select("*").execute()
-        return pd.DataFrame(response.data) if response.data else pd.DataFrame()
-    except Exception as e:
-        st.error(f"Error loading children data: {str(e)}")
-        return pd.DataFrame()
+__all__ = [
+    'CACHE_TTL', 'apply_settings', 'FLAG_COLUMNS', 'get_config', 'get_table_cache', 'data_version', 'clear_cache',
+    'call_report_function', 'get_supabase_client', 'load_attendance_on', 'load_calendar', 'load_rollup',
+    'load_absence_tracker', 'save_session', 'save_child', 'update_child', 'delete_child', 'save_attendance',
+    'delete_attendance',
+    'import_attendance', 'load_tables', 'load_children', 'load_attendance', 'is_archived', 'archived_years',
+    'load_attendance_between', 'load_archive_summary', 'with_archived_history',
+]
 
-@st.cache_data(ttl=30)
-def load_attendance():
-    """Load attendance data from Supabase"""
+def _streamlit_secrets():
+    if not st.secrets.load_if_toml_exists():
+        return {}
+    return {key: dict(value) if hasattr(value, "items") else value for key, value in st.secrets.items()}
+
+# Read secrets through st.secrets so every place Streamlit looks for them works
+config.set_source(_streamlit_secrets)
+
+def _shows_errors(default):
+    """Decorator: report DataError with st.error and return default() instead"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except DataError as e:
+                st.error(str(e))
+                return default()
+        return wrapper
+    return decorator
+
+get_supabase_client = _shows_errors(lambda: None)(datastore.get_supabase_client)
+load_attendance_on = _shows_errors(pd.DataFrame)(datastore.load_attendance_on)
+load_calendar = _shows_errors(lambda: SessionCalendar([]))(datastore.load_calendar)
+load_rollup = _shows_errors(lambda: None)(datastore.load_rollup)
+load_absence_tracker = _shows_errors(lambda: None)(datastore.load_absence_tracker)
+save_session = _shows_errors(lambda: False)(datastore.save_session)
+save_child = _shows_errors(lambda: False)(datastore.save_child)
+update_child = _shows_errors(lambda: False)(datastore.update_child)
+delete_child = _shows_errors(lambda: False)(datastore.delete_child)
+save_attendance = _shows_errors(lambda: None)(datastore.save_attendance)
+delete_attendance = _shows_errors(lambda: False)(datastore.delete_attendance)
+import_attendance = _shows_errors(lambda: None)(datastore.import_attendance)
+load_attendance_between = _shows_errors(pd.DataFrame)(datastore.load_attendance_between)
+load_archive_summary = _shows_errors(lambda: None)(datastore.load_archive_summary)
+
+def with_archived_history(attendance_df, child_ids):
+    """attendance_df plus the children's archived rows (see datastore), just attendance_df on failure"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return pd.DataFrame()
-        
-        # Get attendance data with all fields
-        attendance_response = supabase.table('attendance').select("*").execute()
-        attendance_df = pd.DataFrame(attendance_response.data) if attendance_response.data else pd.DataFrame()
-        
-        if attendance_df.empty:
-            return attendance_df
-            
-        # Get children data with id and full_name
-        children_response = supabase.table('children').select("id", "full_name").execute()
-        children_df = pd.DataFrame(children_response.data) if children_response.data else pd.DataFrame()
-        
-        if not children_df.empty:
-            # Merge attendance with children names
-            attendance_df = attendance_df.merge(
-                children_df,
-                left_on="child_id",
-                right_on="id",
-                how="left"
-            )
-            
-            # Ensure all required columns exist with correct names
-            required_columns = [
-                'child_id', 'session_date', 'present', 'early',
-                'has_book', 'has_pen', 'has_bible', 'gave_offering',
-                'full_name', 'id'
-            ]
-            
-            # Add any missing columns with default values
-            for col in required_columns:
-                if col not in attendance_df.columns:
-                    attendance_df[col] = False if col in ['present', 'early', 'has_book', 'has_pen', 'has_bible', 'gave_offering'] else None
-        
+        return datastore.with_archived_history(attendance_df, tuple(sorted({int(child_id) for child_id in child_ids})))
+    except DataError as e:
+        st.error(str(e))
         return attendance_df
-    except Exception as e:
-        st.error(f"Error loading attendance data: {str(e)}")
-        return pd.DataFrame()
 
-def save_child(child_data):
-    """Save child data to Supabase"""
+def load_tables(*names):
+    """Load datasets by name (see datastore.load_tables), empty frames on failure"""
     try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return False
-        
-        response = supabase.table('children').insert(child_data).execute()
-        return True if response.data else False
-    except Exception as e:
-        st.error(f"Error saving child data: {str(e)}")
-        return False
+        frames = datastore.load_tables(*names)
+    except DataError as e:
+        st.error(str(e))
+        return {name: pd.DataFrame() for name in names}
+    last_error = get_table_cache().last_error
+    if last_error is not None:
+        st.warning(f"Showing the last loaded data; could not refresh: {str(last_error)}")
+    return frames
 
-def update_child(child_id, child_data):
-    """Update child data in Supabase"""
-    try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return False
-        
-        response = supabase.table('children').update(child_data).eq('id', child_id).execute()
-        return True if response.data else False
-    except Exception as e:
-        st.error(f"Error updating child data: {str(e)}")
-        return False
+def load_children():
+    """Load children data from the shared cache"""
+    return load_tables('children')['children']
 
-def save_attendance(attendance_data):
-    """Save attendance data to Supabase"""
-    try:
-        supabase = get_supabase_client()
-        if not supabase:
-            return False
-        
-        # Check if attendance record already exists for this child and date
-        existing = supabase.table('attendance').select("*").eq(
-            'child_id', attendance_data['child_id']
-        ).eq(
-            'session_date', attendance_data['session_date']
-        ).execute()
-        
-        if existing.data:
-            # Update existing record
-            response = supabase.table('attendance').update({
-                'present': attendance_data['present'],
-                'early': attendance_data.get('early', False),
-                'has_book': attendance_data.get('has_book', False),
-                'has_pen': attendance_data.get('has_pen', False),
-                'has_bible': attendance_data.get('has_bible', False),
-                'gave_offering': attendance_data.get('gave_offering', False),
-                'updated_at': datetime.now().isoformat()
-            }).eq(
-                'child_id', attendance_data['child_id']
-            ).eq(
-                'session_date', attendance_data['session_date']
-            ).execute()
-        else:
-            # Add created_at timestamp for new records
-            attendance_data['created_at'] = datetime.now().isoformat()
-            # Insert new record with all fields
-            response = supabase.table('attendance').insert(attendance_data).execute()
-        
-        return True if response.data else False
-    except Exception as e:
-        st.error(f"Error saving attendance data: {str(e)}")
-        return False 
\ No newline at end of file
+def load_attendance():
+    """Load attendance data with child names from the shared cache"""
+    return load_tables('attendance')['attendance']
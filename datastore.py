@@ -0,0 +1,990 @@
+import logging
+import os
+import threading
+import time
+import pandas as pd
+from datetime import datetime
+from local_backend import LocalClient
+from live_updates import TableCache, LocalChangeFeed, SupabaseChangeFeed
+from metrics import timed, track, estimate_bytes
+from reports import next_enrollment_start, enrollment_start_from_dates, compute_enrollment_starts
+import metrics
+import reports
+from session_calendar import SessionCalendar
+from rollups import RollupCube
+from followups import AbsenceTracker
+from replica import AnalyticsReplica, REPORT_FUNCTIONS
+from archive import AttendanceArchive, summarize, year_bounds
+from flag_bits import FLAG_BITS, FLAG_COLUMNS, pack, pack_row, unpack_frame
+import memo
+from resilient_client import ResilientClient, CircuitBreaker, make_http_client
+from config import get_config, get_secret
+from errors import DataError
+
+logger = logging.getLogger(__name__)
+
+# Seconds before cached tables are refetched; not used while change events keep them current
+CACHE_TTL = 30
+
+def apply_settings():
+    """Apply the process-wide settings: metrics file, program dates and report cache budget"""
+    metrics_file = get_config("metrics").get("file")
+    if metrics_file:
+        metrics.registry.metrics_file = metrics_file
+
+    # Program start date and enrollment window used to tell new children from existing ones
+    program = get_config("program")
+    reports.configure_program(program.get("start_date"), program.get("enrollment_window_months", 2))
+
+    # Memory budget for report results shared across sessions
+    memo.cache.max_bytes = get_config("cache").get("report_mb", memo.DEFAULT_MAX_MB) * 1024 * 1024
+
+# Created on first use and shared by every caller in the process
+_client = None
+_client_lock = threading.Lock()
+
+def get_supabase_client():
+    """Shared Supabase client, or the local SQLite stand-in when configured
+
+    Either way the client is wrapped with retries and a circuit breaker, tuned by
+    the optional [http] secrets section. Raises DataError if it cannot be created.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            try:
+                _client = _connect()
+            except Exception as e:
+                raise DataError("connecting to Supabase", e) from e
+        return _client
+
+def reset_client():
+    """Drop the shared client so the next call connects again, e.g. after changing the backend"""
+    global _client, _enrollment_backfilled
+    with _client_lock:
+        _client = None
+        _enrollment_backfilled = False
+
+@timed("db.connect")
+def _connect():
+    """Build the wrapped client from the secrets"""
+    http = get_config("http")
+    breaker = CircuitBreaker(
+        failure_threshold=http.get("breaker_failures", 5),
+        reset_timeout=http.get("breaker_reset_seconds", 30)
+    )
+    retry = dict(
+        retries=http.get("retries", 3),
+        base_delay=http.get("retry_base_delay", 0.2),
+        max_delay=http.get("retry_max_delay", 3.0),
+        breaker=breaker
+    )
+
+    # A local database path (env var or [sqlite] secrets) switches to the offline backend
+    sqlite_path = os.environ.get("SUNDAY_SCHOOL_SQLITE") or get_config("sqlite").get("path")
+    if sqlite_path:
+        return ResilientClient(LocalClient(sqlite_path), **retry)
+    
+    # Imported here so scripts on the local backend start without it
+    from supabase import create_client, ClientOptions
+
+    # Get credentials from secrets
+    url = get_secret("supabase", "url")
+    key = get_secret("supabase", "key")
+
+    # One pooled keep-alive HTTP client with timeouts, shared by every request
+    http_client = make_http_client(
+        timeout=http.get("timeout", 10),
+        connect_timeout=http.get("connect_timeout", 5),
+        pool_size=http.get("pool_size", 10),
+        keepalive_expiry=http.get("keepalive_seconds", 60)
+    )
+    try:
+        options = ClientOptions(httpx_client=http_client, postgrest_client_timeout=http.get("timeout", 10))
+    except TypeError:
+        # Older supabase releases build their own HTTP client; keep the timeout at least
+        http_client.close()
+        http_client = None
+        options = ClientOptions(postgrest_client_timeout=http.get("timeout", 10))
+    return ResilientClient(create_client(url, key, options=options), http_client=http_client, **retry)
+
+def _fetch_rows(table, supabase=None):
+    """Fetch every row of a table from Supabase"""
+    with track(f"supabase.select.{table}") as span:
+        supabase = supabase or get_supabase_client()
+        if table == 'attendance':
+            rows = _select_attendance(supabase)
+        else:
+            rows = supabase.table(table).select("*").execute().data or []
+        span.rows = len(rows)
+        span.bytes = estimate_bytes(rows)
+        return rows
+
+# Set once the attendance_compact view turns out to be missing (migrations/add_attendance_flags.sql not run)
+_compact_view_missing = False
+
+def _attendance_query(query, between, page, filters):
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    if between is not None:
+        query = query.gte('session_date', between[0]).lt('session_date', between[1])
+    if page is not None:
+        query = query.order('id').range(*page)
+    return query
+
+def _select_attendance(supabase, between=None, page=None, **filters):
+    """Attendance rows matching column=value filters, with the six flags packed into 'flags'
+
+    between=(start, end) keeps session dates from start up to (not including) end,
+    and page=(first, last) returns only those rows (inclusive) in id order.
+    Reads the attendance_compact view, a few narrow columns per row; until
+    the migration is run, full rows are read and packed here instead.
+    """
+    global _compact_view_missing
+    if not _compact_view_missing:
+        try:
+            query = _attendance_query(supabase.table('attendance_compact').select("*"), between, page, filters)
+            return query.execute().data or []
+        except Exception as e:
+            # 42P01/PGRST205: no such relation; the local backend raises ValueError
+            if not (getattr(e, 'code', None) in ('42P01', 'PGRST205') or isinstance(e, ValueError)):
+                raise
+            _compact_view_missing = True
+    query = _attendance_query(supabase.table('attendance').select("*"), between, page, filters)
+    return [pack_row(row) for row in query.execute().data or []]
+
+def _create_change_feed():
+    """Change-event feed for the shared cache, or None when realtime is disabled"""
+    config = get_config("realtime")
+    if not config.get("enabled", False):
+        return None
+    if config.get("feed") == "local":
+        return LocalChangeFeed()
+    return SupabaseChangeFeed(get_secret("supabase", "url"), get_secret("supabase", "key"))
+
+# Attendance counts by month, class, sponsorship, gender and grade, kept current from cache changes
+rollup_cube = RollupCube()
+
+# Each child's last attendance and participation, for the follow-up list
+absence_tracker = AbsenceTracker()
+
+# Local SQL copy of children and attendance for report queries, when [replica] is enabled
+_replica = None
+
+# Held at module level so every session and headless caller shares it
+_table_cache = None
+_table_cache_lock = threading.Lock()
+
+def get_table_cache():
+    """Table cache shared by all sessions, subscribed to change events when realtime is enabled"""
+    global _table_cache, _replica
+    with _table_cache_lock:
+        if _table_cache is None:
+            # Attendance rows are kept with their flags packed into one int
+            cache = TableCache(_fetch_rows, ttl=CACHE_TTL, normalize={'attendance': pack_row})
+            cache.observe(lambda table, old, new: rollup_cube.apply(
+                table, old, new, lambda child_id: cache.row('children', child_id)
+            ))
+            cache.observe(absence_tracker.apply)
+            replica = get_config("replica")
+            if replica.get("enabled"):
+                _replica = AnalyticsReplica(replica.get("path", ":memory:"))
+                cache.observe(_replica.record)
+            cache.feed = _create_change_feed()
+            if cache.feed is not None:
+                cache.feed.subscribe(cache.apply)
+                cache.feed.on_status(cache.set_connected)
+                cache.feed.start()
+            _table_cache = cache
+        return _table_cache
+
+def data_version():
+    """Cheap token that changes whenever the data behind reports may have changed
+
+    Change events and our own writes bump the cache version; without a live
+    feed, other writers are only noticed once per CACHE_TTL.
+    """
+    cache = get_table_cache()
+    if cache.connected:
+        return cache.version
+    return (cache.version, int(time.monotonic() // CACHE_TTL))
+
+memo.set_version_source(data_version)
+
+def seconds_to_next_version():
+    """Seconds until data_version changes with the clock, or None while a live feed keeps it"""
+    if get_table_cache().connected:
+        return None
+    return CACHE_TTL - time.monotonic() % CACHE_TTL
+
+def _publish_write(table, event_type, rows):
+    """Apply our own writes to the shared cache right away instead of waiting for a refetch"""
+    if not rows:
+        return
+    cache = get_table_cache()
+    for row in rows:
+        if event_type == 'DELETE':
+            cache.apply(table, 'DELETE', {}, row)
+        else:
+            cache.apply(table, event_type, row, {})
+
+@timed("db.merge_child_names")
+def _merge_child_names(attendance_df, children_df):
+    """Attach child names to attendance rows and fill in any missing tracking columns"""
+    if attendance_df.empty or children_df.empty:
+        return attendance_df
+
+    # Merge attendance with children names, keeping the attendance row id as 'id'
+    attendance_df = attendance_df.merge(
+        children_df[['id', 'full_name']].rename(columns={'id': 'child_id'}),
+        on="child_id",
+        how="left"
+    )
+
+    # Ensure all required columns exist with correct names
+    required_columns = FLAG_COLUMNS + ['child_id', 'session_date', 'full_name', 'id']
+
+    # Add any missing columns with default values
+    for col in required_columns:
+        if col not in attendance_df.columns:
+            attendance_df[col] = False if col in FLAG_COLUMNS else None
+
+    return attendance_df
+
+def _attendance_with_names(cache):
+    return _merge_child_names(unpack_frame(cache.frame('attendance')), cache.frame('children'))
+
+def load_tables(*names):
+    """Load datasets ('children', 'attendance') by name, fetching any stale tables concurrently
+
+    Attendance is joined to the same children frame that load_children serves,
+    so a cold load costs one round trip per table, all in flight together.
+    """
+    with track("db.load_tables") as span:
+        supabase = get_supabase_client()
+        cache = get_table_cache()
+        tables = sorted(set(names) | ({'children'} if 'attendance' in names else set()))
+        try:
+            # Resolve the client here so worker threads share it
+            fetched = cache.ensure_loaded(tables, lambda table: _fetch_rows(table, supabase))
+        except Exception as e:
+            raise DataError(f"loading {', '.join(tables)} data", e) from e
+        if cache.last_error is not None:
+            logger.warning("Showing the last loaded data; could not refresh: %s", cache.last_error)
+        if 'children' in tables and not _enrollment_backfilled:
+            _backfill_enrollment_starts(supabase)
+
+        frames = {}
+        for name in names:
+            if name == 'attendance':
+                frames[name] = cache.frame('attendance_named', _attendance_with_names)
+            else:
+                frames[name] = cache.frame(name)
+        span.cache_hit = not fetched
+        span.rows = sum(len(frame) for frame in frames.values())
+        return frames
+
+@timed("db.load_rollup")
+def load_rollup():
+    """Rollup cube over the current data, rebuilt only when it went stale"""
+    supabase = get_supabase_client()
+    cache = get_table_cache()
+    try:
+        cache.ensure_loaded(['children', 'attendance'], lambda table: _fetch_rows(table, supabase))
+        if rollup_cube.stale:
+            with track("rollup.rebuild") as span:
+                cache.with_rows(['children', 'attendance'], rollup_cube.rebuild)
+                span.rows = len(rollup_cube)
+        return rollup_cube
+    except Exception as e:
+        raise DataError("loading rollup data", e) from e
+
+@timed("db.load_absence_tracker")
+def load_absence_tracker():
+    """Absence tracker over the current attendance, rebuilt only when it went stale"""
+    supabase = get_supabase_client()
+    cache = get_table_cache()
+    try:
+        cache.ensure_loaded(['attendance'], lambda table: _fetch_rows(table, supabase))
+        if absence_tracker.stale:
+            cache.with_rows(['attendance'], absence_tracker.rebuild)
+        return absence_tracker
+    except Exception as e:
+        raise DataError("loading attendance history", e) from e
+
+# Background rebuild of the replica, while one runs
+_replica_rebuild = None
+_replica_rebuild_lock = threading.Lock()
+
+def load_replica():
+    """Analytics replica caught up with the current data, or None when [replica] is not enabled or not ready
+
+    Changes queued since the last query are applied here. A replica that
+    needs rebuilding (first use, a refetched table, too many queued changes)
+    is rebuilt in the background instead, and None is returned meanwhile so
+    reports ask the database rather than wait for it or read a stale copy.
+    """
+    cache = get_table_cache()
+    if _replica is None:
+        return None
+    with track("db.load_replica") as span:
+        supabase = get_supabase_client()
+        try:
+            cache.ensure_loaded(['children', 'attendance'], lambda table: _fetch_rows(table, supabase))
+            if _replica.stale:
+                _start_replica_rebuild(cache)
+                return None
+            span.rows = _replica.sync(cache)
+            return _replica
+        except Exception as e:
+            raise DataError("syncing analytics replica", e) from e
+
+def _start_replica_rebuild(cache):
+    """Rebuild the replica from the cached tables on a background thread, unless one is running"""
+    global _replica_rebuild
+    with _replica_rebuild_lock:
+        if _replica_rebuild is not None and _replica_rebuild.is_alive():
+            return
+        _replica_rebuild = threading.Thread(target=_rebuild_replica, args=(cache,), name="replica-rebuild", daemon=True)
+        _replica_rebuild.start()
+
+def _rebuild_replica(cache):
+    try:
+        with track("replica.rebuild") as span:
+            span.rows = _replica.sync(cache)
+    except Exception as e:
+        # Still stale, so the next report starts another rebuild
+        logger.warning("Could not rebuild the analytics replica: %s", e)
+
+# Report functions found missing in the database (migrations/report_functions.sql not run)
+_missing_functions = set()
+
+@memo.memoize
+def call_report_function(name, supabase=None, **params):
+    """Run a report aggregation function in the database and return its result
+
+    With [replica] enabled, report functions run on the local replica instead,
+    and in the database while the replica is being rebuilt. Returns None when the function is not installed or the call fails, so callers
+    can fall back to computing the report from the full tables.
+    """
+    if name in REPORT_FUNCTIONS:
+        try:
+            replica = load_replica()
+            if replica is not None:
+                with track(f"replica.rpc.{name}"):
+                    return replica.rpc(name, **params)
+        except Exception as e:
+            logger.warning("Report function %s failed on the replica, asking the database: %s", name, e)
+    if name in _missing_functions:
+        return None
+    try:
+        supabase = supabase or get_supabase_client()
+    except DataError:
+        return None
+    with track(f"supabase.rpc.{name}") as span:
+        try:
+            response = supabase.rpc(name, params).execute()
+        except Exception as e:
+            # PGRST202: no function with this name/signature in the schema cache
+            if getattr(e, 'code', None) == 'PGRST202' or isinstance(e, ValueError):
+                _missing_functions.add(name)
+            span.error = True
+            return None
+        span.rows = len(response.data) if isinstance(response.data, list) else 1
+        span.bytes = estimate_bytes(response.data if isinstance(response.data, list) else [response.data])
+        return response.data
+
+@memo.memoize
+def load_attendance_on(session_date):
+    """Load one day's attendance rows with child names, without fetching the whole table
+
+    Days in archived years are read from the archive.
+    """
+    if get_archive().covers(session_date):
+        return load_attendance_between(session_date, pd.Timestamp(session_date) + pd.Timedelta(days=1))
+    with track("supabase.select.attendance_day") as span:
+        supabase = get_supabase_client()
+        try:
+            rows = _select_attendance(supabase, session_date=session_date)
+            span.rows = len(rows)
+            span.bytes = estimate_bytes(rows)
+            attendance_df = unpack_frame(pd.DataFrame(rows))
+            return _merge_child_names(attendance_df, load_children())
+        except Exception as e:
+            raise DataError("loading attendance data", e) from e
+
+# Closed years of attendance moved out of the database, opened on first use
+_archive = None
+
+def get_archive():
+    """Attendance archive in the [archive] dir (default "archive"), shared by every caller"""
+    global _archive
+    if _archive is None:
+        _archive = AttendanceArchive(get_config("archive").get("dir", "archive"))
+    return _archive
+
+def _read_archive(start=None, end=None, child_ids=None):
+    """Archived attendance rows with child names, shaped like load_attendance"""
+    with track("archive.read") as span:
+        try:
+            rows = get_archive().read(start, end, child_ids)
+        except Exception as e:
+            raise DataError("reading attendance archive", e) from e
+        span.rows = len(rows)
+        return _merge_child_names(unpack_frame(rows), load_children())
+
+def archived_years():
+    """Years moved to the archive, oldest first"""
+    return get_archive().years()
+
+def is_archived(start, end=None):
+    """Whether the dates from start up to (not including) end are all in archived years"""
+    return get_archive().covers(start, end)
+
+def _not_in_database(archived, attendance_df):
+    """Archived rows whose ids the attendance table no longer holds
+
+    A year archived without deleting its rows is still in the table, whose
+    copy is current and counted already; only the deleted rows come from the archive.
+    """
+    if archived.empty or attendance_df.empty:
+        return archived
+    return archived[~archived['id'].isin(attendance_df['id'])]
+
+@memo.memoize
+def load_attendance_between(start, end):
+    """Attendance with child names for session dates in [start, end), archived years included
+
+    Only the archive partitions overlapping the range are read; rows also
+    still in the database are taken from the database.
+    """
+    start, end = pd.Timestamp(start).strftime('%Y-%m-%d'), pd.Timestamp(end).strftime('%Y-%m-%d')
+    attendance_df = load_attendance()
+    frames = []
+    if get_archive().overlapping(start, end):
+        frames.append(_not_in_database(_read_archive(start, end), attendance_df))
+    if not attendance_df.empty:
+        frames.append(attendance_df[attendance_df['session_date'].between(start, end, inclusive='left')])
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=['id'] + FLAG_COLUMNS + ['child_id', 'session_date', 'full_name'])
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+
+@memo.memoize
+def with_archived_history(attendance_df, child_ids):
+    """attendance_df plus some children's archived rows it does not hold, e.g. a child's class for their profile
+
+    child_ids is a tuple, so the result is memoized by the children rather than the object.
+    """
+    if not get_archive().years():
+        return attendance_df
+    archived = _not_in_database(_read_archive(child_ids=list(child_ids)), attendance_df)
+    if archived.empty:
+        return attendance_df
+    return pd.concat([archived, attendance_df], ignore_index=True)
+
+@memo.memoize
+def load_archive_summary():
+    """Rollup cells of the archived rows the database no longer holds, for pivots over the whole history
+
+    Years whose rows were kept in the database are counted by the live
+    rollup and left out; a year only partly deleted is summarized from its
+    deleted rows.
+    """
+    archive = get_archive()
+    try:
+        years = archive.years()
+        if not years:
+            return archive.summary([])
+        live_ids = load_attendance().get('id', pd.Series(dtype='int64'))
+        deleted, frames = [], []
+        for year in years:
+            kept = archive.ids(year).isin(live_ids)
+            if not kept.any():
+                deleted.append(year)
+            elif not kept.all():
+                rows = archive.read(*year_bounds(year))
+                children_rows = get_table_cache().with_rows(['children'], lambda rows: rows)
+                frames.append(summarize(children_rows, rows[~rows['id'].isin(live_ids)]))
+        return pd.concat([archive.summary(deleted)] + frames, ignore_index=True)
+    except DataError:
+        raise
+    except Exception as e:
+        raise DataError("reading attendance archive", e) from e
+
+# Rows deleted per request by archive_year
+ARCHIVE_CHUNK = 500
+
+# Rows read per request by archive_year; PostgREST cuts responses at max-rows (1000 by default)
+ARCHIVE_PAGE = 1000
+
+def _select_attendance_paged(supabase, between, page_size=ARCHIVE_PAGE):
+    """Every attendance row in the date range, read a page at a time in id order until a short page"""
+    rows = []
+    while True:
+        page = _select_attendance(supabase, between=between, page=(len(rows), len(rows) + page_size - 1))
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+def _select_column_paged(supabase, table, column, page_size=ARCHIVE_PAGE):
+    """One column of every row of a table, read a page at a time in id order until a short page"""
+    values = []
+    while True:
+        page = supabase.table(table).select(f"id, {column}").order('id').range(
+            len(values), len(values) + page_size - 1
+        ).execute().data or []
+        values.extend(row[column] for row in page)
+        if len(page) < page_size:
+            return values
+
+def _count_attendance(supabase, between):
+    """Number of attendance rows in the date range, counted by the database"""
+    response = supabase.table('attendance').select("id", count='exact').gte(
+        'session_date', between[0]
+    ).lt('session_date', between[1]).limit(1).execute()
+    return response.count
+
+def archive_deletes():
+    """Whether archived rows are deleted from the database by default ([archive] delete, on unless set false)"""
+    return bool(get_config("archive").get("delete", True))
+
+@timed("db.archive_year")
+def archive_year(year, delete=None):
+    """Move a closed year's attendance into the archive, deleting it from the database
+
+    The rows are read a month at a time, page by page, and their number
+    checked against the database's own count for the year before the
+    partition is written; the partition is then read back to check every
+    row arrived, and discarded if not. Only then are the rows deleted from
+    the database, by id, after children's enrollment starts are stored,
+    since reports can no longer derive them from the deleted rows, so the
+    database and the shared cache hold just the open years. delete=False
+    (or [archive] delete = false when delete is None) keeps them there too,
+    for an archive directory not on durable, backed-up storage: with the
+    rows deleted it is the only copy. Returns the partition's metadata.
+    """
+    if delete is None:
+        delete = archive_deletes()
+    year = int(year)
+    if year >= datetime.now().year:
+        raise ValueError(f"{year} is not closed yet; only past years can be archived")
+    archive = get_archive()
+    if year in archive.years():
+        raise ValueError(f"{year} is already archived")
+    supabase = get_supabase_client()
+    try:
+        rows = []
+        for month in range(1, 13):
+            start = f"{year:04d}-{month:02d}-01"
+            end = f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+            rows.extend(_select_attendance_paged(supabase, (start, end)))
+        if not rows:
+            raise ValueError(f"No attendance in {year} to archive")
+        expected = _count_attendance(supabase, year_bounds(year))
+        if expected != len(rows):
+            raise ValueError(f"Read {len(rows)} rows of {year} but the database counts {expected}; nothing was written")
+        children_rows = _fetch_rows('children', supabase)
+
+        meta = archive.write(year, rows, children_rows)
+        stored = archive.read(*year_bounds(year))
+        if len(stored) != expected or set(stored['id']) != {row['id'] for row in rows}:
+            archive.discard(year)
+            raise ValueError(f"Archive of {year} does not match the database; it was discarded")
+        # Archive reads are memoized under the table cache's version, which a new partition does not change
+        memo.cache.clear()
+        if delete:
+            # While the rows are still there, so a missing start is derived from all of them
+            first_dates = {}
+            for row in rows:
+                child_id = row['child_id']
+                first_dates[child_id] = min(row['session_date'], first_dates.get(child_id, row['session_date']))
+            for child_id, first in first_dates.items():
+                _update_enrollment_start(supabase, child_id, first)
+
+            ids = [row['id'] for row in rows]
+            for start in range(0, len(ids), ARCHIVE_CHUNK):
+                response = supabase.table('attendance').delete().in_('id', ids[start:start + ARCHIVE_CHUNK]).execute()
+                _publish_write('attendance', 'DELETE', response.data)
+        return meta
+    except Exception as e:
+        raise DataError(f"archiving {year}", e) from e
+
+@memo.memoize
+def load_calendar():
+    """Calendar of the sessions that ran, shared by every report
+
+    Comes from the sessions table; while that is empty (or not migrated yet)
+    the attendance dates are used, and copied into the table when possible.
+    """
+    supabase = get_supabase_client()
+    cache = get_table_cache()
+    try:
+        cache.ensure_loaded(['sessions'], lambda table: _fetch_rows(table, supabase))
+        sessions_df = cache.frame('sessions')
+        if not sessions_df.empty:
+            return SessionCalendar(sessions_df.to_dict('records'))
+    except Exception:
+        # No sessions table yet; fall back to the attendance dates below
+        pass
+
+    try:
+        with track("supabase.select.session_dates") as span:
+            # Paged, as PostgREST cuts a response at max-rows
+            dates = sorted(set(_select_column_paged(supabase, 'attendance', 'session_date')))
+            span.rows = len(dates)
+        if dates:
+            _backfill_sessions(supabase, dates)
+        return SessionCalendar.from_dates(dates)
+    except Exception as e:
+        raise DataError("loading sessions calendar", e) from e
+
+def _backfill_sessions(supabase, dates):
+    """Record past attendance dates as held sessions"""
+    try:
+        rows = [{'session_date': date, 'status': 'held'} for date in dates]
+        response = supabase.table('sessions').insert(rows).execute()
+        _publish_write('sessions', 'INSERT', response.data)
+    except Exception:
+        # Read-only key or table not migrated; the calendar is derived again next time
+        pass
+
+def _ensure_session(supabase, session_date):
+    """Add a held session for a date that gets its first attendance"""
+    try:
+        if load_calendar().has_session(session_date):
+            return
+        response = supabase.table('sessions').insert({'session_date': session_date, 'status': 'held'}).execute()
+        _publish_write('sessions', 'INSERT', response.data)
+    except Exception:
+        pass
+
+@timed("db.save_session")
+def save_session(session_data):
+    """Add or update a sessions calendar entry (held, cancelled or holiday) for all classes or one class"""
+    supabase = get_supabase_client()
+    try:
+        query = supabase.table('sessions').select("*").eq('session_date', session_data['session_date'])
+        existing = [
+            row for row in query.execute().data or []
+            if (row.get('class_group') or None) == (session_data.get('class_group') or None)
+        ]
+        if existing:
+            response = supabase.table('sessions').update({
+                'status': session_data['status'],
+                'note': session_data.get('note'),
+            }).eq('id', existing[0]['id']).execute()
+        else:
+            response = supabase.table('sessions').insert(session_data).execute()
+        
+        _publish_write('sessions', 'UPDATE' if existing else 'INSERT', response.data)
+        return True if response.data else False
+    except Exception as e:
+        raise DataError("saving session", e) from e
+
+def load_children():
+    """Load children data from the shared cache"""
+    return load_tables('children')['children']
+
+def load_attendance():
+    """Load attendance data with child names from the shared cache"""
+    return load_tables('attendance')['attendance']
+
+def clear_cache(*tables, resync=False):
+    """Mark cached tables (all if none given) for refetch on the next load
+
+    While change events keep the cache current, tables are only refetched
+    when resync is requested.
+    """
+    cache = get_table_cache()
+    if resync or not cache.connected:
+        cache.invalidate(*tables)
+        # Report functions may have read rows the table cache never saw
+        memo.cache.clear()
+
+@timed("db.save_child")
+def save_child(child_data):
+    """Save child data to Supabase"""
+    supabase = get_supabase_client()
+    try:
+        response = supabase.table('children').insert(child_data).execute()
+        _publish_write('children', 'INSERT', response.data)
+        return True if response.data else False
+    except Exception as e:
+        raise DataError("saving child data", e) from e
+
+@timed("db.update_child")
+def update_child(child_id, child_data):
+    """Update child data in Supabase"""
+    supabase = get_supabase_client()
+    try:
+        response = supabase.table('children').update(child_data).eq('id', child_id).execute()
+        _publish_write('children', 'UPDATE', response.data)
+        return True if response.data else False
+    except Exception as e:
+        raise DataError("updating child data", e) from e
+
+@timed("db.delete_child")
+def delete_child(child_id):
+    """Delete a child and their attendance records from Supabase"""
+    supabase = get_supabase_client()
+    try:
+        attendance = supabase.table('attendance').delete().eq('child_id', child_id).execute()
+        _publish_write('attendance', 'DELETE', attendance.data)
+        response = supabase.table('children').delete().eq('id', child_id).execute()
+        _publish_write('children', 'DELETE', response.data)
+        return True
+    except Exception as e:
+        raise DataError("deleting child", e) from e
+
+@timed("db.delete_attendance")
+def delete_attendance(child_id, session_date):
+    """Remove a child's mark for a date, e.g. Present unticked; a mark is what counts as attending"""
+    supabase = get_supabase_client()
+    try:
+        response = supabase.table('attendance').delete().eq('child_id', child_id).eq(
+            'session_date', session_date
+        ).execute()
+        _publish_write('attendance', 'DELETE', response.data)
+        return True
+    except Exception as e:
+        raise DataError("deleting attendance", e) from e
+
+# Set once children stored without an enrollment start have had it filled in, per connection
+_enrollment_backfilled = False
+_backfill_lock = threading.Lock()
+
+# Children whose attendance is read per request by _backfill_enrollment_starts
+BACKFILL_CHUNK = 100
+
+def _backfill_enrollment_starts(supabase):
+    """Store the enrollment start of children with attendance but none stored, once per connection
+
+    Children saved before the column existed have none (the migration fills
+    them in on Supabase; the local backend adds the column empty). Their
+    attendance is read here once, page by page, so reports look each
+    child's start up instead of deriving it from the whole table.
+    """
+    global _enrollment_backfilled
+    with _backfill_lock:
+        # Another session may have filled them in while this one waited
+        if _enrollment_backfilled:
+            return
+        missing = get_table_cache().with_rows(['children'], lambda rows: [
+            row['id'] for row in rows if 'enrollment_start' in row and row['enrollment_start'] is None
+        ])
+        try:
+            rows = []
+            for start in range(0, len(missing), BACKFILL_CHUNK):
+                chunk, read = missing[start:start + BACKFILL_CHUNK], 0
+                while True:
+                    page = supabase.table('attendance').select("id, child_id, session_date").in_(
+                        'child_id', chunk
+                    ).order('id').range(read, read + ARCHIVE_PAGE - 1).execute().data or []
+                    rows.extend(page)
+                    read += len(page)
+                    if len(page) < ARCHIVE_PAGE:
+                        break
+            starts = compute_enrollment_starts(pd.DataFrame(rows, columns=['id', 'child_id', 'session_date']))
+            for child_id, first in starts.items():
+                response = supabase.table('children').update(
+                    {'enrollment_start': first.strftime('%Y-%m-%d')}
+                ).eq('id', int(child_id)).execute()
+                _publish_write('children', 'UPDATE', response.data)
+        except Exception as e:
+            # Reports count these children as not enrolled until it is stored
+            logger.warning("Could not store enrollment starts: %s", e)
+        _enrollment_backfilled = True
+
+def _update_enrollment_start(supabase, child_id, session_date):
+    """Move the child's stored enrollment start if this attendance changes it
+
+    Uses the cached children row when loaded, so most writes cost no extra
+    round trip; only a changed value is written back.
+    """
+    try:
+        child = get_table_cache().row('children', child_id)
+        if child is None:
+            response = supabase.table('children').select("id, enrollment_start").eq('id', child_id).execute()
+            if not response.data:
+                return
+            child = response.data[0]
+        current = child.get('enrollment_start')
+        if current is None:
+            # Never stored (or written before the column existed): derive it from all their rows once
+            rows = supabase.table('attendance').select("session_date").eq('child_id', child_id).execute()
+            updated = enrollment_start_from_dates(row['session_date'] for row in rows.data or [])
+            if updated is None:
+                return
+        else:
+            updated = next_enrollment_start(current, session_date)
+        updated = updated.strftime('%Y-%m-%d')
+        if updated == current:
+            return
+        response = supabase.table('children').update({'enrollment_start': updated}).eq('id', child_id).execute()
+        _publish_write('children', 'UPDATE', response.data)
+    except Exception:
+        # The column may not be migrated yet; reports then derive it from attendance
+        pass
+
+# Marks sent per upsert request by import_attendance
+IMPORT_CHUNK = 500
+
+@timed("db.import_attendance")
+def import_attendance(marks, chunk_size=IMPORT_CHUNK):
+    """Save imported marks (child_id, session_date and the six flags per row) in chunked upserts
+
+    The imported flags replace any saved for the same child and date, so
+    importing a sheet twice saves the same rows. Afterwards enrollment starts
+    move to each child's earliest imported date where that is earlier, and
+    dates missing from the sessions calendar are added as held. Returns the
+    number of rows saved.
+    """
+    supabase = get_supabase_client()
+    records = marks[['child_id', 'session_date'] + FLAG_COLUMNS].astype({'child_id': 'int64'}).to_dict('records')
+    saved = _upsert_attendance(supabase, records, chunk_size, "importing attendance")
+    _after_bulk_save(supabase, records)
+    return saved
+
+def _upsert_attendance(supabase, records, chunk_size, operation):
+    """Upsert attendance rows in chunks, one row per child and date; returns the rows saved
+
+    Only the columns in the records are written, so flags left out keep
+    their saved values.
+    """
+    saved = 0
+    try:
+        for start in range(0, len(records), chunk_size):
+            response = supabase.table('attendance').upsert(
+                records[start:start + chunk_size], on_conflict='child_id,session_date'
+            ).execute()
+            _publish_write('attendance', 'UPDATE', response.data)
+            saved += len(response.data or [])
+    except Exception as e:
+        raise DataError(f"{operation} ({saved} of {len(records)} rows saved)", e) from e
+    return saved
+
+def _after_bulk_save(supabase, records):
+    """Move enrollment starts to each child's earliest saved date and add missing sessions as held"""
+    firsts = {}
+    for record in records:
+        child_id = int(record['child_id'])
+        firsts[child_id] = min(record['session_date'], firsts.get(child_id, record['session_date']))
+    for child_id, first in firsts.items():
+        _update_enrollment_start(supabase, child_id, first)
+    calendar = load_calendar()
+    new_dates = sorted({
+        record['session_date'] for record in records if not calendar.has_session(record['session_date'])
+    })
+    if new_dates:
+        _backfill_sessions(supabase, new_dates)
+
+# Check-ins sent per upsert request by save_checkins
+CHECKIN_CHUNK = 200
+
+@timed("db.save_checkins")
+def save_checkins(checkins, chunk_size=CHECKIN_CHUNK):
+    """Save kiosk check-ins (child_id, session_date, early) as present in chunked upserts
+
+    Only present and early are written; the other flags a teacher may have
+    marked are kept. Returns the number of rows saved.
+    """
+    supabase = get_supabase_client()
+    records = [
+        {'child_id': int(c['child_id']), 'session_date': c['session_date'], 'present': True, 'early': bool(c['early'])}
+        for c in checkins
+    ]
+    saved = _upsert_attendance(supabase, records, chunk_size, "saving check-ins")
+    _after_bulk_save(supabase, records)
+    return saved
+
+# Set once merge_attendance turns out to be missing (migrations/add_attendance_merge.sql not run)
+_merge_function_missing = False
+
+@timed("db.save_attendance")
+def save_attendance(attendance_data, base=None):
+    """Save one child's attendance for a date, merging it with concurrent saves
+
+    base is the mark as the teacher saw it (a row with 'flags' and
+    'version'), or None if it was unmarked. Only the flags that differ from
+    it are written, in one atomic merge, so teachers marking at the same
+    time never undo each other's changes. Returns the saved row, with
+    'merged' set if other saves updated the mark after base was loaded
+    (also counted as db.save_attendance.merged), or None if nothing was saved.
+    """
+    supabase = get_supabase_client()
+    provided = pack({name: True for name in FLAG_COLUMNS if name in attendance_data})
+    values = pack(attendance_data)
+    expected = 0 if base is None else pack(base, base.get('flags'))
+    # An unmarked base is version 0, so a mark inserted by someone else meanwhile is seen too
+    version = 0 if base is None else None if pd.isna(base.get('version')) else int(base['version'])
+    mask = (values ^ expected) & provided
+    if base is not None and not mask:
+        return {**base, 'merged': False}
+    try:
+        if _merge_function_missing:
+            rows = _save_attendance_fields(supabase, attendance_data, mask)
+        else:
+            rows = _merge_attendance(supabase, attendance_data, mask, values)
+    except Exception as e:
+        raise DataError("saving attendance data", e) from e
+
+    _publish_write('attendance', 'UPDATE', rows)
+    if not rows:
+        return None
+    # None when the database has no version column yet; then neither check can be made
+    saved_version = rows[0].get('version')
+    merged = version is not None and saved_version is not None and saved_version > version + 1
+    if merged:
+        # Someone saved this mark after it was loaded; their other flags were kept
+        with track("db.save_attendance.merged") as span:
+            span.rows = 1
+    if saved_version == 1:
+        # A new mark
+        _update_enrollment_start(supabase, attendance_data['child_id'], attendance_data['session_date'])
+        _ensure_session(supabase, attendance_data['session_date'])
+    return {**rows[0], 'merged': merged}
+
+def _merge_attendance(supabase, attendance_data, mask, values):
+    """Run the merge_attendance database function and return the saved row"""
+    global _merge_function_missing
+    try:
+        response = supabase.rpc('merge_attendance', {
+            'p_child_id': int(attendance_data['child_id']),
+            'p_session_date': attendance_data['session_date'],
+            'p_mask': mask,
+            'p_values': values,
+        }).execute()
+    except Exception as e:
+        # PGRST202: no function with this name/signature in the schema cache
+        if getattr(e, 'code', None) != 'PGRST202':
+            raise
+        _merge_function_missing = True
+        return _save_attendance_fields(supabase, attendance_data, mask)
+    return response.data or []
+
+def _save_attendance_fields(supabase, attendance_data, mask):
+    """Read-then-write save of the flags in mask, for databases without merge_attendance
+
+    Not atomic: two saves racing for the same new mark can still both insert.
+    """
+    fields = {name: bool(attendance_data.get(name)) for name, bit in FLAG_BITS.items() if mask & bit}
+    existing = supabase.table('attendance').select("id").eq(
+        'child_id', attendance_data['child_id']
+    ).eq(
+        'session_date', attendance_data['session_date']
+    ).execute()
+    if existing.data:
+        fields['updated_at'] = datetime.now().isoformat()
+        response = supabase.table('attendance').update(fields).eq('id', existing.data[0]['id']).execute()
+    else:
+        response = supabase.table('attendance').insert({
+            'child_id': attendance_data['child_id'],
+            'session_date': attendance_data['session_date'],
+            'created_at': datetime.now().isoformat(),
+            **fields
+        }).execute()
+        # A new row is the first version, even where the column does not exist yet
+        for row in response.data or []:
+            row.setdefault('version', 1)
+    return response.data or []
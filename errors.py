@@ -0,0 +1,15 @@
+class DataError(Exception):
+    """A data operation that failed, with what was being done and why
+
+    str() gives the message shown to users, e.g.
+    "Error saving child data: duplicate key value".
+    """
+
+    def __init__(self, operation, cause=None):
+        self.operation = operation
+        self.cause = cause
+        super().__init__(f"Error {operation}: {str(cause)}" if cause is not None else f"Error {operation}")
+
+
+class ConfigError(DataError):
+    """A required secrets/config value is missing"""
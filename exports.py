@@ -0,0 +1,227 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from metrics import track
+from reports import (
+    monthly_class_details_from_tallies,
+    monthly_ocm_details_from_tallies,
+    sunday_class_details,
+    sunday_ocm_details
+)
+
+# Finished files kept for instant re-download; the oldest are dropped first
+MAX_CACHED_FILES = 32
+
+# Per-child sheets are cut off here so very large rosters still export quickly
+MAX_SHEET_ROWS = 20000
+
+PARTICIPATION_LABELS = {
+    'early': 'Early',
+    'has_book': 'Book',
+    'has_pen': 'Pen',
+    'has_bible': 'Bible',
+    'gave_offering': 'Offering',
+}
+
+MIME_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+
+def _limit(df):
+    """Cap a sheet at MAX_SHEET_ROWS, noting how many rows were left out"""
+    if df is None or len(df) <= MAX_SHEET_ROWS:
+        return df
+    note = pd.DataFrame([{df.columns[0]: f"... {len(df) - MAX_SHEET_ROWS} more rows not exported"}])
+    return pd.concat([df.head(MAX_SHEET_ROWS), note], ignore_index=True)
+
+
+def sunday_sheets(report, selected_date):
+    """Sheets of the Sunday Attendance export, in workbook order"""
+    participation = report['participation'] or {}
+    summary = [
+        ('Date', selected_date),
+        ('Total Children', report['total_children']),
+        ('Present', report['total_present']),
+        ('Absent', report['total_absent']),
+    ] + [(label, participation.get(col, 0)) for col, label in PARTICIPATION_LABELS.items()]
+
+    classes, present, absent = [], [], []
+    for section in report['classes']:
+        counts = section['participation'] or {}
+        classes.append({
+            'Class': section['name'],
+            'Total': section['total'],
+            'Present': section['present'],
+            'Absent': section['absent'],
+            **{label: counts.get(col, 0) for col, label in PARTICIPATION_LABELS.items()},
+        })
+        present_details, absent_children = sunday_class_details(
+            report['children'], report['daily_attendance'], section['name']
+        )
+        if present_details is not None:
+            present.append(present_details.assign(Class=section['name']))
+        if absent_children is not None:
+            absent.append(absent_children.rename(columns={'full_name': 'Name'}).assign(Class=section['name']))
+
+    sheets = {
+        'Summary': pd.DataFrame(summary, columns=['Metric', 'Value']),
+        'Classes': pd.DataFrame(classes),
+        'Present': pd.concat(present, ignore_index=True) if present else pd.DataFrame(),
+        'Absent': pd.concat(absent, ignore_index=True) if absent else pd.DataFrame(),
+    }
+    ocm = report['ocm']
+    if ocm is not None:
+        present_details, absent_children = sunday_ocm_details(report['children'], report['daily_attendance'])
+        if present_details is not None:
+            sheets['OCM Present'] = present_details
+        if absent_children is not None:
+            sheets['OCM Absent'] = absent_children.rename(columns={'full_name': 'Name', 'class_group': 'Class'})
+    return sheets
+
+
+def monthly_sheets(report, period, tallies=None, ocm_tallies=None, calendar=None):
+    """Sheets of the Monthly Summary export, in workbook order
+
+    Per-child sheets are built from monthly_child_tallies rows when given,
+    with available sessions from the sessions calendar if there is one.
+    """
+    summary = [
+        ('Month', period),
+        ('Total Sessions', report['total_sessions']),
+        ('Total Children', report['total_children']),
+        ('Avg. Attendance', round(report['avg_attendance'], 1)),
+        ('Attendance Rate %', round(report['attendance_rate'], 1)),
+    ]
+
+    classes = []
+    for section in report['classes']:
+        row = {'Class': section['name'], 'Total': section.get('total'), 'Attended': section['attended']}
+        if section['attended'] > 0:
+            row.update({
+                'Avg. Attendance': round(section['avg_attendance'], 1),
+                'Attendance Rate %': round(section['attendance_rate'], 1),
+                **{f"{label} %": round(section['participation'][col], 1) for col, label in PARTICIPATION_LABELS.items()},
+            })
+        classes.append(row)
+
+    sheets = {
+        'Summary': pd.DataFrame(summary, columns=['Metric', 'Value']),
+        'Trends': report['trends_df'],
+        'Classes': pd.DataFrame(classes),
+    }
+    if tallies:
+        details = []
+        for section in report['classes']:
+            class_tallies = [t for t in tallies if t['class_group'] == section['name']]
+            class_details = monthly_class_details_from_tallies(class_tallies, report['total_sessions'], calendar)
+            if class_details is not None:
+                details.append(pd.concat({section['name']: class_details}, names=['Class']).reset_index(0))
+        if details:
+            sheets['Child Details'] = pd.concat(details, ignore_index=True)
+    ocm = report['ocm']
+    if ocm is not None and ocm['attended'] > 0:
+        sheets['OCM'] = pd.DataFrame([
+            ('Total OCM Children', ocm['total']),
+            ('Avg. Attendance', round(ocm['avg_attendance'], 1)),
+            ('Attendance Rate %', round(ocm['attendance_rate'], 1)),
+        ] + [(f"{label} %", round(ocm['participation'][col], 1)) for col, label in PARTICIPATION_LABELS.items()],
+            columns=['Metric', 'Value'])
+        if ocm_tallies:
+            sheets['OCM Details'] = monthly_ocm_details_from_tallies(ocm_tallies, report['total_sessions'])
+    return sheets
+
+
+def to_excel(sheets):
+    """Write the sheets to an .xlsx workbook and return its bytes"""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        for name, df in sheets.items():
+            _limit(df).to_excel(writer, sheet_name=name[:31], index=False)
+    return buffer.getvalue()
+
+
+def report_files(title, sheets):
+    """Excel workbook and PDF summary for one report"""
+    return {'xlsx': to_excel(sheets), 'pdf': to_pdf(title, sheets)}
+
+
+def _pdf_text(value):
+    """Core PDF fonts only cover Latin-1, so replace anything else"""
+    if isinstance(value, float):
+        value = f"{value:.1f}"
+    text = str(value).replace('–', '-').replace('—', '-')
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def to_pdf(title, sheets, summary_sheets=('Summary', 'Classes', 'Trends', 'OCM')):
+    """Render the summary sheets as tables in a one-document PDF; per-child lists stay in Excel"""
+    from fpdf import FPDF
+
+    pdf = FPDF(orientation='landscape')
+    pdf.set_auto_page_break(auto=True, margin=12)
+    pdf.add_page()
+    pdf.set_font('Helvetica', 'B', 16)
+    pdf.cell(0, 10, _pdf_text(title), new_x='LMARGIN', new_y='NEXT')
+
+    for name in summary_sheets:
+        df = sheets.get(name)
+        if df is None or df.empty:
+            continue
+        pdf.set_font('Helvetica', 'B', 12)
+        pdf.cell(0, 9, _pdf_text(name), new_x='LMARGIN', new_y='NEXT')
+        pdf.set_font('Helvetica', size=8)
+        with pdf.table(first_row_as_headings=True) as table:
+            table.row([_pdf_text(col) for col in df.columns])
+            for values in df.itertuples(index=False):
+                table.row([_pdf_text('' if pd.isna(v) else v) for v in values])
+        pdf.ln(4)
+    return bytes(pdf.output())
+
+
+class ExportCache:
+    """Build export files on a background worker and keep the finished ones
+
+    build() returns a dict of file bytes by format. Results are keyed by
+    (report type, period, data version), so a repeated download is served
+    from memory until the data changes.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_FILES, max_workers=2):
+        self.max_entries = max_entries
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-export")
+
+    def request(self, key, build):
+        """Return the future for key, starting build() in the background if it is not cached"""
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self._futures.move_to_end(key)
+                return future
+            future = self._executor.submit(self._build, key, build)
+            self._futures[key] = future
+            while len(self._futures) > self.max_entries:
+                self._futures.popitem(last=False)
+            return future
+
+    def _build(self, key, build):
+        with track(f"export.{key[0]}") as span:
+            try:
+                files = build()
+            except Exception:
+                # Drop failures so the next request tries again
+                with self._lock:
+                    self._futures.pop(key, None)
+                raise
+            span.bytes = sum(len(data) for data in files.values())
+            return files
+
+
+exporter = ExportCache()
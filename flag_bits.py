@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Bit of each attendance flag in the packed 'flags' column, as in migrations/add_attendance_flags.sql
+FLAG_BITS = {
+    "present": 1,
+    "early": 2,
+    "has_book": 4,
+    "has_pen": 8,
+    "has_bible": 16,
+    "gave_offering": 32,
+}
+
+FLAG_COLUMNS = list(FLAG_BITS)
+
+# Six bits fit one byte per row
+FLAGS_DTYPE = np.uint8
+
+
+def pack(record, base=0):
+    """Packed flags of a row: base with the bit of every flag column present in record set or cleared"""
+    flags = int(base or 0)
+    for name, bit in FLAG_BITS.items():
+        if name in record:
+            flags = flags | bit if record[name] else flags & ~bit
+    return flags
+
+
+def pack_row(record, old=None):
+    """Copy of a row with its flag columns folded into 'flags'
+
+    A partial update only names the flags it changes, so the others are
+    taken from the row it updates (old).
+    """
+    base = record.get("flags")
+    if base is not None and FLAG_BITS.keys().isdisjoint(record):
+        # Already packed, e.g. read from the attendance_compact view
+        return record
+    if base is None:
+        base = (old or {}).get("flags", 0)
+    packed = {key: value for key, value in record.items() if key not in FLAG_BITS}
+    packed["flags"] = pack(record, base)
+    return packed
+
+
+def has_flag(flags, name):
+    """Boolean array: which of the packed values have the named flag set"""
+    return (np.asarray(flags, dtype=FLAGS_DTYPE) & FLAG_BITS[name]) != 0
+
+
+def flag_matrix(flags, columns=FLAG_COLUMNS):
+    """Rows x columns boolean matrix unpacked from an array of packed flags"""
+    bits = np.array([FLAG_BITS[name] for name in columns], dtype=FLAGS_DTYPE)
+    return (np.asarray(flags, dtype=FLAGS_DTYPE)[:, None] & bits) != 0
+
+
+def flag_counts(flags, columns=FLAG_COLUMNS):
+    """How many of the packed values have each flag set, by flag name"""
+    counts = flag_matrix(flags, columns).sum(axis=0)
+    return {name: int(count) for name, count in zip(columns, counts)}
+
+
+def pack_frame(df):
+    """'flags' column packed from a frame's boolean flag columns (missing ones count as unset)"""
+    flags = np.zeros(len(df), dtype=FLAGS_DTYPE)
+    for name, bit in FLAG_BITS.items():
+        if name in df.columns:
+            flags |= np.where(df[name].fillna(False).astype(bool).to_numpy(), bit, 0).astype(FLAGS_DTYPE)
+    return pd.Series(flags, index=df.index, name="flags")
+
+
+def unpack_frame(df, columns=FLAG_COLUMNS):
+    """Frame with a one-byte 'flags' column and the flag columns derived from it
+
+    Reports keep reading attendance['early'] and friends; the boolean
+    columns take a byte per row each instead of an object pointer.
+    """
+    if df.empty or "flags" not in df.columns:
+        return df
+    df = df.drop(columns=[name for name in columns if name in df.columns])
+    flags = df["flags"].fillna(0).to_numpy().astype(FLAGS_DTYPE)
+    df["flags"] = flags
+    for name, values in zip(columns, flag_matrix(flags, columns).T):
+        df[name] = values
+    return df
@@ -0,0 +1,143 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from flag_bits import FLAG_BITS
+from reports import PARTICIPATION_COLUMNS
+
+# Consecutive missed Sundays that put a child on the follow-up list
+DEFAULT_MIN_ABSENCES = 3
+
+# Attended sessions compared on each side of the participation trend
+TREND_SESSIONS = 4
+
+
+# Bits of the participation flags in a packed attendance row
+PARTICIPATION_MASK = sum(FLAG_BITS[col] for col in PARTICIPATION_COLUMNS)
+
+
+def _score(row):
+    """Share of participation flags a child had at one session"""
+    return bin((row.get("flags") or 0) & PARTICIPATION_MASK).count("1") / len(PARTICIPATION_COLUMNS)
+
+
+class AbsenceTracker:
+    """Per-child attendance state for spotting children who stopped coming
+
+    Keeps each child's attended dates with a participation score, so the
+    last-seen date is a dictionary lookup. Consecutive absences are the held
+    sessions of the child's class after that date, counted from the sessions
+    calendar. Attendance changes update the state as they are applied to the
+    table cache; a full refetch marks it stale and it is rebuilt on next use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._rows = {}
+        self._scores = {}
+        self._last_seen = {}
+        self.stale = True
+
+    def _add(self, row):
+        if row.get("id") is None or row.get("child_id") is None or not row.get("session_date"):
+            return
+        child_id, date = row["child_id"], str(row["session_date"])[:10]
+        self._rows[row["id"]] = (child_id, date)
+        self._scores.setdefault(child_id, {})[date] = _score(row)
+        if date > self._last_seen.get(child_id, ""):
+            self._last_seen[child_id] = date
+
+    def _remove(self, row_id):
+        entry = self._rows.pop(row_id, None)
+        if entry is None:
+            return
+        child_id, date = entry
+        scores = self._scores.get(child_id, {})
+        scores.pop(date, None)
+        if scores:
+            self._last_seen[child_id] = max(scores)
+        else:
+            self._scores.pop(child_id, None)
+            self._last_seen.pop(child_id, None)
+
+    def rebuild(self, attendance_rows):
+        """Recompute every child's state from the full attendance rows"""
+        with self._lock:
+            self._reset()
+            for row in attendance_rows:
+                self._add(row)
+            self.stale = False
+
+    def apply(self, table, old, new):
+        """Update state for one changed attendance row (see TableCache.observe)"""
+        if table != "attendance":
+            return
+        with self._lock:
+            if self.stale:
+                return
+            if old is None and new is None:
+                self.stale = True
+                return
+            if old is not None:
+                self._remove(old.get("id"))
+            if new is not None:
+                self._add(new)
+
+    def last_seen(self, child_id):
+        with self._lock:
+            return self._last_seen.get(child_id)
+
+    def trend(self, child_id, sessions=TREND_SESSIONS):
+        """Participation change in percentage points between the last sessions attended and those before"""
+        with self._lock:
+            scores = self._scores.get(child_id, {})
+            recent = [scores[date] for date in sorted(scores)[-2 * sessions:]]
+        if len(recent) <= sessions:
+            return None
+        before, after = recent[:-sessions], recent[-sessions:]
+        return round((np.mean(after) - np.mean(before)) * 100, 1) + 0.0
+
+    def follow_ups(self, children_df, calendar, min_absences=DEFAULT_MIN_ABSENCES, today=None):
+        """Children who missed at least min_absences held sessions in a row, longest streak first
+
+        Children never seen are counted from the day they were registered.
+        """
+        columns = ["Name", "Class", "Missed Sundays", "Last Seen", "Participation Trend",
+                   "Parent 1", "Parent 1 Contact", "Parent 2", "Parent 2 Contact"]
+        if children_df.empty:
+            return pd.DataFrame(columns=columns)
+        today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+
+        with self._lock:
+            last_seen = children_df["id"].map(self._last_seen)
+        since = pd.to_datetime(last_seen, errors="coerce")
+        if "created_at" in children_df.columns:
+            # Before their first visit a child has only missed the sessions since registering
+            registered = pd.to_datetime(children_df["created_at"], errors="coerce", utc=True).dt.tz_localize(None)
+            since = since.fillna(registered.dt.normalize() - pd.Timedelta(days=1))
+
+        streaks = pd.Series(0, index=children_df.index, dtype="int64")
+        known = since.notna()
+        for class_group, rows in children_df[known].groupby("class_group", dropna=False, sort=False):
+            class_group = None if pd.isna(class_group) else class_group
+            streaks[rows.index] = calendar.count_after(since[rows.index], today, class_group)
+
+        flagged = children_df[streaks >= min_absences]
+        if flagged.empty:
+            return pd.DataFrame(columns=columns)
+        result = pd.DataFrame({
+            "Name": flagged["full_name"],
+            "Class": flagged["class_group"],
+            "Missed Sundays": streaks[flagged.index],
+            "Last Seen": last_seen[flagged.index].fillna("Never"),
+            "Participation Trend": [self.trend(child_id) for child_id in flagged["id"]],
+            "Parent 1": flagged.get("parent1_name"),
+            "Parent 1 Contact": flagged.get("parent1_contact"),
+            "Parent 2": flagged.get("parent2_name"),
+            "Parent 2 Contact": flagged.get("parent2_contact"),
+        }, columns=columns)
+        return result.sort_values(["Missed Sundays", "Name"], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tables whose row-level changes are mirrored into the shared cache
+TABLES = ("children", "attendance", "sessions")
+
+
+class LocalChangeFeed:
+    """In-process change feed, used for tests and as the base for the Supabase feed"""
+
+    def __init__(self):
+        self._listeners = []
+        self._status_listeners = []
+        self.connected = False
+
+    def subscribe(self, callback):
+        """Register callback(table, event_type, record, old_record) for every change"""
+        self._listeners.append(callback)
+
+    def on_status(self, callback):
+        """Register callback(connected) for subscription state changes"""
+        self._status_listeners.append(callback)
+
+    def publish(self, table, event_type, record=None, old_record=None):
+        """Deliver a change event to every subscriber"""
+        for callback in list(self._listeners):
+            callback(table, event_type.upper(), record or {}, old_record or {})
+
+    def set_connected(self, connected):
+        self.connected = connected
+        for callback in list(self._status_listeners):
+            callback(connected)
+
+    def start(self):
+        self.set_connected(True)
+
+    def stop(self):
+        self.set_connected(False)
+
+
+class SupabaseChangeFeed(LocalChangeFeed):
+    """Change feed backed by Supabase Realtime, listening on a background thread"""
+
+    def __init__(self, url, key):
+        super().__init__()
+        self.url = url
+        self.key = key
+        self._thread = None
+        self._loop = None
+        self._client = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="supabase-realtime", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._loop is not None and self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop)
+        self.set_connected(False)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._listen())
+        except Exception as e:
+            logger.warning("Realtime listener stopped: %s", e)
+        finally:
+            self.set_connected(False)
+            self._thread = None
+
+    async def _listen(self):
+        from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+
+        self._client = AsyncRealtimeClient(f"{self.url}/realtime/v1", self.key)
+        await self._client.connect()
+
+        def on_subscribe(state, error):
+            # A fresh subscription may have missed events, so the cache resyncs on connect
+            self.set_connected(state == RealtimeSubscribeStates.SUBSCRIBED)
+
+        channel = self._client.channel("sunday-school-changes")
+        for table in TABLES:
+            channel.on_postgres_changes("*", schema="public", table=table, callback=self._on_change)
+        await channel.subscribe(on_subscribe)
+        await self._client.listen()
+
+    def _on_change(self, payload):
+        data = payload["data"]
+        self.publish(data["table"], data["type"], data.get("record"), data.get("old_record"))
+
+
+class TableCache:
+    """Shared copy of the app's tables (children, attendance, sessions) for all user sessions
+
+    Stale tables are fetched concurrently on demand. While a change feed is
+    connected they are kept current by its events; otherwise they are
+    refetched once older than the TTL. normalize maps a table to a
+    function(row, old_row) that fetched rows and change events go through
+    before they are stored, e.g. to keep rows in a compact form.
+    """
+
+    def __init__(self, fetch_rows, ttl=30, max_workers=4, normalize=None):
+        self._fetch_rows = fetch_rows
+        self._normalize = normalize or {}
+        self.ttl = ttl
+        self._rows = {table: {} for table in TABLES}
+        self._loaded_at = {}
+        self._pending = {}
+        self._loaded = set()
+        self.last_error = None
+        self._lock = threading.RLock()
+        self._fetch_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="table-fetch")
+        self._frames = {}
+        self.version = 0
+        self.connected = False
+        self.feed = None
+        self._observers = []
+
+    def observe(self, callback):
+        """Call callback(table, old_row, new_row) under the cache lock for every applied change
+
+        old_row is None for an insert and new_row None for a delete; both
+        are None when the whole table was refetched.
+        """
+        with self._lock:
+            self._observers.append(callback)
+
+    def _notify(self, table, old, new):
+        for callback in self._observers:
+            callback(table, old, new)
+
+    def _notify_refetch(self, table, old_rows, diff):
+        """Tell observers what a refetch changed, row by row when the table was loaded before"""
+        if not self._observers:
+            return
+        if not diff:
+            self._notify(table, None, None)
+            return
+        new_rows = self._rows[table]
+        for row_id, old in old_rows.items():
+            new = new_rows.get(row_id)
+            if new != old:
+                self._notify(table, old, new)
+        for row_id, new in new_rows.items():
+            if row_id not in old_rows:
+                self._notify(table, None, new)
+
+    def with_rows(self, tables, func):
+        """Call func with each table's current rows while no change can be applied"""
+        with self._lock:
+            return func(*[list(self._rows[table].values()) for table in tables])
+
+    def set_connected(self, connected):
+        """Follow the feed state; events may have been missed, so resync on any change"""
+        with self._lock:
+            self.connected = connected
+            self._loaded_at = {}
+
+    def invalidate(self, *tables):
+        """Mark tables (all if none given) for refetch on next use"""
+        with self._lock:
+            for table in tables or TABLES:
+                self._loaded_at.pop(table, None)
+
+    def is_fresh(self, table):
+        loaded_at = self._loaded_at.get(table)
+        if loaded_at is None:
+            return False
+        return self.connected or self.ttl is None or time.monotonic() - loaded_at < self.ttl
+
+    def ensure_loaded(self, tables, fetch_rows=None):
+        """Fetch every stale table in one concurrent round and return the ones fetched
+
+        Events that arrive while a fetch is in flight are replayed on top of it.
+        If the fetch fails for tables loaded before, their last copy keeps being
+        served and the error is kept in last_error; otherwise it is raised.
+        """
+        if all(self.is_fresh(table) for table in tables):
+            return []
+        fetch_rows = fetch_rows or self._fetch_rows
+        with self._fetch_lock:
+            stale = [table for table in tables if not self.is_fresh(table)]
+            if not stale:
+                return []
+            with self._lock:
+                for table in stale:
+                    self._pending[table] = []
+            try:
+                futures = {table: self._executor.submit(fetch_rows, table) for table in stale}
+                snapshot = {table: future.result() for table, future in futures.items()}
+            except Exception as e:
+                with self._lock:
+                    for table in stale:
+                        self._pending.pop(table, None)
+                    if not self._loaded.issuperset(stale):
+                        raise
+                    self.last_error = e
+                return []
+            with self._lock:
+                self.last_error = None
+                loaded_before = set(self._loaded)
+                self._loaded.update(stale)
+                now = time.monotonic()
+                for table in stale:
+                    old_rows = self._rows[table]
+                    rows = snapshot[table]
+                    if table in self._normalize:
+                        rows = [self._normalize[table](row, None) for row in rows]
+                    self._rows[table] = {row["id"]: row for row in rows}
+                    self._notify_refetch(table, old_rows, table in loaded_before)
+                    for event in self._pending.pop(table):
+                        self._apply(table, *event)
+                    self._loaded_at[table] = now
+                self._bump()
+            return stale
+
+    def apply(self, table, event_type, record, old_record):
+        """Apply a single row-level change event"""
+        with self._lock:
+            if table in self._pending:
+                self._pending[table].append((event_type, record, old_record))
+                return
+            if self._apply(table, event_type, record, old_record):
+                self._bump()
+
+    def _apply(self, table, event_type, record, old_record):
+        rows = self._rows.get(table)
+        if rows is None:
+            return False
+        if event_type == "DELETE":
+            old = rows.pop(old_record.get("id"), None)
+            if old is None:
+                return False
+            self._notify(table, old, None)
+            return True
+        if record.get("id") is None:
+            return False
+        old = rows.get(record["id"])
+        if old is not None and record.get("version") is not None and old.get("version") is not None \
+                and record["version"] < old["version"]:
+            # Concurrent writes can report back out of order; keep the newer row
+            return False
+        if table in self._normalize:
+            record = self._normalize[table](record, old)
+        rows[record["id"]] = {**(old or {}), **record}
+        self._notify(table, old, rows[record["id"]])
+        return True
+
+    def row(self, table, row_id):
+        """Cached copy of one row, or None when the table is not loaded or has no such row"""
+        with self._lock:
+            if table not in self._loaded:
+                return None
+            return self._rows[table].get(row_id)
+
+    def _bump(self):
+        self.version += 1
+        self._frames = {}
+
+    def frame(self, key, build=None):
+        """Return a table's DataFrame, or a frame derived by build(cache), once per data version"""
+        with self._lock:
+            cached = self._frames.get(key)
+            if cached is not None:
+                return cached
+            if build is None:
+                rows = list(self._rows[key].values())
+                result = pd.DataFrame(rows) if rows else pd.DataFrame()
+            else:
+                result = build(self)
+            self._frames[key] = result
+            return result
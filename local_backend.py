@@ -0,0 +1,491 @@
+import sqlite3
+import threading
+from contextlib import nullcontext
+
+from flag_bits import FLAG_BITS
+
+# The six attendance flags packed into one integer, as the generated column in migrations/add_attendance_flags.sql
+PACKED_FLAGS = " | ".join(f"((COALESCE({name}, 0) != 0) * {bit})" for name, bit in FLAG_BITS.items())
+
+# Column definitions mirroring the Supabase tables documented in the README
+SCHEMA = {
+    "children": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "full_name": "TEXT",
+        "gender": "TEXT",
+        "date_of_birth": "TEXT",
+        "school": "TEXT",
+        "grade": "TEXT",
+        "class_group": "TEXT",
+        "residence": "TEXT",
+        "parent1_name": "TEXT",
+        "parent1_contact": "TEXT",
+        "parent2_name": "TEXT",
+        "parent2_contact": "TEXT",
+        "sponsored": "BOOLEAN DEFAULT 0",
+        "enrollment_start": "TEXT",
+        "created_at": "TEXT DEFAULT CURRENT_TIMESTAMP",
+    },
+    "attendance": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "child_id": "INTEGER REFERENCES children(id)",
+        "session_date": "TEXT",
+        "present": "BOOLEAN DEFAULT 0",
+        "early": "BOOLEAN DEFAULT 0",
+        "has_book": "BOOLEAN DEFAULT 0",
+        "has_pen": "BOOLEAN DEFAULT 0",
+        "has_bible": "BOOLEAN DEFAULT 0",
+        "gave_offering": "BOOLEAN DEFAULT 0",
+        "created_at": "TEXT DEFAULT CURRENT_TIMESTAMP",
+        "updated_at": "TEXT",
+        "flags": f"INTEGER GENERATED ALWAYS AS ({PACKED_FLAGS}) VIRTUAL",
+        "version": "INTEGER NOT NULL DEFAULT 1",
+    },
+    "sessions": {
+        "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+        "session_date": "TEXT",
+        "status": "TEXT DEFAULT 'held'",
+        "class_group": "TEXT",
+        "note": "TEXT",
+        "created_at": "TEXT DEFAULT CURRENT_TIMESTAMP",
+    },
+}
+
+# Participation flags summed by the report functions
+FLAGS = ["early", "has_book", "has_pen", "has_bible", "gave_offering"]
+FLAG_SUMS = ", ".join(f"COUNT(*) FILTER (WHERE {flag})" for flag in FLAGS)
+
+# Read-only views, by name
+VIEWS = {
+    "attendance_compact": "SELECT id, child_id, session_date, flags, version FROM attendance",
+}
+
+# Tables whose rows carry a version bumped on every update, as the attendance_version
+# trigger of migrations/add_attendance_merge.sql does in Postgres
+VERSIONED = {"attendance": "version = {table}.version + 1, updated_at = CURRENT_TIMESTAMP"}
+
+# One mark per child and date, so concurrent saves merge into a single row
+UNIQUE_ATTENDANCE = "idx_attendance_child_session"
+
+# Keeps the latest of any duplicate marks left by racing saves in older databases
+DEDUPE_ATTENDANCE = "DELETE FROM attendance WHERE id NOT IN (SELECT MAX(id) FROM attendance GROUP BY child_id, session_date)"
+
+INDEXES = [
+    "DROP INDEX IF EXISTS idx_attendance_child_date",
+    f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_ATTENDANCE} ON attendance (child_id, session_date)",
+    "CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance (session_date)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_date_class ON sessions (session_date, COALESCE(class_group, ''))",
+]
+
+
+class LocalResponse:
+    """Stand-in for the postgrest APIResponse, exposing the returned rows as .data"""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class LocalQuery:
+    """Chainable query builder covering the subset of the Supabase table API the app uses"""
+
+    def __init__(self, client, table):
+        if table not in client.schema and table not in VIEWS:
+            raise ValueError(f"Unknown table: {table}")
+        self.client = client
+        self.table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count = None
+        self._payload = None
+        self._returning = True
+        self._on_conflict = None
+        self._filters = []
+        self._params = []
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    # --- actions ---
+
+    def select(self, *columns, count=None):
+        self._action = "select"
+        self._count = count
+        names = [c.strip() for col in columns for c in col.split(",") if c.strip()]
+        self._columns = "*" if not names or names == ["*"] else ", ".join(names)
+        return self
+
+    def insert(self, data, returning="representation"):
+        self._action = "insert"
+        self._payload = data if isinstance(data, list) else [data]
+        self._returning = returning != "minimal"
+        return self
+
+    def upsert(self, data, on_conflict="id", returning="representation"):
+        self.insert(data, returning)
+        self._action = "upsert"
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, data):
+        self._action = "update"
+        self._payload = data
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # --- filters ---
+
+    def _filter(self, clause, *params):
+        self._filters.append(clause)
+        self._params.extend(params)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(f"{column} = ?", value)
+
+    def neq(self, column, value):
+        return self._filter(f"{column} != ?", value)
+
+    def gt(self, column, value):
+        return self._filter(f"{column} > ?", value)
+
+    def gte(self, column, value):
+        return self._filter(f"{column} >= ?", value)
+
+    def lt(self, column, value):
+        return self._filter(f"{column} < ?", value)
+
+    def lte(self, column, value):
+        return self._filter(f"{column} <= ?", value)
+
+    def in_(self, column, values):
+        values = list(values)
+        if not values:
+            return self._filter("0")
+        return self._filter(f"{column} IN ({', '.join('?' * len(values))})", *values)
+
+    def order(self, column, desc=False):
+        self._order.append(f"{column} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def range(self, start, end):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # --- execution ---
+
+    def _where(self):
+        return f" WHERE {' AND '.join(self._filters)}" if self._filters else ""
+
+    def execute(self):
+        with self.client.guard():
+            conn = self.client.connection()
+            if self._action == "select":
+                sql = f"SELECT {self._columns} FROM {self.table}{self._where()}"
+                if self._order:
+                    sql += f" ORDER BY {', '.join(self._order)}"
+                if self._limit is not None:
+                    sql += f" LIMIT {int(self._limit)} OFFSET {int(self._offset or 0)}"
+                count = None
+                if self._count:
+                    # Matching rows before limit and offset, as PostgREST reports with count='exact'
+                    count, = conn.execute(f"SELECT COUNT(*) FROM {self.table}{self._where()}", self._params).fetchone()
+                return LocalResponse(self.client.rows(self.table, conn.execute(sql, self._params)), count)
+            if self._action in ("insert", "upsert"):
+                return LocalResponse(self._write_rows(conn))
+            if self._action == "update":
+                assignments = ", ".join(f"{col} = ?" for col in self._payload)
+                if self.table in VERSIONED:
+                    assignments += ", " + VERSIONED[self.table].format(table=self.table)
+                sql = f"UPDATE {self.table} SET {assignments}{self._where()} RETURNING *"
+                params = list(self._payload.values()) + self._params
+                with conn:
+                    return LocalResponse(self.client.rows(self.table, conn.execute(sql, params)))
+            if self._action == "delete":
+                sql = f"DELETE FROM {self.table}{self._where()} RETURNING *"
+                with conn:
+                    return LocalResponse(self.client.rows(self.table, conn.execute(sql, self._params)))
+        raise ValueError(f"Unsupported action: {self._action}")
+
+    def _write_rows(self, conn):
+        if not self._payload:
+            return []
+        columns = list(self._payload[0].keys())
+        sql = f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        if self._action == "upsert":
+            conflict = [c.strip() for c in self._on_conflict.split(",")]
+            updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in conflict)
+            if updates and self.table in VERSIONED:
+                updates += ", " + VERSIONED[self.table].format(table=self.table)
+            sql += f" ON CONFLICT ({', '.join(conflict)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING")
+        with conn:
+            if not self._returning:
+                conn.executemany(sql, [[row.get(c) for c in columns] for row in self._payload])
+                return []
+            inserted = []
+            for row in self._payload:
+                cursor = conn.execute(sql + " RETURNING *", [row.get(c) for c in columns])
+                inserted.extend(self.client.rows(self.table, cursor))
+            return inserted
+
+
+def _month_bounds(year, month):
+    """First day of the month and of the next month, as ISO date strings"""
+    start = f"{int(year):04d}-{int(month):02d}-01"
+    end = f"{int(year) + int(month) // 12:04d}-{int(month) % 12 + 1:02d}-01"
+    return start, end
+
+
+def _flag_dict(values=None):
+    return {flag: int(value or 0) for flag, value in zip(FLAGS, values or [0] * len(FLAGS))}
+
+
+def sunday_summary(conn, p_date):
+    """SQLite version of the sunday_summary database function"""
+    day = "SELECT a.*, c.class_group, COALESCE(c.sponsored, 0) AS sponsored, c.id IS NOT NULL AS registered " \
+          "FROM attendance a LEFT JOIN children c ON c.id = a.child_id WHERE a.session_date = ?"
+    kids = "SELECT c.id, c.class_group, COALESCE(c.sponsored, 0) AS sponsored, " \
+           "EXISTS (SELECT 1 FROM attendance d WHERE d.child_id = c.id AND d.session_date = ?) AS present " \
+           "FROM children c"
+    total_children, = conn.execute("SELECT COUNT(*) FROM children").fetchone()
+    day_row = conn.execute(f"SELECT COUNT(*), COUNT(DISTINCT child_id), {FLAG_SUMS} FROM ({day})", [p_date]).fetchone()
+    flags = {
+        row[0]: _flag_dict(row[1:])
+        for row in conn.execute(
+            f"SELECT class_group, {FLAG_SUMS} FROM ({day}) WHERE registered GROUP BY class_group", [p_date]
+        )
+    }
+    classes = [
+        {
+            "name": name,
+            "total": total,
+            "present": present,
+            "participation": flags.get(name, _flag_dict()) if present else None,
+        }
+        for name, total, present in conn.execute(
+            f"SELECT class_group, COUNT(*), COUNT(*) FILTER (WHERE present) FROM ({kids}) "
+            "GROUP BY class_group ORDER BY MIN(id)", [p_date]
+        )
+    ]
+    ocm_total, ocm_present = conn.execute(
+        f"SELECT COUNT(*), COUNT(*) FILTER (WHERE present) FROM ({kids}) WHERE sponsored", [p_date]
+    ).fetchone()
+    ocm = None
+    if ocm_total:
+        ocm_flags = conn.execute(f"SELECT {FLAG_SUMS} FROM ({day}) WHERE sponsored", [p_date]).fetchone()
+        ocm = {
+            "total": ocm_total,
+            "present": ocm_present,
+            "participation": _flag_dict(ocm_flags) if ocm_present else None,
+        }
+    return {
+        "total_children": total_children,
+        "total_present": day_row[1],
+        "participation": _flag_dict(day_row[2:]) if day_row[0] else None,
+        "classes": classes,
+        "ocm": ocm,
+    }
+
+
+def monthly_summary(conn, p_year, p_month):
+    """SQLite version of the monthly_summary database function"""
+    month = "SELECT a.*, c.class_group, COALESCE(c.sponsored, 0) AS sponsored, c.id IS NOT NULL AS registered " \
+            "FROM attendance a LEFT JOIN children c ON c.id = a.child_id " \
+            "WHERE a.session_date >= ? AND a.session_date < ?"
+    bounds = list(_month_bounds(p_year, p_month))
+    total_sessions, attended = conn.execute(
+        f"SELECT COUNT(DISTINCT session_date), COUNT(*) FROM ({month})", bounds
+    ).fetchone()
+    total_children, = conn.execute("SELECT COUNT(*) FROM children").fetchone()
+    trends = [
+        {"date": row[0], "present": row[1], **_flag_dict(row[2:])}
+        for row in conn.execute(
+            f"SELECT session_date, COUNT(*), {FLAG_SUMS} FROM ({month}) GROUP BY session_date ORDER BY session_date",
+            bounds
+        )
+    ]
+    flags = {
+        row[0]: (row[1], _flag_dict(row[2:]))
+        for row in conn.execute(
+            f"SELECT class_group, COUNT(*), {FLAG_SUMS} FROM ({month}) WHERE registered GROUP BY class_group",
+            bounds
+        )
+    }
+    classes = []
+    for name, total in conn.execute("SELECT class_group, COUNT(*) FROM children GROUP BY class_group ORDER BY MIN(id)"):
+        class_attended, participation = flags.get(name, (0, _flag_dict()))
+        classes.append({"name": name, "total": total, "attended": class_attended, "participation": participation})
+    ocm_total, = conn.execute("SELECT COUNT(*) FROM children WHERE COALESCE(sponsored, 0)").fetchone()
+    ocm = None
+    if ocm_total:
+        ocm_row = conn.execute(f"SELECT COUNT(*), {FLAG_SUMS} FROM ({month}) WHERE sponsored", bounds).fetchone()
+        ocm = {"total": ocm_total, "attended": ocm_row[0], "participation": _flag_dict(ocm_row[1:])}
+    return {
+        "total_sessions": total_sessions,
+        "total_children": total_children,
+        "attended": attended,
+        "trends": trends,
+        "classes": classes,
+        "ocm": ocm,
+    }
+
+
+def monthly_child_tallies(conn, p_year, p_month, p_class_group=None, p_sponsored=None,
+                          p_program_start="2025-03-01", p_window_end="2025-05-01"):
+    """SQLite version of the monthly_child_tallies database function"""
+    sql = (
+        "SELECT *, enrollment_start != ? AS is_new FROM ("
+        "SELECT c.id AS child_id, c.full_name, c.class_group, MIN(a.session_date) AS first_attendance, "
+        "COUNT(*) AS sessions_attended, "
+        "COUNT(*) FILTER (WHERE a.session_date >= ?) AS sessions_since_tracking, "
+        "COALESCE(c.enrollment_start, CASE WHEN EXISTS (SELECT 1 FROM attendance t WHERE t.child_id = c.id "
+        "AND t.session_date >= ? AND t.session_date < ?) THEN ? "
+        "ELSE (SELECT MIN(t.session_date) FROM attendance t WHERE t.child_id = c.id) END) AS enrollment_start "
+        "FROM children c JOIN attendance a ON a.child_id = c.id "
+        "WHERE a.session_date >= ? AND a.session_date < ? "
+        "AND (? IS NULL OR c.class_group = ?) "
+        "AND (? IS NULL OR COALESCE(c.sponsored, 0) = ?) "
+        "GROUP BY c.id, c.full_name, c.class_group ORDER BY c.id)"
+    )
+    params = [p_program_start, p_program_start, p_program_start, p_window_end, p_program_start]
+    params += list(_month_bounds(p_year, p_month)) + [p_class_group, p_class_group, p_sponsored, p_sponsored]
+    cursor = conn.execute(sql, params)
+    names = [d[0] for d in cursor.description]
+    rows = [dict(zip(names, values)) for values in cursor.fetchall()]
+    for row in rows:
+        row["is_new"] = bool(row["is_new"])
+    return rows
+
+
+def merge_attendance(conn, p_child_id, p_session_date, p_mask, p_values):
+    """SQLite version of the merge_attendance database function
+
+    One statement, so it is atomic: inserts the mark, or sets only the
+    flags in p_mask on the existing row and bumps its version.
+    """
+    names = list(FLAG_BITS)
+    updates = ", ".join(
+        f"{name} = CASE WHEN :mask & {bit} THEN excluded.{name} ELSE attendance.{name} END"
+        for name, bit in FLAG_BITS.items()
+    )
+    sql = (
+        f"INSERT INTO attendance (child_id, session_date, {', '.join(names)}) "
+        f"VALUES (:child_id, :session_date, {', '.join(':' + name for name in names)}) "
+        f"ON CONFLICT (child_id, session_date) DO UPDATE SET {updates}, "
+        "version = attendance.version + 1, updated_at = CURRENT_TIMESTAMP "
+        "RETURNING *"
+    )
+    params = {
+        "child_id": p_child_id, "session_date": p_session_date, "mask": p_mask,
+        **{name: int(bool(p_values & bit)) for name, bit in FLAG_BITS.items()},
+    }
+    with conn:
+        cursor = conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        rows = [dict(zip(columns, values)) for values in cursor.fetchall()]
+    for row in rows:
+        for name in names:
+            row[name] = bool(row[name])
+    return rows
+
+
+# Database functions callable through LocalClient.rpc, mirroring migrations/report_functions.sql
+# and migrations/add_attendance_merge.sql
+RPC_FUNCTIONS = {
+    "sunday_summary": sunday_summary,
+    "monthly_summary": monthly_summary,
+    "monthly_child_tallies": monthly_child_tallies,
+    "merge_attendance": merge_attendance,
+}
+
+
+class LocalRpc:
+    """Stand-in for the postgrest RPC builder"""
+
+    def __init__(self, client, name, params):
+        if name not in RPC_FUNCTIONS:
+            raise ValueError(f"Unknown function: {name}")
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        with self.client.guard():
+            return LocalResponse(RPC_FUNCTIONS[self.name](self.client.connection(), **self.params))
+
+
+class LocalClient:
+    """SQLite-backed drop-in for the Supabase client, for offline use, tests and benchmarks"""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.schema = SCHEMA
+        self.lock = threading.RLock()
+        self._local = threading.local()
+        self._shared = None
+        if path == ":memory:":
+            # An in-memory database exists per connection, so share one across threads
+            self._shared = sqlite3.connect(path, check_same_thread=False)
+        self._create_schema()
+
+    def guard(self):
+        """Serialize access to the shared in-memory connection; file databases use one per thread"""
+        return self.lock if self._shared is not None else nullcontext()
+
+    def connection(self):
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self.connection()
+        with conn:
+            for table, columns in self.schema.items():
+                defs = ", ".join(f"{name} {kind}" for name, kind in columns.items())
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({defs})")
+                # Databases created by an older version get newly added columns
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+                for name, kind in columns.items():
+                    if name not in existing:
+                        conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {kind.replace('CURRENT_TIMESTAMP', 'NULL')}")
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", [UNIQUE_ATTENDANCE]).fetchone():
+                conn.execute(DEDUPE_ATTENDANCE)
+            for statement in INDEXES:
+                conn.execute(statement)
+            # Recreated so databases made by an older version get new view columns
+            for name, query in VIEWS.items():
+                conn.execute(f"DROP VIEW IF EXISTS {name}")
+                conn.execute(f"CREATE VIEW {name} AS {query}")
+
+    def rows(self, table, cursor):
+        """Convert cursor rows to dicts, restoring booleans the way Supabase returns them"""
+        names = [d[0] for d in cursor.description]
+        booleans = {name for name, kind in self.schema.get(table, {}).items() if kind.startswith("BOOLEAN")}
+        result = []
+        for values in cursor.fetchall():
+            row = dict(zip(names, values))
+            for name in booleans.intersection(row):
+                if row[name] is not None:
+                    row[name] = bool(row[name])
+            result.append(row)
+        return result
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return LocalRpc(self, name, params)
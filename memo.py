@@ -0,0 +1,202 @@
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from metrics import track
+
+# Upper bound on the memory held by memoized results, in megabytes
+DEFAULT_MAX_MB = 256
+
+
+def _version_unset():
+    return None
+
+
+def _arg_key(value, keep):
+    """Hashable key for one argument
+
+    DataFrames, lists and dicts are keyed by identity: loaders hand out the
+    same object for the same data version, and the entry keeps a reference
+    (in keep) so the id cannot be reused while it is cached. Small Series,
+    such as a selected child's row, are keyed by content.
+    """
+    if isinstance(value, pd.Series) and len(value) <= 100:
+        return ("series", tuple((str(k), str(v)) for k, v in value.items()))
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray, list, dict)):
+        keep.append(value)
+        return ("id", id(value))
+    try:
+        hash(value)
+    except TypeError:
+        keep.append(value)
+        return ("id", id(value))
+    return value
+
+
+def estimate_size(value):
+    """Rough memory footprint of a value: DataFrames with their strings, containers recursively"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        # deep, as object columns (names, dates as text) hold most of a frame's memory in their strings
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoCache:
+    """Results of pure report functions, shared by every session until the data changes
+
+    Entries are keyed by function, arguments and the current data version
+    token; a new token drops everything computed for the old one. Least
+    recently used entries are evicted once results exceed max_bytes, and
+    concurrent callers of the same computation wait for the first one.
+    Arguments kept alive for identity keys count towards bytes too, once
+    however many entries keep them.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, version=_version_unset):
+        self.max_bytes = max_bytes
+        self.version = version
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._keep = {}
+        self._retained = {}
+        self._token = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._keep.clear()
+            self._retained.clear()
+            self.bytes = 0
+
+    def _check_version(self, token):
+        if token != self._token:
+            self._entries.clear()
+            self._sizes.clear()
+            self._keep.clear()
+            self._retained.clear()
+            self.bytes = 0
+            self._token = token
+
+    def _retain(self, key):
+        """Count the arguments an entry keeps alive, each object only while some entry keeps it"""
+        for value in self._keep.get(key, ()):
+            held = self._retained.get(id(value))
+            if held is None:
+                held = self._retained[id(value)] = [estimate_size(value), 0]
+                self.bytes += held[0]
+            held[1] += 1
+
+    def _release(self, key):
+        for value in self._keep.pop(key, ()):
+            held = self._retained.get(id(value))
+            if held is not None:
+                held[1] -= 1
+                if not held[1]:
+                    self.bytes -= held[0]
+                    del self._retained[id(value)]
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            key, future = next(iter(self._entries.items()))
+            if not future.done():
+                break
+            self._entries.popitem(last=False)
+            if key in self._sizes:
+                self.bytes -= self._sizes.pop(key)
+                self._release(key)
+            else:
+                self._keep.pop(key, None)
+            self.evictions += 1
+
+    def get_or_compute(self, name, func, args, kwargs):
+        token = self.version()
+        keep = []
+        key = (
+            name,
+            tuple(_arg_key(a, keep) for a in args),
+            tuple(sorted((k, _arg_key(v, keep)) for k, v in kwargs.items())),
+        )
+        with self._lock:
+            self._check_version(token)
+            future = self._entries.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[key] = future
+                self._keep[key] = keep
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if not owner:
+            return future.result(), True
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                if self._entries.get(key) is future:
+                    del self._entries[key]
+                    self._keep.pop(key, None)
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        with self._lock:
+            if self._entries.get(key) is future:
+                self._sizes[key] = estimate_size(result)
+                self.bytes += self._sizes[key]
+                self._retain(key)
+                self._evict()
+        return result, False
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "mb": round(self.bytes / 1024 / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+cache = MemoCache()
+
+
+def set_version_source(version):
+    """Register the callable returning the current data version token"""
+    cache.version = version
+
+
+def memoize(func):
+    """Decorator sharing a pure function's results across sessions for the current data version
+
+    Callers must treat the returned objects as read-only.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with track(f"memo.{func.__name__}") as span:
+            result, span.cache_hit = cache.get_or_compute(name, func, args, kwargs)
+            return result
+    return wrapper
@@ -0,0 +1,252 @@
+import atexit
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket bounds in milliseconds
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Spans buffered before they are appended to the metrics file, and the longest one waits
+FLUSH_SPANS = 100
+FLUSH_SECONDS = 1.0
+
+class Span:
+    """One timed operation with the rows and payload bytes it moved"""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+        self.bytes = None
+        self.cache_hit = None
+        self.error = False
+        self.duration_ms = None
+        self._start = time.perf_counter()
+        self._ended = False
+
+    @property
+    def started(self):
+        """perf_counter() reading when the span began"""
+        return self._start
+
+    def end(self):
+        if self._ended:
+            return
+        self._ended = True
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        registry.record(self)
+
+
+class MetricsRegistry:
+    """Process-wide latency histograms, row/byte totals and cache hit rates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.metrics_file = None
+        # Lines waiting for the metrics file; written by one thread at a time, outside _lock
+        self._buffer = []
+        self._flushed_at = time.monotonic()
+        self._write_lock = threading.Lock()
+        # Called with every ended span, e.g. by a profiling capture; empty unless one runs.
+        # Replaced, never changed in place, so record() iterates a snapshot
+        self.listeners = ()
+
+    def record(self, span):
+        with self._lock:
+            stats = self._stats.setdefault(span.name, {
+                "count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "rows": 0, "bytes": 0, "cache_hits": 0, "cache_misses": 0,
+                "buckets": [0] * (len(BUCKETS_MS) + 1),
+            })
+            stats["count"] += 1
+            stats["errors"] += int(span.error)
+            stats["total_ms"] += span.duration_ms
+            stats["max_ms"] = max(stats["max_ms"], span.duration_ms)
+            stats["rows"] += span.rows or 0
+            stats["bytes"] += span.bytes or 0
+            if span.cache_hit is not None:
+                stats["cache_hits" if span.cache_hit else "cache_misses"] += 1
+            for i, bound in enumerate(BUCKETS_MS):
+                if span.duration_ms <= bound:
+                    stats["buckets"][i] += 1
+                    break
+            else:
+                stats["buckets"][-1] += 1
+            due = False
+            if self.metrics_file:
+                self._buffer.append(_line(span))
+                due = len(self._buffer) >= FLUSH_SPANS or time.monotonic() - self._flushed_at >= FLUSH_SECONDS
+        if due:
+            # A flush already running takes these lines on its next turn
+            self.flush(blocking=False)
+        for listener in self.listeners:
+            listener(span)
+
+    def add_listener(self, listener):
+        """Call listener(span) with every span ended from now on, on the thread that ended it"""
+        with self._lock:
+            self.listeners = self.listeners + (listener,)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            self.listeners = tuple(other for other in self.listeners if other != listener)
+
+    def flush(self, blocking=True):
+        """Append the buffered spans to the metrics file, without holding up recording"""
+        if not self._write_lock.acquire(blocking):
+            return
+        try:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                path = self.metrics_file
+                self._flushed_at = time.monotonic()
+            if not lines or not path:
+                return
+            try:
+                with open(path, "a") as f:
+                    f.writelines(lines)
+            except OSError as e:
+                logger.warning("Could not write metrics file %s, no longer writing it: %s", path, e)
+                with self._lock:
+                    if self.metrics_file == path:
+                        self.metrics_file = None
+                        self._buffer = []
+        finally:
+            self._write_lock.release()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def snapshot(self):
+        """Return a summary DataFrame with one row per operation"""
+        with self._lock:
+            items = [(name, dict(stats)) for name, stats in self._stats.items()]
+        rows = []
+        for name, stats in sorted(items):
+            lookups = stats["cache_hits"] + stats["cache_misses"]
+            rows.append({
+                "Operation": name,
+                "Calls": stats["count"],
+                "Errors": stats["errors"],
+                "Avg ms": round(stats["total_ms"] / stats["count"], 1),
+                "p50 ms": _bucket_quantile(stats["buckets"], 0.5),
+                "p95 ms": _bucket_quantile(stats["buckets"], 0.95),
+                "Max ms": round(stats["max_ms"], 1),
+                "Rows": stats["rows"],
+                "Bytes": stats["bytes"],
+                "Cache Hit %": round(stats["cache_hits"] / lookups * 100, 1) if lookups else None,
+            })
+        return pd.DataFrame(rows)
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            items = [(name, dict(stats, buckets=list(stats["buckets"]))) for name, stats in self._stats.items()]
+        lines = [
+            "# TYPE sundayschool_duration_ms histogram",
+            "# TYPE sundayschool_rows_total counter",
+            "# TYPE sundayschool_bytes_total counter",
+            "# TYPE sundayschool_cache_total counter",
+        ]
+        for name, stats in sorted(items):
+            label = f'op="{name}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS_MS + ("+Inf",), stats["buckets"]):
+                cumulative += count
+                lines.append(f'sundayschool_duration_ms_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"sundayschool_duration_ms_sum{{{label}}} {stats['total_ms']:.3f}")
+            lines.append(f"sundayschool_duration_ms_count{{{label}}} {stats['count']}")
+            lines.append(f"sundayschool_rows_total{{{label}}} {stats['rows']}")
+            lines.append(f"sundayschool_bytes_total{{{label}}} {stats['bytes']}")
+            lines.append(f'sundayschool_cache_total{{{label},result="hit"}} {stats["cache_hits"]}')
+            lines.append(f'sundayschool_cache_total{{{label},result="miss"}} {stats["cache_misses"]}')
+        return "\n".join(lines) + "\n"
+
+
+def _line(span):
+    """One metrics file line for an ended span"""
+    return json.dumps({
+        "ts": datetime.now().isoformat(),
+        "name": span.name,
+        "ms": round(span.duration_ms, 3),
+        "rows": span.rows,
+        "bytes": span.bytes,
+        "cache_hit": span.cache_hit,
+        "error": span.error,
+    }) + "\n"
+
+
+def _bucket_quantile(buckets, q):
+    """Approximate a quantile as the upper bound of the bucket that contains it"""
+    total = sum(buckets)
+    if not total:
+        return None
+    cumulative = 0
+    for bound, count in zip(BUCKETS_MS + (float("inf"),), buckets):
+        cumulative += count
+        if cumulative >= q * total:
+            return bound
+    return None
+
+
+registry = MetricsRegistry()
+# Spans still buffered when the process exits
+atexit.register(registry.flush)
+
+
+def begin(name):
+    """Start a span that is ended explicitly with span.end()"""
+    return Span(name)
+
+
+@contextmanager
+def track(name):
+    """Time the enclosed block as one span"""
+    span = begin(name)
+    try:
+        yield span
+    except BaseException:
+        span.error = True
+        raise
+    finally:
+        span.end()
+
+
+def count_rows(result):
+    """Best-effort row count for a function result"""
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    return None
+
+
+def estimate_bytes(rows, sample=20):
+    """Estimate the JSON payload size of a list of rows from a small sample"""
+    if not rows:
+        return 0
+    head = rows[:sample]
+    size = len(json.dumps(head, default=str, separators=(",", ":")))
+    return int(size * len(rows) / len(head))
+
+
+def timed(name):
+    """Decorator recording latency and row counts of every call under the given name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(name) as span:
+                result = func(*args, **kwargs)
+                if span.rows is None:
+                    span.rows = count_rows(result)
+                return result
+        return wrapper
+    return decorator
+
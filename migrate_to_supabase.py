@@ -2,7 +2,7 @@ import pandas as pd
 import gspread
 from google.oauth2.service_account import Credentials
 from supabase import create_client
-import streamlit as st
+from config import load_secrets, get_secret
 from datetime import datetime
 import os
 
@@ -19,7 +19,7 @@ def get_google_sheets_data():
     client = gspread.service_account(filename=creds_path)
     
     # Get spreadsheet
-    spreadsheet_id = st.secrets['spreadsheet_id']
+    spreadsheet_id = load_secrets()['spreadsheet_id']
     spreadsheet = client.open_by_key(spreadsheet_id)
     
     # Get children data
@@ -40,8 +40,8 @@ def migrate_data():
     
     # Get Supabase client
     try:
-        supabase_url = st.secrets["supabase"]["url"]
-        supabase_key = st.secrets["supabase"]["key"]
+        supabase_url = get_secret("supabase", "url")
+        supabase_key = get_secret("supabase", "key")
         supabase = create_client(supabase_url, supabase_key)
     except Exception as e:
         print(f"Error connecting to Supabase: {str(e)}")
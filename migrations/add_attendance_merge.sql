@@ -0,0 +1,69 @@
+-- Conflict-free attendance saves by several teachers at once. Run after add_attendance_flags.sql.
+
+-- Racing saves could insert the same mark twice; keep the latest of each
+DELETE FROM attendance a
+USING attendance b
+WHERE a.child_id = b.child_id
+  AND a.session_date = b.session_date
+  AND a.id < b.id;
+
+-- One mark per child and date; also serves the child/date lookups
+CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_child_session
+ON attendance (child_id, session_date);
+
+DROP INDEX IF EXISTS idx_attendance_child_date;
+
+-- Row version, bumped on every update, so an edit made from an old copy can be detected
+ALTER TABLE attendance
+ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION bump_attendance_version()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.version := OLD.version + 1;
+  NEW.updated_at := now();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS attendance_version ON attendance;
+CREATE TRIGGER attendance_version
+BEFORE UPDATE ON attendance
+FOR EACH ROW EXECUTE FUNCTION bump_attendance_version();
+
+-- Insert a mark, or set only the flags in p_mask (bits as in add_attendance_flags.sql) on the
+-- existing row, in one statement, so concurrent saves of different flags all land
+CREATE OR REPLACE FUNCTION merge_attendance(
+  p_child_id bigint,
+  p_session_date date,
+  p_mask integer,
+  p_values integer
+)
+RETURNS SETOF attendance
+LANGUAGE sql
+AS $$
+  INSERT INTO attendance AS a (child_id, session_date, present, early, has_book, has_pen, has_bible, gave_offering)
+  VALUES (
+    p_child_id, p_session_date,
+    (p_values & 1) <> 0, (p_values & 2) <> 0, (p_values & 4) <> 0,
+    (p_values & 8) <> 0, (p_values & 16) <> 0, (p_values & 32) <> 0
+  )
+  ON CONFLICT (child_id, session_date) DO UPDATE SET
+    present = CASE WHEN (p_mask & 1) <> 0 THEN EXCLUDED.present ELSE a.present END,
+    early = CASE WHEN (p_mask & 2) <> 0 THEN EXCLUDED.early ELSE a.early END,
+    has_book = CASE WHEN (p_mask & 4) <> 0 THEN EXCLUDED.has_book ELSE a.has_book END,
+    has_pen = CASE WHEN (p_mask & 8) <> 0 THEN EXCLUDED.has_pen ELSE a.has_pen END,
+    has_bible = CASE WHEN (p_mask & 16) <> 0 THEN EXCLUDED.has_bible ELSE a.has_bible END,
+    gave_offering = CASE WHEN (p_mask & 32) <> 0 THEN EXCLUDED.gave_offering ELSE a.gave_offering END
+  RETURNING a.*;
+$$;
+
+GRANT EXECUTE ON FUNCTION merge_attendance(bigint, date, integer, integer) TO authenticated, anon;
+
+-- The compact view gains the version, for edits made from the loaded rows
+CREATE OR REPLACE VIEW attendance_compact
+WITH (security_invoker = true) AS
+SELECT id, child_id, session_date, flags, version
+FROM attendance;
@@ -0,0 +1,23 @@
+-- Date each child's attendance is counted from, kept current by the app on every attendance write
+ALTER TABLE children
+ADD COLUMN IF NOT EXISTS enrollment_start date;
+
+-- Backfill: children seen in the first two months of the program (from 2025-03-01) count from
+-- its start, everyone else from their first attendance. Adjust the dates to match [program].
+UPDATE children c
+SET enrollment_start = CASE
+  WHEN EXISTS (
+    SELECT 1 FROM attendance w
+    WHERE w.child_id = c.id
+      AND w.session_date >= DATE '2025-03-01'
+      AND w.session_date < DATE '2025-05-01'
+  ) THEN DATE '2025-03-01'
+  ELSE f.first_attendance
+END
+FROM (
+  SELECT child_id, MIN(session_date) AS first_attendance
+  FROM attendance
+  GROUP BY child_id
+) f
+WHERE f.child_id = c.id
+  AND c.enrollment_start IS NULL;
@@ -0,0 +1,32 @@
+-- Calendar of the Sundays that actually ran; reports count available sessions from it
+-- A row without class_group applies to every class; a row for one class overrides it
+CREATE TABLE IF NOT EXISTS sessions (
+  id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  session_date date NOT NULL,
+  status text NOT NULL DEFAULT 'held' CHECK (status IN ('held', 'cancelled', 'holiday')),
+  class_group text,
+  note text,
+  created_at timestamp with time zone DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_date_class
+ON sessions (session_date, COALESCE(class_group, ''));
+
+-- Backfill: every date that already has attendance was a held session
+INSERT INTO sessions (session_date, status)
+SELECT DISTINCT session_date, 'held'
+FROM attendance
+ON CONFLICT DO NOTHING;
+
+ALTER TABLE sessions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable all operations for authenticated users"
+ON sessions
+FOR ALL
+TO authenticated, anon
+USING (true)
+WITH CHECK (true);
+
+-- Publish changes for live updates (skip if realtime is not enabled)
+ALTER PUBLICATION supabase_realtime ADD TABLE sessions;
+ALTER TABLE sessions REPLICA IDENTITY FULL;
@@ -0,0 +1,6 @@
+-- Publish row-level changes so the app can keep its shared cache current
+ALTER PUBLICATION supabase_realtime ADD TABLE children, attendance;
+
+-- Send full old rows on UPDATE/DELETE so events carry the changed record
+ALTER TABLE children REPLICA IDENTITY FULL;
+ALTER TABLE attendance REPLICA IDENTITY FULL;
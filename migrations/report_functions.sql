@@ -0,0 +1,233 @@
+-- Report aggregates computed in the database, called from the app with supabase.rpc()
+-- local_backend.py implements the same functions for the SQLite backend
+-- Run migrations/add_enrollment_start.sql first
+
+-- Totals, participation counts and per-class/OCM breakdowns for one Sunday
+CREATE OR REPLACE FUNCTION sunday_summary(p_date date)
+RETURNS json
+LANGUAGE sql STABLE
+AS $$
+  WITH day AS (
+    SELECT a.*, c.class_group, COALESCE(c.sponsored, false) AS sponsored, c.id IS NOT NULL AS registered
+    FROM attendance a
+    LEFT JOIN children c ON c.id = a.child_id
+    WHERE a.session_date = p_date
+  ),
+  kids AS (
+    SELECT c.id, c.class_group, COALESCE(c.sponsored, false) AS sponsored,
+           EXISTS (SELECT 1 FROM day d WHERE d.child_id = c.id) AS present
+    FROM children c
+  ),
+  classes AS (
+    SELECT k.class_group, MIN(k.id) AS first_id, COUNT(*) AS total,
+           COUNT(*) FILTER (WHERE k.present) AS present
+    FROM kids k
+    GROUP BY k.class_group
+  ),
+  class_flags AS (
+    SELECT d.class_group,
+           COUNT(*) FILTER (WHERE d.early) AS early,
+           COUNT(*) FILTER (WHERE d.has_book) AS has_book,
+           COUNT(*) FILTER (WHERE d.has_pen) AS has_pen,
+           COUNT(*) FILTER (WHERE d.has_bible) AS has_bible,
+           COUNT(*) FILTER (WHERE d.gave_offering) AS gave_offering
+    FROM day d
+    WHERE d.registered
+    GROUP BY d.class_group
+  )
+  SELECT json_build_object(
+    'total_children', (SELECT COUNT(*) FROM kids),
+    'total_present', (SELECT COUNT(DISTINCT child_id) FROM day),
+    'participation', (
+      SELECT CASE WHEN COUNT(*) = 0 THEN NULL ELSE json_build_object(
+        'early', COUNT(*) FILTER (WHERE early),
+        'has_book', COUNT(*) FILTER (WHERE has_book),
+        'has_pen', COUNT(*) FILTER (WHERE has_pen),
+        'has_bible', COUNT(*) FILTER (WHERE has_bible),
+        'gave_offering', COUNT(*) FILTER (WHERE gave_offering)
+      ) END
+      FROM day
+    ),
+    'classes', (
+      SELECT COALESCE(json_agg(json_build_object(
+        'name', cl.class_group,
+        'total', cl.total,
+        'present', cl.present,
+        'participation', CASE WHEN cl.present = 0 THEN NULL ELSE json_build_object(
+          'early', COALESCE(f.early, 0),
+          'has_book', COALESCE(f.has_book, 0),
+          'has_pen', COALESCE(f.has_pen, 0),
+          'has_bible', COALESCE(f.has_bible, 0),
+          'gave_offering', COALESCE(f.gave_offering, 0)
+        ) END
+      ) ORDER BY cl.first_id), '[]'::json)
+      FROM classes cl
+      LEFT JOIN class_flags f ON f.class_group IS NOT DISTINCT FROM cl.class_group
+    ),
+    'ocm', (
+      SELECT CASE WHEN COUNT(*) = 0 THEN NULL ELSE json_build_object(
+        'total', COUNT(*),
+        'present', COUNT(*) FILTER (WHERE k.present),
+        'participation', CASE WHEN COUNT(*) FILTER (WHERE k.present) = 0 THEN NULL ELSE (
+          SELECT json_build_object(
+            'early', COUNT(*) FILTER (WHERE d.early),
+            'has_book', COUNT(*) FILTER (WHERE d.has_book),
+            'has_pen', COUNT(*) FILTER (WHERE d.has_pen),
+            'has_bible', COUNT(*) FILTER (WHERE d.has_bible),
+            'gave_offering', COUNT(*) FILTER (WHERE d.gave_offering)
+          )
+          FROM day d
+          WHERE d.sponsored
+        ) END
+      ) END
+      FROM kids k
+      WHERE k.sponsored
+    )
+  );
+$$;
+
+-- Session count, daily trends and per-class/OCM attendance and participation sums for one month
+CREATE OR REPLACE FUNCTION monthly_summary(p_year integer, p_month integer)
+RETURNS json
+LANGUAGE sql STABLE
+AS $$
+  WITH month AS (
+    SELECT a.*, c.class_group, COALESCE(c.sponsored, false) AS sponsored, c.id IS NOT NULL AS registered
+    FROM attendance a
+    LEFT JOIN children c ON c.id = a.child_id
+    WHERE a.session_date >= make_date(p_year, p_month, 1)
+      AND a.session_date < make_date(p_year, p_month, 1) + interval '1 month'
+  ),
+  classes AS (
+    SELECT class_group, MIN(id) AS first_id, COUNT(*) AS total
+    FROM children
+    GROUP BY class_group
+  ),
+  class_flags AS (
+    SELECT m.class_group, COUNT(*) AS attended,
+           COUNT(*) FILTER (WHERE m.early) AS early,
+           COUNT(*) FILTER (WHERE m.has_book) AS has_book,
+           COUNT(*) FILTER (WHERE m.has_pen) AS has_pen,
+           COUNT(*) FILTER (WHERE m.has_bible) AS has_bible,
+           COUNT(*) FILTER (WHERE m.gave_offering) AS gave_offering
+    FROM month m
+    WHERE m.registered
+    GROUP BY m.class_group
+  ),
+  trends AS (
+    SELECT session_date, COUNT(*) AS present,
+           COUNT(*) FILTER (WHERE early) AS early,
+           COUNT(*) FILTER (WHERE has_book) AS has_book,
+           COUNT(*) FILTER (WHERE has_pen) AS has_pen,
+           COUNT(*) FILTER (WHERE has_bible) AS has_bible,
+           COUNT(*) FILTER (WHERE gave_offering) AS gave_offering
+    FROM month
+    GROUP BY session_date
+  )
+  SELECT json_build_object(
+    'total_sessions', (SELECT COUNT(DISTINCT session_date) FROM month),
+    'total_children', (SELECT COUNT(*) FROM children),
+    'attended', (SELECT COUNT(*) FROM month),
+    'trends', (
+      SELECT COALESCE(json_agg(json_build_object(
+        'date', to_char(session_date, 'YYYY-MM-DD'),
+        'present', present,
+        'early', early,
+        'has_book', has_book,
+        'has_pen', has_pen,
+        'has_bible', has_bible,
+        'gave_offering', gave_offering
+      ) ORDER BY session_date), '[]'::json)
+      FROM trends
+    ),
+    'classes', (
+      SELECT COALESCE(json_agg(json_build_object(
+        'name', cl.class_group,
+        'total', cl.total,
+        'attended', COALESCE(f.attended, 0),
+        'participation', json_build_object(
+          'early', COALESCE(f.early, 0),
+          'has_book', COALESCE(f.has_book, 0),
+          'has_pen', COALESCE(f.has_pen, 0),
+          'has_bible', COALESCE(f.has_bible, 0),
+          'gave_offering', COALESCE(f.gave_offering, 0)
+        )
+      ) ORDER BY cl.first_id), '[]'::json)
+      FROM classes cl
+      LEFT JOIN class_flags f ON f.class_group IS NOT DISTINCT FROM cl.class_group
+    ),
+    'ocm', (
+      SELECT CASE WHEN COUNT(*) = 0 THEN NULL ELSE json_build_object(
+        'total', COUNT(*),
+        'attended', (SELECT COUNT(*) FROM month WHERE sponsored),
+        'participation', (
+          SELECT json_build_object(
+            'early', COUNT(*) FILTER (WHERE early),
+            'has_book', COUNT(*) FILTER (WHERE has_book),
+            'has_pen', COUNT(*) FILTER (WHERE has_pen),
+            'has_bible', COUNT(*) FILTER (WHERE has_bible),
+            'gave_offering', COUNT(*) FILTER (WHERE gave_offering)
+          )
+          FROM month
+          WHERE sponsored
+        )
+      ) END
+      FROM children
+      WHERE COALESCE(sponsored, false)
+    )
+  );
+$$;
+
+-- Per-child session tallies for one month, optionally limited to a class or to OCM children
+-- is_new marks children whose enrollment start is not the program start, as in reports.is_new_enrollment;
+-- children without a stored enrollment_start get it computed from their attendance
+DROP FUNCTION IF EXISTS monthly_child_tallies(integer, integer, text, boolean);
+CREATE OR REPLACE FUNCTION monthly_child_tallies(
+  p_year integer,
+  p_month integer,
+  p_class_group text DEFAULT NULL,
+  p_sponsored boolean DEFAULT NULL,
+  p_program_start date DEFAULT DATE '2025-03-01',
+  p_window_end date DEFAULT DATE '2025-05-01'
+)
+RETURNS TABLE (
+  child_id bigint,
+  full_name text,
+  class_group text,
+  first_attendance date,
+  sessions_attended bigint,
+  sessions_since_tracking bigint,
+  enrollment_start date,
+  is_new boolean
+)
+LANGUAGE sql STABLE
+AS $$
+  SELECT t.*, t.enrollment_start <> p_program_start
+  FROM (
+    SELECT c.id, c.full_name, c.class_group,
+           MIN(a.session_date),
+           COUNT(*),
+           COUNT(*) FILTER (WHERE a.session_date >= p_program_start),
+           COALESCE(c.enrollment_start, CASE
+             WHEN EXISTS (
+               SELECT 1 FROM attendance w
+               WHERE w.child_id = c.id
+                 AND w.session_date >= p_program_start
+                 AND w.session_date < p_window_end
+             ) THEN p_program_start
+             ELSE (SELECT MIN(f.session_date) FROM attendance f WHERE f.child_id = c.id)
+           END) AS enrollment_start
+    FROM children c
+    JOIN attendance a ON a.child_id = c.id
+    WHERE a.session_date >= make_date(p_year, p_month, 1)
+      AND a.session_date < make_date(p_year, p_month, 1) + interval '1 month'
+      AND (p_class_group IS NULL OR c.class_group = p_class_group)
+      AND (p_sponsored IS NULL OR COALESCE(c.sponsored, false) = p_sponsored)
+    GROUP BY c.id, c.full_name, c.class_group, c.enrollment_start
+  ) t
+  ORDER BY t.id;
+$$;
+
+GRANT EXECUTE ON FUNCTION sunday_summary(date) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION monthly_summary(integer, integer) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION monthly_child_tallies(integer, integer, text, boolean, date, date) TO anon, authenticated;
@@ -0,0 +1,279 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import httpx
+
+from metrics import track
+
+# Default message to parents of children on the follow-up list
+DEFAULT_TEMPLATE = (
+    "Hello {parent}, we have missed {children} at Sunday School for the last {missed} Sundays. "
+    "We hope all is well and look forward to seeing you soon."
+)
+
+# Deliveries kept for the status table; the oldest finished ones are dropped first
+MAX_DELIVERIES = 1000
+
+
+def normalize_contact(contact):
+    """Phone number or address with spacing and punctuation removed, or None when empty"""
+    if contact is None or (isinstance(contact, float) and contact != contact):
+        return None
+    contact = re.sub(r"[\s\-().]", "", str(contact))
+    return contact or None
+
+
+class FileTransport:
+    """Append messages as JSON lines to an outbox file instead of sending them
+
+    For offline use and tests; another process can pick the file up and
+    deliver the messages.
+    """
+
+    name = "file"
+
+    def __init__(self, path="outbox.jsonl"):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        """Write the messages and return one error (None on success) per message"""
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                for message in messages:
+                    f.write(json.dumps({**message, "sent_at": datetime.now().isoformat()}) + "\n")
+        return [None] * len(messages)
+
+
+class WebhookTransport:
+    """POST each batch as JSON to an SMS or e-mail gateway
+
+    The gateway answers with {"results": [{"error": null | "..."}, ...]} in
+    message order; any other successful answer counts as all delivered.
+    """
+
+    name = "webhook"
+
+    def __init__(self, url, token=None, timeout=10):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.url = url
+        self._client = httpx.Client(timeout=timeout, headers=headers)
+
+    def send_batch(self, messages):
+        response = self._client.post(self.url, json={"messages": messages})
+        response.raise_for_status()
+        try:
+            results = response.json().get("results")
+        except ValueError:
+            results = None
+        if not isinstance(results, list) or len(results) != len(messages):
+            return [None] * len(messages)
+        return [result.get("error") if isinstance(result, dict) else None for result in results]
+
+
+def make_transport(config):
+    """Transport from the [notifications] config section; the file outbox by default"""
+    if config.get("transport", "file") == "webhook":
+        return WebhookTransport(config["webhook_url"], config.get("webhook_token"), config.get("timeout", 10))
+    return FileTransport(config.get("outbox", "outbox.jsonl"))
+
+
+class DispatchQueue:
+    """Send parent messages in batches on a background thread
+
+    Messages are keyed by contact: queuing a second message for a contact
+    that is still waiting replaces it, and a contact that already received
+    the same text within dedupe_seconds is skipped. Sends are limited to
+    rate_per_minute messages, failed messages are retried with backoff up
+    to retries times, and every message's status is kept in deliveries.
+    """
+
+    def __init__(self, transport, batch_size=20, rate_per_minute=60, retries=3,
+                 base_delay=1.0, max_delay=60.0, dedupe_seconds=24 * 3600):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.rate_per_minute = rate_per_minute
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.dedupe_seconds = dedupe_seconds
+        self.deliveries = OrderedDict()
+        self._pending = OrderedDict()
+        self._sent = {}
+        self._next_id = 0
+        self._tokens = float(batch_size)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name="notify-dispatch", daemon=True)
+        self._worker.start()
+
+    def enqueue(self, contact, text, recipient=None):
+        """Queue a message for a contact; returns its delivery id, or None if skipped"""
+        contact = normalize_contact(contact)
+        if contact is None:
+            return None
+        with self._lock:
+            sent_at = self._sent.get((contact, text))
+            if sent_at is not None and time.monotonic() - sent_at < self.dedupe_seconds:
+                return None
+            replaced = self._pending.pop(contact, None)
+            if replaced is not None:
+                self._update(replaced["id"], "replaced")
+            self._next_id += 1
+            message = {"id": self._next_id, "contact": contact, "recipient": recipient, "text": text}
+            self._pending[contact] = {**message, "attempts": 0, "due": 0.0}
+            self.deliveries[message["id"]] = {
+                **message, "status": "queued", "attempts": 0, "error": None,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._trim()
+        self._wake.set()
+        return message["id"]
+
+    def _update(self, delivery_id, status, error=None, attempts=None):
+        delivery = self.deliveries.get(delivery_id)
+        if delivery is None:
+            return
+        delivery.update(status=status, error=error, updated_at=datetime.now().isoformat(timespec="seconds"))
+        if attempts is not None:
+            delivery["attempts"] = attempts
+
+    def _trim(self):
+        while len(self.deliveries) > MAX_DELIVERIES:
+            oldest = next(iter(self.deliveries))
+            if self.deliveries[oldest]["status"] in ("queued", "retrying"):
+                break
+            self.deliveries.popitem(last=False)
+
+    def _take_batch(self):
+        """Messages due now, up to the batch size and the rate limit tokens available"""
+        now = time.monotonic()
+        self._tokens = min(float(self.batch_size), self._tokens + (now - self._refilled_at) * self.rate_per_minute / 60)
+        self._refilled_at = now
+        batch = []
+        for contact, message in list(self._pending.items()):
+            if len(batch) >= min(self.batch_size, int(self._tokens)):
+                break
+            if message["due"] <= now:
+                batch.append(self._pending.pop(contact))
+        self._tokens -= len(batch)
+        return batch
+
+    def _next_wait(self):
+        """Seconds until a message is due or a rate limit token frees up"""
+        if not self._pending:
+            return None
+        now = time.monotonic()
+        due = min(message["due"] for message in self._pending.values()) - now
+        refill = (1 - self._tokens) * 60 / self.rate_per_minute if self._tokens < 1 else 0
+        return max(due, refill, 0.05)
+
+    def _run(self):
+        while not self._stopped:
+            with self._lock:
+                batch = self._take_batch()
+                wait = None if batch else self._next_wait()
+            if batch:
+                self._send(batch)
+                continue
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def _send(self, batch):
+        payload = [{key: message[key] for key in ("id", "contact", "recipient", "text")} for message in batch]
+        with track(f"notify.{getattr(self.transport, 'name', 'send')}") as span:
+            span.rows = len(batch)
+            try:
+                errors = self.transport.send_batch(payload)
+            except Exception as e:
+                errors = [str(e)] * len(batch)
+        with self._lock:
+            for message, error in zip(batch, errors):
+                message["attempts"] += 1
+                if error is None:
+                    self._sent[(message["contact"], message["text"])] = time.monotonic()
+                    self._update(message["id"], "sent", attempts=message["attempts"])
+                elif message["contact"] in self._pending:
+                    # A newer message for this contact was queued meanwhile
+                    self._update(message["id"], "replaced", str(error), message["attempts"])
+                elif message["attempts"] <= self.retries:
+                    # Full-jitter exponential backoff, as for database retries
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** message["attempts"])))
+                    message["due"] = time.monotonic() + delay
+                    self._pending[message["contact"]] = message
+                    self._update(message["id"], "retrying", str(error), message["attempts"])
+                else:
+                    self._update(message["id"], "failed", str(error), message["attempts"])
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for delivery in self.deliveries.values():
+                counts[delivery["status"]] = counts.get(delivery["status"], 0) + 1
+            return {"pending": len(self._pending), **counts}
+
+    def snapshot(self):
+        """Copies of the deliveries, oldest first, taken while the worker cannot change them"""
+        with self._lock:
+            return [dict(delivery) for delivery in self.deliveries.values()]
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+
+def parent_messages(follow_ups, template=DEFAULT_TEMPLATE):
+    """One message per parent contact for the children on a follow-up list
+
+    Siblings sharing a contact get a single message naming all of them.
+    Returns (contact, text, recipient) tuples.
+    """
+    by_contact = OrderedDict()
+    for _, child in follow_ups.iterrows():
+        for parent_col, contact_col in (("Parent 1", "Parent 1 Contact"), ("Parent 2", "Parent 2 Contact")):
+            contact = normalize_contact(child.get(contact_col))
+            if contact is None:
+                continue
+            parent = child.get(parent_col)
+            parent = parent.strip() if isinstance(parent, str) and parent.strip() else "Parent"
+            entry = by_contact.setdefault(contact, {"parent": parent, "children": [], "missed": 0})
+            entry["children"].append(child["Name"])
+            entry["missed"] = max(entry["missed"], int(child["Missed Sundays"]))
+
+    messages = []
+    for contact, entry in by_contact.items():
+        children = entry["children"]
+        names = children[0] if len(children) == 1 else ", ".join(children[:-1]) + " and " + children[-1]
+        text = template.format(parent=entry["parent"], children=names, missed=entry["missed"])
+        messages.append((contact, text, entry["parent"]))
+    return messages
+
+
+# One dispatcher per process, so queued messages survive Streamlit reruns
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher(config):
+    """Shared dispatch queue built from the [notifications] config section on first use"""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = DispatchQueue(
+                make_transport(config),
+                batch_size=config.get("batch_size", 20),
+                rate_per_minute=config.get("rate_per_minute", 60),
+                retries=config.get("retries", 3),
+            )
+        return _dispatcher
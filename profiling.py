@@ -0,0 +1,208 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+
+import metrics
+
+# Seconds between stack samples taken for the flame graph
+SAMPLE_INTERVAL = 0.005
+
+# Functions kept in a profile's hot-function table
+TOP_FUNCTIONS = 40
+
+# Saved profiles kept; older ones are deleted as new ones are saved
+KEEP_PROFILES = 50
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PANDAS_DIR = os.path.dirname(pd.__file__)
+
+
+def _short_path(path):
+    """File path relative to the app or to the installed packages, for display"""
+    if path.startswith(APP_DIR + os.sep):
+        return os.path.relpath(path, APP_DIR)
+    marker = "site-packages" + os.sep
+    return path.split(marker, 1)[1] if marker in path else path
+
+
+def _label(file, line, name):
+    return f"{name} ({_short_path(file)}:{line})" if line else name
+
+
+class Capture:
+    """Profile of one rerun of a page on the calling thread
+
+    While running, a deterministic profiler (cProfile) times every function
+    call on the thread, a sampler thread records its stack every
+    SAMPLE_INTERVAL for a flame graph, and the metrics spans (database calls,
+    report steps) ended on the thread are collected. Nothing is hooked in
+    until start() and everything is unhooked by stop().
+    """
+
+    def __init__(self, page, interval=SAMPLE_INTERVAL):
+        self.page = page
+        self.interval = interval
+        self.spans = []
+        self.stacks = Counter()
+        self._thread = threading.get_ident()
+        self._profiler = cProfile.Profile()
+        self._done = threading.Event()
+        self._sampler = None
+        self._started = None
+        self.seconds = None
+
+    def _record_span(self, span):
+        if threading.get_ident() == self._thread:
+            self.spans.append({
+                "Operation": span.name,
+                "Start ms": round((span.started - self._started) * 1000, 1),
+                "ms": round(span.duration_ms, 1),
+                "Rows": span.rows,
+                "Cache hit": span.cache_hit,
+                "Error": span.error,
+            })
+
+    def _sample(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self._thread)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(_label(code.co_filename, code.co_firstlineno, code.co_name).replace(";", ","))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self):
+        """Begin profiling; raises ValueError if another profiler is active where only one may be"""
+        self._started = time.perf_counter()
+        self._profiler.enable()
+        metrics.registry.add_listener(self._record_span)
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._profiler.disable()
+        self.seconds = time.perf_counter() - self._started
+        self._done.set()
+        self._sampler.join()
+        metrics.registry.remove_listener(self._record_span)
+        return self
+
+    def top_functions(self, limit=TOP_FUNCTIONS):
+        """Functions by cumulative time: calls, time in the function itself and in total"""
+        stats = pstats.Stats(self._profiler).stats
+        rows = [
+            {
+                "Function": _label(file, line, name),
+                "Calls": calls,
+                "Own ms": round(own * 1000, 1),
+                "Total ms": round(total * 1000, 1),
+            }
+            for (file, line, name), (_, calls, own, total, _) in stats.items()
+        ]
+        frame = pd.DataFrame(rows, columns=["Function", "Calls", "Own ms", "Total ms"])
+        return frame.sort_values("Total ms", ascending=False, ignore_index=True).head(limit)
+
+    def pandas_operations(self):
+        """Time in each pandas function called directly from code outside pandas
+
+        That is the pandas operations the app and Streamlit asked for (merge,
+        groupby, to_datetime...), with everything pandas did for them counted in.
+        """
+        totals = {}
+        for (file, line, name), (_, _, _, _, callers) in pstats.Stats(self._profiler).stats.items():
+            if not file.startswith(PANDAS_DIR) or name.startswith("<"):
+                continue
+            # Public functions and operators (__getitem__...) only, not pandas internals
+            if name.startswith("_") and not name.endswith("__"):
+                continue
+            for (caller_file, _, _), (_, calls, _, total) in callers.items():
+                if caller_file.startswith(PANDAS_DIR):
+                    continue
+                entry = totals.setdefault(_label(file, line, name), [0, 0.0])
+                entry[0] += calls
+                entry[1] += total
+        frame = pd.DataFrame(
+            [{"Operation": label, "Calls": calls, "Total ms": round(total * 1000, 1)}
+             for label, (calls, total) in totals.items()],
+            columns=["Operation", "Calls", "Total ms"]
+        )
+        return frame.sort_values("Total ms", ascending=False, ignore_index=True)
+
+    def folded_stacks(self):
+        """Samples in the collapsed-stack format read by flamegraph.pl and speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def save(self, root):
+        """Write the profile to a new directory under root and return its path"""
+        stamp = datetime.now()
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", self.page).strip("-").lower() or "page"
+        path = os.path.join(root, f"{stamp:%Y%m%d-%H%M%S-%f}-{slug}")
+        os.makedirs(path)
+        self._profiler.dump_stats(os.path.join(path, "profile.prof"))
+        with open(os.path.join(path, "stacks.folded"), "w") as f:
+            f.write(self.folded_stacks())
+        self.top_functions().to_csv(os.path.join(path, "top.csv"), index=False)
+        self.pandas_operations().to_csv(os.path.join(path, "pandas.csv"), index=False)
+        pd.DataFrame(self.spans, columns=["Operation", "Start ms", "ms", "Rows", "Cache hit", "Error"]).to_csv(
+            os.path.join(path, "spans.csv"), index=False
+        )
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({
+                "page": self.page,
+                "captured_at": stamp.isoformat(timespec="seconds"),
+                "seconds": round(self.seconds, 3),
+                "samples": sum(self.stacks.values()),
+                "interval": self.interval,
+            }, f, indent=2)
+        _prune(root)
+        return path
+
+
+def begin(page):
+    """Start capturing the current rerun of page, or None if a profiler cannot be started"""
+    try:
+        return Capture(page).start()
+    except ValueError:
+        # Python 3.12+ allows one cProfile at a time; another session is being profiled
+        return None
+
+
+def _prune(root, keep=KEEP_PROFILES):
+    for name in list_profiles(root)[keep:]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def list_profiles(root):
+    """Saved profile directory names, newest first"""
+    if not os.path.isdir(root):
+        return []
+    names = [name for name in os.listdir(root) if os.path.isfile(os.path.join(root, name, "meta.json"))]
+    return sorted(names, reverse=True)
+
+
+def load_profile(root, name):
+    """A saved profile: its meta dict, the top, pandas and spans tables and the raw files"""
+    path = os.path.join(root, name)
+    with open(os.path.join(path, "meta.json")) as f:
+        profile = {"meta": json.load(f)}
+    for table in ("top", "pandas", "spans"):
+        profile[table] = pd.read_csv(os.path.join(path, f"{table}.csv"))
+    with open(os.path.join(path, "stacks.folded")) as f:
+        profile["stacks"] = f.read()
+    with open(os.path.join(path, "profile.prof"), "rb") as f:
+        profile["prof"] = f.read()
+    return profile
@@ -0,0 +1,245 @@
+import difflib
+import os
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from flag_bits import FLAG_BITS, FLAG_COLUMNS
+
+# Letters accepted in a register cell, each setting one flag; a cell with any of them is present
+CODES = {
+    "P": "present",
+    "E": "early",
+    "K": "has_book",
+    "N": "has_pen",
+    "B": "has_bible",
+    "O": "gave_offering",
+}
+
+# Cells meaning present with no other flag
+PRESENT_MARKS = ["1", "X", "Y", "YES", "TRUE", "✓"]
+
+# Cells meaning absent, which write nothing
+ABSENT_MARKS = ["", "A", "0", "-", "N/A", "NO", "FALSE", "NAN"]
+
+# Header names recognised for the name and (optional) class columns, compared in lower case
+NAME_COLUMNS = ["name", "full name", "full_name", "child", "child name"]
+CLASS_COLUMNS = ["class", "class group", "class_group"]
+
+# Headers starting year-first, never read day-first
+ISO_DATE = re.compile(r"^\d{4}-\d{1,2}-\d{1,2}")
+
+# How similar a misspelt name must be to a registered one to be matched to it
+FUZZY_CUTOFF = 0.85
+
+
+def read_sheet(file, file_name=None):
+    """Read a register from a CSV or Excel file (path or upload) with every cell as text"""
+    file_name = file_name or getattr(file, "name", None) or str(file)
+    if os.path.splitext(file_name)[1].lower() == ".csv":
+        return pd.read_csv(file, dtype=str, keep_default_na=False)
+    return pd.read_excel(file, dtype=str).fillna("")
+
+
+def normalize_names(names):
+    """Names compared case-, spacing- and punctuation-insensitively"""
+    return (
+        names.fillna("").astype(str).str.lower()
+        .str.replace(r"[^\w\s]", "", regex=True)
+        .str.split().str.join(" ")
+    )
+
+
+def _find_column(columns, candidates):
+    lookup = {str(column).strip().lower(): column for column in columns}
+    return next((lookup[name] for name in candidates if name in lookup), None)
+
+
+def _date_columns(columns, skip, dayfirst=False):
+    """{column: ISO date} for the headers that are Sunday dates, and {column: weekday} for other dates
+
+    dayfirst reads 01/06/2025 as 1 June rather than 6 January; ISO headers
+    (2025-06-01, as Excel dates come in) are year-first either way.
+    """
+    dates, not_sundays = {}, {}
+    for column in columns:
+        text = str(column).strip()
+        if column in skip or not any(ch.isdigit() for ch in text):
+            continue
+        with warnings.catch_warnings():
+            # Headers in mixed formats are parsed one by one on purpose
+            warnings.simplefilter("ignore", UserWarning)
+            parsed = pd.to_datetime(text, errors="coerce", dayfirst=dayfirst and not ISO_DATE.match(text))
+        if pd.isna(parsed):
+            continue
+        if parsed.dayofweek == 6:
+            dates[column] = parsed.strftime("%Y-%m-%d")
+        else:
+            not_sundays[column] = parsed.strftime("%A %Y-%m-%d")
+    return dates, not_sundays
+
+
+def _name_index(children_df):
+    """Normalized name (and name + class) -> child id, and the keys several children share"""
+    keys = pd.DataFrame({
+        "id": children_df["id"].to_numpy(),
+        "name": normalize_names(children_df["full_name"]).to_numpy(),
+        "class": normalize_names(children_df["class_group"]).to_numpy(),
+    })
+    keys["name_class"] = keys["name"] + "|" + keys["class"]
+    index, ambiguous = {}, set()
+    for column in ("name", "name_class"):
+        counts = keys[column].value_counts()
+        unique = keys[keys[column].map(counts) == 1]
+        index.update(zip(unique[column], unique["id"]))
+        ambiguous.update(counts.index[counts > 1])
+    return index, ambiguous
+
+
+def _fuzzy(name, candidates, cutoff):
+    """The one candidate clearly closest to name, or None"""
+    matches = difflib.get_close_matches(name, candidates, n=2, cutoff=cutoff)
+    if not matches:
+        return None
+    if len(matches) == 2:
+        best, second = (difflib.SequenceMatcher(None, name, match).ratio() for match in matches)
+        if best - second < 0.05:
+            return None
+    return matches[0]
+
+
+def match_children(names, classes, children_df, cutoff=FUZZY_CUTOFF):
+    """Child id for each sheet name, exact first and then by closest spelling
+
+    Returns a frame aligned with names: child_id (NaN when unmatched), how
+    ('exact' or 'fuzzy') and the reason a name was not matched. With a
+    class column, name and class together pick between namesakes.
+    """
+    index, ambiguous = _name_index(children_df)
+    keys = normalize_names(pd.Series(names))
+    class_keys = keys + "|" + normalize_names(pd.Series(classes)) if classes is not None else None
+
+    result = pd.DataFrame({"child_id": np.nan, "how": None, "reason": None}, index=keys.index)
+    if class_keys is not None:
+        hits = class_keys.map(index)
+        result.loc[hits.notna(), "child_id"] = hits
+    hits = keys.map(index)
+    fill = result["child_id"].isna() & hits.notna()
+    result.loc[fill, "child_id"] = hits[fill]
+    result.loc[result["child_id"].notna(), "how"] = "exact"
+
+    candidates = [key for key in index if "|" not in key]
+    for position in result.index[result["child_id"].isna()]:
+        key = keys[position]
+        if not key:
+            result.loc[position, "reason"] = "no name"
+        elif key in ambiguous and (class_keys is None or class_keys[position] not in index):
+            result.loc[position, "reason"] = "several children have this name; add their class"
+        else:
+            match = _fuzzy(key, candidates, cutoff)
+            if match is None:
+                result.loc[position, "reason"] = "no registered child with this name"
+            else:
+                result.loc[position, ["child_id", "how"]] = [index[match], "fuzzy"]
+    return result
+
+
+def plan_import(sheet, children_df, cutoff=FUZZY_CUTOFF, dayfirst=False):
+    """Turn a wide register (one row per child, one column per date) into marks to save
+
+    Returns a dict with 'marks' (child_id, full_name, session_date and the
+    six flags, one row per child and date), 'matches' (how each sheet name
+    was matched), 'rejects' (sheet row, column, value and reason for every
+    cell or row left out, dates that are not Sundays included) and
+    'ignored_columns'. dayfirst reads headers like 01/06/2025 as 1 June.
+    Raises ValueError when the sheet has no name column or no Sunday columns.
+    """
+    name_column = _find_column(sheet.columns, NAME_COLUMNS)
+    if name_column is None:
+        raise ValueError(f"No name column; name one of the columns {', '.join(NAME_COLUMNS)}")
+    class_column = _find_column(sheet.columns, CLASS_COLUMNS)
+    dates, not_sundays = _date_columns(sheet.columns, {name_column, class_column}, dayfirst)
+    if not dates:
+        hint = " (are the dates day first?)" if not_sundays else ""
+        raise ValueError(f"No Sunday date columns{hint}; the headers after the names must be the Sunday dates")
+    ignored = [
+        column for column in sheet.columns
+        if column not in dates and column not in not_sundays and column not in (name_column, class_column)
+    ]
+
+    sheet = sheet.reset_index(drop=True)
+    # Spreadsheet row numbers, after the header row
+    rows = pd.Series(sheet.index + 2, index=sheet.index)
+    matched = match_children(
+        sheet[name_column], sheet[class_column] if class_column is not None else None, children_df, cutoff
+    )
+    names = children_df.set_index("id")["full_name"]
+    matches = pd.DataFrame({
+        "Row": rows,
+        "Sheet Name": sheet[name_column],
+        "Child": matched["child_id"].map(names),
+        "Match": matched["how"],
+    })
+    rejects = [pd.DataFrame({
+        "Row": rows[matched["reason"].notna()],
+        "Column": name_column,
+        "Value": sheet.loc[matched["reason"].notna(), name_column],
+        "Reason": matched["reason"].dropna(),
+    }), pd.DataFrame({
+        # The header row; a whole column read as another weekday is usually a day/month mix-up
+        "Row": 1,
+        "Column": list(not_sundays),
+        "Value": list(not_sundays),
+        "Reason": [f"read as {day}, not a Sunday; check the date format" for day in not_sundays.values()],
+    })]
+
+    # One row per child and date, dropping blanks and absences
+    cells = sheet[list(dates)].assign(row=rows, child_id=matched["child_id"]).melt(
+        id_vars=["row", "child_id"], var_name="column", value_name="value"
+    )
+    codes = cells["value"].fillna("").astype(str).str.strip().str.upper()
+    cells = cells[~codes.isin(ABSENT_MARKS) & cells["child_id"].notna()]
+    codes = codes[cells.index]
+
+    present_only = codes.isin(PRESENT_MARKS)
+    unknown = ~present_only & (codes.str.replace(f"[{''.join(CODES)}\\s,;/]", "", regex=True) != "")
+    rejects.append(pd.DataFrame({
+        "Row": cells.loc[unknown, "row"],
+        "Column": cells.loc[unknown, "column"],
+        "Value": cells.loc[unknown, "value"],
+        "Reason": f"unknown code; use {', '.join(f'{code} {flag}' for code, flag in CODES.items())}",
+    }))
+    cells, codes = cells[~unknown], codes[~unknown]
+
+    flags = pd.Series(FLAG_BITS["present"], index=cells.index)
+    # Letter codes only; the letters of YES or TRUE set nothing beyond present
+    letters = codes.where(~present_only, "")
+    for code, flag in CODES.items():
+        flags |= letters.str.contains(code, regex=False).astype(int) * FLAG_BITS[flag]
+    marks = pd.DataFrame({
+        "row": cells["row"],
+        "child_id": cells["child_id"].astype("int64"),
+        "session_date": cells["column"].map(dates),
+    })
+    for flag in FLAG_COLUMNS:
+        marks[flag] = (flags & FLAG_BITS[flag]) != 0
+
+    # A child on two sheet rows: the first row's marks are kept
+    repeated = marks.duplicated(["child_id", "session_date"])
+    rejects.append(pd.DataFrame({
+        "Row": marks.loc[repeated, "row"],
+        "Column": cells.loc[repeated, "column"],
+        "Value": cells.loc[repeated, "value"],
+        "Reason": "child already marked for this date on an earlier row",
+    }))
+    marks = marks[~repeated].drop(columns="row")
+    marks.insert(1, "full_name", marks["child_id"].map(names))
+
+    return {
+        "marks": marks.sort_values(["session_date", "child_id"]).reset_index(drop=True),
+        "matches": matches,
+        "rejects": pd.concat(rejects, ignore_index=True).sort_values("Row", kind="stable").reset_index(drop=True),
+        "ignored_columns": ignored,
+    }
@@ -0,0 +1,132 @@
+import threading
+
+import pandas as pd
+
+from flag_bits import FLAG_BITS
+from local_backend import LocalClient, SCHEMA
+
+# Tables copied into the replica
+TABLES = ["children", "attendance"]
+
+# Report functions answered from the replica; writes always go to the primary
+REPORT_FUNCTIONS = ("sunday_summary", "monthly_summary", "monthly_child_tallies")
+
+# Changes queued between syncs before the replica stops tracking them and rebuilds instead
+MAX_PENDING = 50000
+
+# Columns copied per table; attendance flags are unpacked into the boolean columns the queries use
+COLUMNS = {
+    "children": [name for name in SCHEMA["children"] if name != "created_at"],
+    "attendance": ["id", "child_id", "session_date", "version"] + list(FLAG_BITS),
+}
+
+
+def _values(table, row):
+    """Row as the replica stores it, in COLUMNS order"""
+    if table == "attendance":
+        flags = row.get("flags") or 0
+        return [row.get("id"), row.get("child_id"), row.get("session_date"), row.get("version") or 1] + \
+            [int(bool(flags & bit)) for bit in FLAG_BITS.values()]
+    return [row.get(name) for name in COLUMNS[table]]
+
+
+class AnalyticsReplica:
+    """Local SQL copy of children and attendance that report queries run against
+
+    Fed by the table cache: its observer queues every change, and sync()
+    applies the changes made since the last sync in one transaction, then
+    moves the watermark to the cache version it caught up with. A refetched
+    table, or more than MAX_PENDING queued changes, triggers a rebuild from
+    the cached rows instead. The copy has the local backend's schema, so the
+    report functions of local_backend.py run on it unchanged.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.client = LocalClient(path)
+        self.watermark = None
+        self.stale = True
+        self._pending = []
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def record(self, table, old, new):
+        """Table cache observer: queue one change; runs under the cache lock, so only appends"""
+        if table not in TABLES:
+            return
+        with self._lock:
+            if self.stale:
+                return
+            if (old is None and new is None) or len(self._pending) >= MAX_PENDING:
+                self.stale = True
+                self._pending = []
+                return
+            self._pending.append((table, old, new))
+
+    def _snapshot(self, children_rows, attendance_rows):
+        # Called under the cache lock, so every change after this point is queued
+        with self._lock:
+            self._pending = []
+            self.stale = False
+        return children_rows, attendance_rows
+
+    def sync(self, cache):
+        """Bring the replica up to the cache's current version; returns the number of changes applied"""
+        with self._sync_lock:
+            version = cache.version
+            applied = 0
+            try:
+                if self.stale:
+                    snapshot = cache.with_rows(TABLES, self._snapshot)
+                    self._rebuild(dict(zip(TABLES, snapshot)))
+                    applied = sum(len(rows) for rows in snapshot)
+                with self._lock:
+                    pending, self._pending = self._pending, []
+                self._apply(pending)
+            except Exception:
+                # The transaction rolled back and the dequeued changes are gone; rebuild on the next sync
+                with self._lock:
+                    self.stale = True
+                    self._pending = []
+                raise
+            self.watermark = version
+            return applied + len(pending)
+
+    def _write(self, conn, table, rows):
+        columns = COLUMNS[table]
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [_values(table, row) for row in rows]
+        )
+
+    def _rebuild(self, rows):
+        with self.client.guard():
+            conn = self.client.connection()
+            with conn:
+                for table in TABLES:
+                    conn.execute(f"DELETE FROM {table}")
+                    self._write(conn, table, rows[table])
+
+    def _apply(self, changes):
+        if not changes:
+            return
+        with self.client.guard():
+            conn = self.client.connection()
+            with conn:
+                for table, old, new in changes:
+                    if new is None:
+                        conn.execute(f"DELETE FROM {table} WHERE id = ?", [old.get("id")])
+                    else:
+                        self._write(conn, table, [new])
+
+    def rpc(self, name, **params):
+        """Run a report function on the replica, with the same result as the database function"""
+        if name not in REPORT_FUNCTIONS:
+            raise ValueError(f"Not a report function: {name}")
+        return self.client.rpc(name, params).execute().data
+
+    def query(self, sql, params=()):
+        """Run a read-only SQL query on the replica and return the result as a DataFrame"""
+        with self.client.guard():
+            cursor = self.client.connection().execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
@@ -0,0 +1,750 @@
+import pandas as pd
+import numpy as np
+from memo import memoize
+from session_calendar import month_bounds
+
+# Participation flags recorded for each child that attended
+PARTICIPATION_COLUMNS = ['early', 'has_book', 'has_pen', 'has_bible', 'gave_offering']
+
+# Start of attendance tracking; children seen in its first months are counted from here
+PROGRAM_START = pd.Timestamp('2025-03-01')
+
+# Children first seen after this are new, and counted from their own first attendance
+ENROLLMENT_WINDOW_END = pd.Timestamp('2025-05-01')
+
+
+def configure_program(start=None, window_months=2):
+    """Set the program start date and how long children seen from it count as existing"""
+    global PROGRAM_START, ENROLLMENT_WINDOW_END
+    if start:
+        PROGRAM_START = pd.Timestamp(start)
+    ENROLLMENT_WINDOW_END = PROGRAM_START + pd.DateOffset(months=int(window_months))
+
+
+def participation_counts(df):
+    """Sum each participation flag over the given attendance rows"""
+    return {col: df[col].sum() for col in PARTICIPATION_COLUMNS}
+
+
+def participation_rates(df):
+    """Percentage of the given attendance rows with each participation flag set"""
+    return {
+        col: (df[col].sum() / len(df) * 100) if len(df) > 0 else 0
+        for col in PARTICIPATION_COLUMNS
+    }
+
+
+def program_params():
+    """Program dates as parameters for the monthly_child_tallies database function"""
+    return {
+        'p_program_start': PROGRAM_START.strftime('%Y-%m-%d'),
+        'p_window_end': ENROLLMENT_WINDOW_END.strftime('%Y-%m-%d'),
+    }
+
+
+def next_enrollment_start(current, session_date):
+    """Enrollment start after recording attendance on session_date, given the current value
+
+    Attendance inside the enrollment window makes a child existing (counted from
+    the program start); otherwise the earliest attendance date is kept.
+    """
+    session_date = pd.Timestamp(session_date)
+    if PROGRAM_START <= session_date < ENROLLMENT_WINDOW_END:
+        return PROGRAM_START
+    if current is None or pd.isna(current):
+        return session_date
+    current = pd.Timestamp(current)
+    if current != PROGRAM_START and session_date < current:
+        return session_date
+    return current
+
+
+def enrollment_start_from_dates(session_dates):
+    """Enrollment start of one child from all of their attendance dates, or None"""
+    dates = pd.to_datetime(pd.Series(list(session_dates), dtype=object))
+    if dates.empty:
+        return None
+    if ((dates >= PROGRAM_START) & (dates < ENROLLMENT_WINDOW_END)).any():
+        return PROGRAM_START
+    return dates.min()
+
+
+def compute_enrollment_starts(attendance_df):
+    """Enrollment start of every child with attendance, computed from their rows
+
+    For children stored without one; reports read the stored column.
+    """
+    if attendance_df.empty:
+        return pd.Series(dtype='datetime64[ns]')
+    dates = pd.to_datetime(attendance_df['session_date'])
+    first = dates.groupby(attendance_df['child_id']).min()
+    in_window = (dates >= PROGRAM_START) & (dates < ENROLLMENT_WINDOW_END)
+    existing = attendance_df.loc[in_window, 'child_id'].unique()
+    first[first.index.isin(existing)] = PROGRAM_START
+    return first
+
+
+@memoize
+def enrollment_starts(children_df):
+    """Enrollment start per child id, from the stored column; children without one have not attended yet"""
+    if 'enrollment_start' not in children_df.columns:
+        return pd.Series(dtype='datetime64[ns]')
+    return pd.to_datetime(children_df.set_index('id')['enrollment_start']).dropna()
+
+
+def sundays_since(start, end=None):
+    """Sundays from start up to end (now by default), counted without listing them"""
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+    first = start + pd.Timedelta(days=(6 - start.weekday()) % 7)
+    return 0 if first > end else (end - first).days // 7 + 1
+
+
+def is_new_enrollment(enrollment_start):
+    """A child is new when they were first seen outside the enrollment window"""
+    return enrollment_start is not None and not pd.isna(enrollment_start) and \
+        pd.Timestamp(enrollment_start) != PROGRAM_START
+
+
+def _present_class_details(daily_attendance, present_children):
+    """Name and participation flags of the present children in one class"""
+    present_df = daily_attendance[daily_attendance['child_id'].isin(present_children['id'])]
+
+    # Merge the DataFrames
+    present_df = present_df.merge(
+        present_children[['id', 'full_name']],
+        left_on='child_id',
+        right_on='id',
+        suffixes=('_attendance', '_child')
+    )
+
+    # Create display DataFrame with only the columns that exist
+    display_columns = {
+        'full_name_child': 'Name',
+        'early': 'Early',
+        'has_book': 'Book',
+        'has_pen': 'Pen',
+        'has_bible': 'Bible',
+        'gave_offering': 'Offering'
+    }
+    available_columns = [col for col in display_columns.keys() if col in present_df.columns]
+    if not available_columns:
+        return None
+    display_df = present_df[available_columns].copy()
+    display_df.columns = [display_columns[col] for col in available_columns]
+    return display_df
+
+
+def _present_ocm_details(ocm_attendance, present_ocm):
+    """Name, class and participation flags of the present OCM children"""
+    present_ocm_df = ocm_attendance.merge(present_ocm[['id', 'full_name', 'class_group']],
+                                          left_on='child_id', right_on='id',
+                                          suffixes=('_attendance', ''))
+    display_df = present_ocm_df[['full_name', 'class_group', 'early', 'has_book',
+                                 'has_pen', 'has_bible', 'gave_offering']]
+    display_df.columns = ['Name', 'Class', 'Early', 'Book', 'Pen', 'Bible', 'Offering']
+    return display_df
+
+
+@memoize
+def sunday_report(children_df, attendance_df, selected_date):
+    """Compute the Sunday Attendance report for one date"""
+    # Filter attendance for selected date
+    daily_attendance = attendance_df[attendance_df['session_date'] == selected_date.isoformat()]
+
+    # Get all children for the day
+    all_children = children_df.copy()
+
+    # Mark present/absent
+    present_ids = daily_attendance['child_id'].unique()
+    all_children['status'] = all_children['id'].apply(lambda x: 'Present' if x in present_ids else 'Absent')
+
+    report = {
+        'children': children_df,
+        'daily_attendance': daily_attendance,
+        'total_children': len(all_children),
+        'total_present': len(present_ids),
+        'total_absent': len(all_children) - len(present_ids),
+        'participation': participation_counts(daily_attendance) if not daily_attendance.empty else None,
+        'classes': [],
+        'ocm': None,
+    }
+
+    # Class-wise Statistics
+    for class_name in all_children['class_group'].unique():
+        class_children = all_children[all_children['class_group'] == class_name]
+        section = {
+            'name': class_name,
+            'total': len(class_children),
+            'present': len(class_children[class_children['status'] == 'Present']),
+            'absent': len(class_children[class_children['status'] == 'Absent']),
+            'participation': None,
+        }
+
+        if section['present'] > 0:
+            present_children = class_children[class_children['status'] == 'Present']
+            present_df = daily_attendance[daily_attendance['child_id'].isin(present_children['id'])]
+            section['participation'] = participation_counts(present_df)
+
+        report['classes'].append(section)
+
+    # OCM Children Statistics
+    ocm_children = all_children[all_children['sponsored'] == True]
+    if not ocm_children.empty:
+        ocm = {
+            'total': len(ocm_children),
+            'present': len(ocm_children[ocm_children['status'] == 'Present']),
+            'absent': len(ocm_children[ocm_children['status'] == 'Absent']),
+            'participation': None,
+        }
+
+        if ocm['present'] > 0:
+            # Get participation stats for OCM children
+            present_ocm = ocm_children[ocm_children['status'] == 'Present']
+            ocm_attendance = daily_attendance[daily_attendance['child_id'].isin(present_ocm['id'])]
+            ocm['participation'] = participation_counts(ocm_attendance)
+
+        report['ocm'] = ocm
+
+    return report
+
+
+@memoize
+def sunday_report_from_summary(summary, children_df, daily_attendance):
+    """Build the Sunday Attendance report from the sunday_summary database function
+
+    Counts come from the summary; the day's rows are kept for the name lists.
+    """
+    report = {
+        'children': children_df,
+        'daily_attendance': daily_attendance,
+        'total_children': summary['total_children'],
+        'total_present': summary['total_present'],
+        'total_absent': summary['total_children'] - summary['total_present'],
+        'participation': summary['participation'],
+        'classes': [],
+        'ocm': None,
+    }
+
+    for class_summary in summary['classes']:
+        report['classes'].append({
+            'name': class_summary['name'],
+            'total': class_summary['total'],
+            'present': class_summary['present'],
+            'absent': class_summary['total'] - class_summary['present'],
+            'participation': class_summary['participation'],
+        })
+
+    if summary['ocm'] is not None:
+        report['ocm'] = {
+            'total': summary['ocm']['total'],
+            'present': summary['ocm']['present'],
+            'absent': summary['ocm']['total'] - summary['ocm']['present'],
+            'participation': summary['ocm']['participation'],
+        }
+
+    return report
+
+
+def _present_mask(children_df, daily_attendance):
+    """Which children have a mark on the day"""
+    if daily_attendance.empty:
+        return pd.Series(False, index=children_df.index)
+    return children_df['id'].isin(daily_attendance['child_id'])
+
+
+@memoize
+def sunday_class_details(children_df, daily_attendance, class_name):
+    """Present children with their flags, and absent names, of one class in the Sunday report
+
+    Computed only when the class's section is opened, or for the export.
+    Either frame is None when the class has nobody in it.
+    """
+    in_class = children_df['class_group'] == class_name
+    present = _present_mask(children_df, daily_attendance)
+    present_details = _present_class_details(daily_attendance, children_df[in_class & present]) \
+        if (in_class & present).any() else None
+    absent_children = children_df[in_class & ~present][['full_name']] if (in_class & ~present).any() else None
+    return present_details, absent_children
+
+
+@memoize
+def sunday_ocm_details(children_df, daily_attendance):
+    """sunday_class_details for the sponsored (OCM) children, with their class"""
+    sponsored = children_df['sponsored'] == True
+    present = _present_mask(children_df, daily_attendance)
+    present_details = None
+    if (sponsored & present).any():
+        present_ocm = children_df[sponsored & present]
+        ocm_attendance = daily_attendance[daily_attendance['child_id'].isin(present_ocm['id'])]
+        present_details = _present_ocm_details(ocm_attendance, present_ocm)
+    absent_children = children_df[sponsored & ~present][['full_name', 'class_group']] \
+        if (sponsored & ~present).any() else None
+    return present_details, absent_children
+
+
+@memoize
+def monthly_report(children_df, attendance_df, selected_year, selected_month, calendar=None):
+    """Compute the Monthly Summary report, or None when the month has no attendance
+
+    Session counts come from the sessions calendar when given, otherwise
+    from the dates that have attendance.
+    """
+    # Filter attendance for selected month
+    monthly_attendance = attendance_df[
+        (pd.to_datetime(attendance_df['session_date']).dt.month == selected_month) &
+        (pd.to_datetime(attendance_df['session_date']).dt.year == selected_year)
+    ]
+
+    if monthly_attendance.empty:
+        return None
+
+    # Get unique dates in the month
+    session_dates = pd.to_datetime(monthly_attendance['session_date']).unique()
+    total_sessions = _month_sessions(calendar, selected_year, selected_month, len(session_dates))
+
+    # Overall Statistics
+    total_children = len(children_df)
+    avg_attendance = len(monthly_attendance) / total_sessions if total_sessions > 0 else 0
+    attendance_rate = (avg_attendance / total_children * 100) if total_children > 0 else 0
+
+    # Calculate daily stats
+    daily_stats = []
+    for session_date in session_dates:
+        day_attendance = monthly_attendance[
+            pd.to_datetime(monthly_attendance['session_date']) == session_date
+        ]
+        daily_stats.append({
+            'Date': session_date.strftime('%Y-%m-%d'),
+            'Present': len(day_attendance),
+            'Early': day_attendance['early'].sum(),
+            'Books': day_attendance['has_book'].sum(),
+            'Pens': day_attendance['has_pen'].sum(),
+            'Bibles': day_attendance['has_bible'].sum(),
+            'Offering': day_attendance['gave_offering'].sum()
+        })
+
+    report = {
+        'monthly_attendance': monthly_attendance,
+        'total_sessions': total_sessions,
+        'total_children': total_children,
+        'avg_attendance': avg_attendance,
+        'attendance_rate': attendance_rate,
+        'trends_df': pd.DataFrame(daily_stats),
+        'classes': [],
+        'ocm': None,
+    }
+
+    # Class-wise Monthly Statistics
+    for class_name in children_df['class_group'].unique():
+        class_children = children_df[children_df['class_group'] == class_name]
+        class_attendance = monthly_attendance[
+            monthly_attendance['child_id'].isin(class_children['id'])
+        ]
+        section = {
+            'name': class_name,
+            'children': class_children,
+            'attendance': class_attendance,
+            'attended': len(class_attendance),
+        }
+
+        if not class_attendance.empty:
+            total_class_children = len(class_children)
+            class_sessions = _month_sessions(calendar, selected_year, selected_month, total_sessions, class_name)
+            avg_class_attendance = len(class_attendance) / class_sessions if class_sessions > 0 else 0
+            section.update({
+                'total': total_class_children,
+                'avg_attendance': avg_class_attendance,
+                'attendance_rate': (avg_class_attendance / total_class_children * 100) if total_class_children > 0 else 0,
+                'participation': participation_rates(class_attendance),
+            })
+
+        report['classes'].append(section)
+
+    # OCM Children Monthly Statistics
+    ocm_children = children_df[children_df['sponsored'] == True]
+    if not ocm_children.empty:
+        ocm_attendance = monthly_attendance[
+            monthly_attendance['child_id'].isin(ocm_children['id'])
+        ]
+        ocm = {'children': ocm_children, 'attendance': ocm_attendance, 'attended': len(ocm_attendance)}
+
+        if not ocm_attendance.empty:
+            total_ocm = len(ocm_children)
+            avg_ocm_attendance = len(ocm_attendance) / total_sessions if total_sessions > 0 else 0
+            ocm.update({
+                'total': total_ocm,
+                'avg_attendance': avg_ocm_attendance,
+                'attendance_rate': (avg_ocm_attendance / total_ocm * 100) if total_ocm > 0 else 0,
+                'participation': participation_rates(ocm_attendance),
+            })
+
+        report['ocm'] = ocm
+
+    return report
+
+
+def _month_sessions(calendar, year, month, default, class_group=None):
+    """Held sessions in a month from the calendar, or default without one"""
+    if calendar is None:
+        return default
+    month_start, month_end = month_bounds(year, month)
+    return calendar.count(month_start, month_end, class_group)
+
+
+def _available_sessions(calendar, month_start, since, class_group):
+    """Held sessions for a class from since to the end of month_start's month"""
+    month_start, month_end = month_bounds(month_start.year, month_start.month)
+    return calendar.count(max(since, month_start), month_end, class_group)
+
+
+def _attendance_section(total, attended, participation_sums, total_sessions):
+    """Averages and rates for a class or the OCM group from summed counts"""
+    avg_attendance = attended / total_sessions if total_sessions > 0 else 0
+    return {
+        'total': total,
+        'avg_attendance': avg_attendance,
+        'attendance_rate': (avg_attendance / total * 100) if total > 0 else 0,
+        'participation': {
+            col: (participation_sums[col] / attended * 100) if attended > 0 else 0
+            for col in PARTICIPATION_COLUMNS
+        },
+    }
+
+
+@memoize
+def monthly_report_from_summary(summary, selected_year=None, selected_month=None, calendar=None):
+    """Build the Monthly Summary report from the monthly_summary database function"""
+    if summary['total_sessions'] == 0:
+        return None
+    total_sessions = _month_sessions(calendar, selected_year, selected_month, summary['total_sessions'])
+    if total_sessions == 0:
+        return None
+
+    total_children = summary['total_children']
+    avg_attendance = summary['attended'] / total_sessions
+    trends_df = pd.DataFrame([
+        {
+            'Date': day['date'],
+            'Present': day['present'],
+            'Early': day['early'],
+            'Books': day['has_book'],
+            'Pens': day['has_pen'],
+            'Bibles': day['has_bible'],
+            'Offering': day['gave_offering']
+        }
+        for day in summary['trends']
+    ])
+
+    report = {
+        'total_sessions': total_sessions,
+        'total_children': total_children,
+        'avg_attendance': avg_attendance,
+        'attendance_rate': (avg_attendance / total_children * 100) if total_children > 0 else 0,
+        'trends_df': trends_df,
+        'classes': [],
+        'ocm': None,
+    }
+
+    for class_summary in summary['classes']:
+        section = {'name': class_summary['name'], 'attended': class_summary['attended']}
+        if section['attended'] > 0:
+            class_sessions = _month_sessions(
+                calendar, selected_year, selected_month, total_sessions, class_summary['name']
+            )
+            section.update(_attendance_section(
+                class_summary['total'], class_summary['attended'], class_summary['participation'], class_sessions
+            ))
+        report['classes'].append(section)
+
+    if summary['ocm'] is not None:
+        ocm = {'attended': summary['ocm']['attended']}
+        if ocm['attended'] > 0:
+            ocm.update(_attendance_section(
+                summary['ocm']['total'], ocm['attended'], summary['ocm']['participation'], total_sessions
+            ))
+        report['ocm'] = ocm
+
+    return report
+
+
+@memoize
+def monthly_class_details(attendance_df, class_children, class_attendance, total_sessions, calendar=None):
+    """Per-child attendance counts and rates for one class in the Monthly Summary
+
+    With a sessions calendar, available sessions are the class's held
+    sessions in the month, from a new child's first attendance on.
+    """
+    # Merge attendance with children data
+    detailed_attendance = class_attendance.merge(
+        class_children[['id', 'full_name']],
+        left_on='child_id',
+        right_on='id',
+        suffixes=('_attendance', '')
+    )
+
+    starts = enrollment_starts(class_children)
+    if calendar is not None and not class_attendance.empty:
+        month_start = pd.to_datetime(class_attendance['session_date']).min()
+
+    # Calculate attendance count and rate per child
+    attendance_stats = []
+    for _, child in class_children.iterrows():
+        child_id = child['id']
+        child_name = child['full_name']
+
+        # Check if child is new (first seen after the enrollment window)
+        new_child = is_new_enrollment(starts.get(child_id))
+
+        # Get child's attendance records
+        child_attendance = detailed_attendance[detailed_attendance['child_id'] == child_id]
+
+        if not child_attendance.empty:
+            if new_child:
+                # For new children, use their first attendance date
+                first_attendance = pd.to_datetime(child_attendance['session_date']).min()
+                available_sessions = sundays_since(first_attendance)
+            else:
+                # For existing children, count from the program start
+                first_attendance = PROGRAM_START
+                available_sessions = total_sessions
+            if calendar is not None:
+                available_sessions = _available_sessions(calendar, month_start, first_attendance, child['class_group'])
+
+            sessions_attended = len(child_attendance[
+                pd.to_datetime(child_attendance['session_date']) >= first_attendance
+            ])
+
+            attendance_rate = (sessions_attended / available_sessions * 100) if available_sessions > 0 else 0
+
+            attendance_stats.append({
+                'Name': child_name,
+                'First Attendance': first_attendance.strftime('%Y-%m-%d'),
+                'Available Sessions': available_sessions,
+                'Sessions Attended': sessions_attended,
+                'Attendance Rate': round(attendance_rate, 1)
+            })
+
+    return pd.DataFrame(attendance_stats) if attendance_stats else None
+
+
+@memoize
+def monthly_ocm_details(ocm_children, ocm_attendance, total_sessions):
+    """Per-child session counts for sponsored children in the Monthly Summary"""
+    # Merge attendance with children data
+    detailed_ocm = ocm_attendance.merge(
+        ocm_children[['id', 'full_name', 'class_group']],
+        left_on='child_id',
+        right_on='id',
+        suffixes=('_attendance', '')
+    )
+
+    # Calculate attendance count per child
+    ocm_counts = detailed_ocm.groupby(['full_name', 'class_group']).size().reset_index()
+    ocm_counts.columns = ['Name', 'Class', 'Sessions Attended']
+    ocm_counts['Attendance Rate'] = (ocm_counts['Sessions Attended'] / total_sessions * 100).round(1)
+    return ocm_counts
+
+
+@memoize
+def monthly_child_tallies(children_df, attendance_df, selected_year, selected_month):
+    """Per-child session tallies for one month, matching the monthly_child_tallies database function"""
+    columns = ['child_id', 'full_name', 'class_group', 'sponsored', 'first_attendance',
+               'sessions_attended', 'sessions_since_tracking', 'is_new']
+    if attendance_df.empty or children_df.empty:
+        return []
+    dates = pd.to_datetime(attendance_df['session_date'])
+    month_rows = attendance_df[(dates.dt.year == selected_year) & (dates.dt.month == selected_month)]
+    if month_rows.empty:
+        return []
+
+    starts = enrollment_starts(children_df)
+
+    month_dates = pd.to_datetime(month_rows['session_date'])
+    tallies = month_rows.groupby('child_id').agg(
+        first_attendance=('session_date', 'min'),
+        sessions_attended=('session_date', 'size')
+    )
+    tallies['sessions_since_tracking'] = (
+        month_rows[month_dates >= PROGRAM_START].groupby('child_id').size()
+        .reindex(tallies.index, fill_value=0)
+    )
+    tallies = children_df[['id', 'full_name', 'class_group', 'sponsored']].merge(
+        tallies, left_on='id', right_index=True
+    ).rename(columns={'id': 'child_id'}).sort_values('child_id')
+    tallies['is_new'] = tallies['child_id'].map(starts).map(is_new_enrollment)
+    tallies['sponsored'] = tallies['sponsored'] == True
+    return tallies[columns].to_dict('records')
+
+
+@memoize
+def monthly_class_details_from_tallies(tallies, total_sessions, calendar=None):
+    """monthly_class_details computed from the monthly_child_tallies database function"""
+    attendance_stats = []
+    for tally in tallies:
+        if tally['is_new']:
+            # For new children, use their first attendance date
+            first_attendance = pd.Timestamp(tally['first_attendance'])
+            available_sessions = sundays_since(first_attendance)
+            sessions_attended = tally['sessions_attended']
+        else:
+            # For existing children, count from the program start
+            first_attendance = PROGRAM_START
+            available_sessions = total_sessions
+            sessions_attended = tally['sessions_since_tracking']
+        if calendar is not None:
+            available_sessions = _available_sessions(
+                calendar, pd.Timestamp(tally['first_attendance']), first_attendance, tally['class_group']
+            )
+
+        attendance_rate = (sessions_attended / available_sessions * 100) if available_sessions > 0 else 0
+
+        attendance_stats.append({
+            'Name': tally['full_name'],
+            'First Attendance': first_attendance.strftime('%Y-%m-%d'),
+            'Available Sessions': available_sessions,
+            'Sessions Attended': sessions_attended,
+            'Attendance Rate': round(attendance_rate, 1)
+        })
+
+    return pd.DataFrame(attendance_stats) if attendance_stats else None
+
+
+@memoize
+def monthly_ocm_details_from_tallies(tallies, total_sessions):
+    """monthly_ocm_details computed from the monthly_child_tallies database function"""
+    tallies_df = pd.DataFrame(tallies, columns=['full_name', 'class_group', 'sessions_attended'])
+    ocm_counts = tallies_df.groupby(['full_name', 'class_group'])['sessions_attended'].sum().reset_index()
+    ocm_counts.columns = ['Name', 'Class', 'Sessions Attended']
+    ocm_counts['Attendance Rate'] = (ocm_counts['Sessions Attended'] / total_sessions * 100).round(1)
+    return ocm_counts
+
+
+@memoize
+def child_profile(children_df, attendance_df, child_info, calendar=None):
+    """Compute a child's attendance summary, history, trends and class comparison
+
+    With a sessions calendar, the sessions the child could attend are the
+    class's held sessions rather than every date with attendance.
+    """
+    # Get all attendance records for this child
+    child_attendance = attendance_df[attendance_df['child_id'] == child_info['id']]
+    if child_attendance.empty:
+        return None
+
+    # Get the child's class group
+    class_group = child_info['class_group']
+
+    enrollment_start = enrollment_starts(children_df).get(child_info['id'])
+    new_child = is_new_enrollment(enrollment_start)
+    if new_child:
+        # For new children, use their first attendance date
+        first_attendance_date = pd.Timestamp(enrollment_start)
+    else:
+        # For existing children, use the program start
+        first_attendance_date = PROGRAM_START
+
+    # Get all class sessions since the tracking start date
+    if calendar is not None:
+        class_sessions = [d.strftime('%Y-%m-%d') for d in calendar.dates(first_attendance_date, None, class_group)]
+    else:
+        class_sessions = attendance_df[
+            pd.to_datetime(attendance_df['session_date']) >= first_attendance_date
+        ]['session_date'].unique()
+    total_available_sessions = len(class_sessions)
+
+    # Get child's attendance records since tracking start date
+    tracked_attendance = child_attendance[
+        pd.to_datetime(child_attendance['session_date']) >= first_attendance_date
+    ]
+
+    # Calculate attendance statistics
+    present_count = len(tracked_attendance)
+    absent_count = total_available_sessions - present_count
+    attendance_rate = (present_count / total_available_sessions * 100) if total_available_sessions > 0 else 0
+
+    # Calculate participation rates based on attended sessions
+    rates = participation_rates(tracked_attendance)
+
+    # Create a DataFrame with all sessions since tracking start
+    all_sessions_df = pd.DataFrame({
+        'session_date': class_sessions
+    })
+
+    # Merge with actual attendance to get present/absent status
+    detailed_attendance = all_sessions_df.merge(
+        tracked_attendance[['session_date', 'early', 'has_book', 'has_pen', 'has_bible', 'gave_offering']],
+        on='session_date',
+        how='left'
+    )
+
+    # Fill NaN values (absent days)
+    detailed_attendance = detailed_attendance.fillna(False)
+
+    # Add status column
+    detailed_attendance['Status'] = np.where(
+        pd.isna(detailed_attendance['early']),
+        'Absent',
+        'Present'
+    )
+
+    # Format for display
+    display_df = detailed_attendance.copy()
+    display_df['Date'] = pd.to_datetime(display_df['session_date']).dt.strftime('%Y-%m-%d')
+    display_df['Early'] = display_df['early'].map({True: '✅', False: '❌'})
+    display_df['Book'] = display_df['has_book'].map({True: '✅', False: '❌'})
+    display_df['Pen'] = display_df['has_pen'].map({True: '✅', False: '❌'})
+    display_df['Bible'] = display_df['has_bible'].map({True: '✅', False: '❌'})
+    display_df['Offering'] = display_df['gave_offering'].map({True: '✅', False: '❌'})
+
+    # Sort by date in descending order
+    display_df = display_df.sort_values('session_date', ascending=False)
+
+    # Calculate monthly attendance rates
+    monthly_stats = detailed_attendance.copy()
+    monthly_stats['month'] = pd.to_datetime(monthly_stats['session_date']).dt.strftime('%Y-%m')
+    monthly_attendance = monthly_stats.groupby('month').agg({
+        'Status': lambda x: (x == 'Present').mean() * 100,
+        'early': 'mean',
+        'has_book': 'mean',
+        'has_pen': 'mean',
+        'has_bible': 'mean',
+        'gave_offering': 'mean'
+    }).reset_index()
+
+    # Multiply by 100 to get percentages
+    for col in PARTICIPATION_COLUMNS:
+        monthly_attendance[col] = monthly_attendance[col] * 100
+
+    # Rename columns for display
+    monthly_attendance.columns = ['Month', 'Attendance', 'Early', 'Book', 'Pen', 'Bible', 'Offering']
+
+    profile = {
+        'is_new_child': new_child,
+        'first_attendance_date': first_attendance_date,
+        'total_available_sessions': total_available_sessions,
+        'present_count': present_count,
+        'absent_count': absent_count,
+        'attendance_rate': attendance_rate,
+        'rates': rates,
+        'display_df': display_df[['Date', 'Status', 'Early', 'Book', 'Pen', 'Bible', 'Offering']],
+        'monthly_attendance': monthly_attendance,
+        'class_comparison': None,
+    }
+
+    # Get class attendance data since tracking start date
+    class_attendance = attendance_df[
+        (attendance_df['child_id'].isin(
+            children_df[children_df['class_group'] == class_group]['id']
+        )) &
+        (pd.to_datetime(attendance_df['session_date']) >= first_attendance_date)
+    ]
+
+    if not class_attendance.empty:
+        # Calculate class averages
+        total_class_children = len(children_df[children_df['class_group'] == class_group])
+        class_rates = participation_rates(class_attendance)
+        class_rates['present'] = (len(class_attendance) / (total_class_children * total_available_sessions) * 100)
+        profile['class_comparison'] = class_rates
+
+    return profile
@@ -0,0 +1,195 @@
+import random
+import sqlite3
+import threading
+import time
+
+import httpx
+
+# Query builder methods that start a request; everything else is a filter or modifier
+ACTIONS = ("select", "insert", "upsert", "update", "delete")
+
+# Inserts may be applied twice if a response is lost, so they are never retried
+IDEMPOTENT_ACTIONS = ("select", "upsert", "update", "delete", "rpc")
+
+# HTTP statuses and Postgres error classes worth retrying
+TRANSIENT_STATUS = ("500", "502", "503", "504")
+TRANSIENT_SQLSTATE = ("08", "40001", "40P01", "53", "57P")
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling the database while the circuit breaker is open"""
+
+
+def is_transient(error):
+    """Whether a failed call is worth retrying: dropped connections, timeouts, 5xx, lock waits"""
+    if isinstance(error, (httpx.TransportError, ConnectionResetError, TimeoutError)):
+        return True
+    if isinstance(error, sqlite3.OperationalError):
+        return "locked" in str(error) or "busy" in str(error)
+    code = str(getattr(error, "code", "") or "")
+    return code in TRANSIENT_STATUS or code.startswith(TRANSIENT_SQLSTATE)
+
+
+class CircuitBreaker:
+    """Stop calling a failing backend for a while, then let a single probe through"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def retry_in(self):
+        """Seconds until the next probe is allowed, or 0 when the circuit is closed"""
+        if self.state != "open":
+            return 0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class ResilientClient:
+    """Wrap a Supabase (or local) client with retries, a circuit breaker and call statistics
+
+    Every other attribute is passed through, so it can replace the bare client anywhere.
+    """
+
+    def __init__(self, client, http_client=None, retries=3, base_delay=0.2, max_delay=3.0, breaker=None):
+        self.client = client
+        self.http_client = http_client
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def table(self, name):
+        return ResilientQuery(self, self.client.table(name))
+
+    def rpc(self, name, params=None):
+        return ResilientQuery(self, self.client.rpc(name, params or {}), action="rpc")
+
+    def _count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay for the given retry attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, action, execute):
+        """Run one request through the circuit breaker, retrying idempotent calls on transient errors"""
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(
+                f"Database temporarily unavailable, retrying in {self.breaker.retry_in():.0f}s"
+            )
+        attempts = 1 + (self.retries if action in IDEMPOTENT_ACTIONS else 0)
+        for attempt in range(attempts):
+            self._count("calls")
+            try:
+                result = execute()
+            except Exception as e:
+                if not is_transient(e):
+                    # The backend answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                if attempt + 1 >= attempts:
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    raise
+                self._count("retries")
+                time.sleep(self.backoff(attempt))
+            else:
+                self.breaker.record_success()
+                return result
+
+    def stats(self):
+        """Retry, breaker and connection pool statistics for the admin panel"""
+        with self._lock:
+            stats = dict(self.counters)
+        stats["circuit"] = self.breaker.state
+        stats["circuit_opened"] = self.breaker.times_opened
+        stats.update(pool_stats(self.http_client))
+        return stats
+
+
+class ResilientQuery:
+    """Proxy for a query builder that routes execute() through the owning ResilientClient"""
+
+    def __init__(self, owner, builder, action=None):
+        self._owner = owner
+        self._builder = builder
+        self._action = action
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def method(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            action = self._action or (name if name in ACTIONS else None)
+            return ResilientQuery(self._owner, result, action)
+        return method
+
+    def execute(self):
+        return self._owner.call(self._action or "select", self._builder.execute)
+
+
+def make_http_client(timeout=10, connect_timeout=5, pool_size=10, keepalive_expiry=60):
+    """httpx client with a bounded keep-alive pool and per-request timeouts"""
+    return httpx.Client(
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=False,
+    )
+
+
+def pool_stats(http_client):
+    """Best-effort view of the httpx connection pool (open and idle connections)"""
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return {}
+    return {
+        "pool_connections": len(connections),
+        "pool_idle": sum(1 for c in connections if c.is_idle()),
+    }
@@ -0,0 +1,179 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from flag_bits import FLAG_BITS, flag_matrix
+
+# Dimensions of the cube, from the attendance date and the child's registration
+DIMENSIONS = ["month", "class_group", "sponsored", "gender", "grade"]
+
+# Additive counts kept per cell: attended rows, then each participation flag
+MEASURES = ["attended", "early", "has_book", "has_pen", "has_bible", "gave_offering"]
+
+# Children columns that place their attendance in a cell
+CHILD_DIMENSIONS = ["class_group", "sponsored", "gender", "grade"]
+
+
+def _label(value):
+    """Dimension value as stored in the cube; missing values become None"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value
+
+
+class RollupCube:
+    """Attendance counts rolled up over month, class, sponsorship, gender and grade
+
+    Each distinct combination of dimension values is one cell. Dimension
+    values are dictionary-encoded into integer code columns and the
+    measures into one count matrix, so a slice is a mask and a group-by
+    over a few thousand cells rather than a pass over every attendance row.
+    Attendance changes move counts between cells as they happen; a change
+    to a child's class, sponsorship, gender or grade marks the cube stale
+    and it is rebuilt on next use.
+    """
+
+    def __init__(self, capacity=1024):
+        self._lock = threading.Lock()
+        self._reset(capacity)
+
+    def _reset(self, capacity=1024):
+        self._values = {dim: [] for dim in DIMENSIONS}
+        self._codes_of = {dim: {} for dim in DIMENSIONS}
+        self._codes = np.zeros((capacity, len(DIMENSIONS)), dtype=np.int32)
+        self._counts = np.zeros((capacity, len(MEASURES)), dtype=np.int64)
+        self._cells = {}
+        self._row_cell = {}
+        self.stale = True
+
+    def __len__(self):
+        return len(self._cells)
+
+    def _code(self, dim, value):
+        codes = self._codes_of[dim]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._values[dim])
+            self._values[dim].append(value)
+        return code
+
+    def _cell(self, key):
+        """Index of the cell for a tuple of dimension values, adding it if new"""
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = len(self._cells)
+            if cell == len(self._codes):
+                self._codes = np.concatenate([self._codes, np.zeros_like(self._codes)])
+                self._counts = np.concatenate([self._counts, np.zeros_like(self._counts)])
+            self._codes[cell] = [self._code(dim, value) for dim, value in zip(DIMENSIONS, key)]
+        return cell
+
+    @staticmethod
+    def _key(record, child):
+        child = child or {}
+        return (str(record.get("session_date"))[:7],) + tuple(_label(child.get(dim)) for dim in CHILD_DIMENSIONS)
+
+    @staticmethod
+    def _measures(record):
+        flags = record.get("flags") or 0
+        return [1] + [int(bool(flags & FLAG_BITS[flag])) for flag in MEASURES[1:]]
+
+    def rebuild(self, children_rows, attendance_rows):
+        """Recompute every cell from the full children and attendance rows"""
+        with self._lock:
+            self._reset()
+            if not attendance_rows:
+                self.stale = False
+                return
+            children = {row["id"]: row for row in children_rows}
+            keys = [self._key(row, children.get(row.get("child_id"))) for row in attendance_rows]
+            cells = np.array([self._cell(key) for key in keys], dtype=np.int64)
+            flags = np.array([row.get("flags") or 0 for row in attendance_rows])
+            measures = np.column_stack(
+                [np.ones(len(attendance_rows), dtype=np.int64), flag_matrix(flags, MEASURES[1:]).astype(np.int64)]
+            )
+            np.add.at(self._counts, cells, measures)
+            self._row_cell = dict(zip([row["id"] for row in attendance_rows], cells.tolist()))
+            self.stale = False
+
+    def apply(self, table, old, new, child_of):
+        """Update counts for one changed row; child_of(child_id) returns the child's cached row
+
+        old is None for an insert and new is None for a delete. Both None
+        means the whole table was refetched.
+        """
+        with self._lock:
+            if self.stale:
+                return
+            if table == "children":
+                if old is None and new is None:
+                    self.stale = True
+                elif old is not None and new is not None and any(
+                    _label(old.get(dim)) != _label(new.get(dim)) for dim in CHILD_DIMENSIONS
+                ):
+                    self.stale = True
+                return
+            if table != "attendance":
+                return
+            if old is None and new is None:
+                self.stale = True
+                return
+            if old is not None:
+                cell = self._row_cell.pop(old.get("id"), None)
+                if cell is not None:
+                    self._counts[cell] -= self._measures(old)
+            if new is not None:
+                cell = self._cell(self._key(new, child_of(new.get("child_id"))))
+                self._counts[cell] += self._measures(new)
+                self._row_cell[new.get("id")] = cell
+
+    def dimension_values(self, dim):
+        """Values of a dimension seen in the cube"""
+        with self._lock:
+            return list(self._values[dim])
+
+    def slice(self, group_by=(), filters=None, measures=MEASURES, extra=None):
+        """Summed measures grouped by the given dimensions, over cells matching filters
+
+        filters maps a dimension to one value or a list of allowed values.
+        extra is a frame of further cells (dimension and measure columns),
+        such as the archived years' summaries, counted as if in the cube.
+        """
+        with self._lock:
+            size = len(self._cells)
+            codes = self._codes[:size]
+            counts = self._counts[:size]
+            mask = np.ones(size, dtype=bool)
+            for dim, allowed in (filters or {}).items():
+                if not isinstance(allowed, (list, tuple, set)):
+                    allowed = [allowed]
+                wanted = [self._codes_of[dim][v] for v in allowed if v in self._codes_of[dim]]
+                mask &= np.isin(codes[:, DIMENSIONS.index(dim)], wanted)
+            frame = pd.DataFrame(counts[mask][:, [MEASURES.index(m) for m in measures]], columns=list(measures))
+            for dim in group_by:
+                values = np.array(self._values[dim], dtype=object)
+                frame[dim] = values[codes[mask][:, DIMENSIONS.index(dim)]]
+        if extra is not None and len(extra):
+            keep = np.ones(len(extra), dtype=bool)
+            for dim, allowed in (filters or {}).items():
+                if not isinstance(allowed, (list, tuple, set)):
+                    allowed = [allowed]
+                keep &= extra[dim].isin(list(allowed)).to_numpy()
+            frame = pd.concat([frame, extra.loc[keep, list(measures) + list(group_by)]], ignore_index=True)
+        if not group_by:
+            return frame.sum().to_frame().T
+        result = frame.groupby(list(group_by), dropna=False, sort=False)[list(measures)].sum().reset_index()
+        if "attended" in measures:
+            result = result[result["attended"] > 0]
+        # Values of one dimension can mix types (e.g. numeric and text grades), so sort by their text
+        return result.sort_values(list(group_by), key=lambda col: col.astype(str), ignore_index=True)
+
+    def pivot(self, rows, columns=None, measure="attended", filters=None, extra=None):
+        """Cross-tab of one measure with rows and optional columns dimensions"""
+        group_by = [rows] + ([columns] if columns else [])
+        frame = self.slice(group_by, filters, measures=list(dict.fromkeys(["attended", measure])), extra=extra)
+        frame[group_by] = frame[group_by].fillna("(none)")
+        if not columns:
+            return frame.set_index(rows)[[measure]]
+        return frame.pivot_table(index=rows, columns=columns, values=measure, aggfunc="sum", fill_value=0)
@@ -0,0 +1,28 @@
+"""Start the app with its caches warming from the moment the server starts
+
+    python serve.py [streamlit run options, e.g. --server.port 8501]
+
+Same as `streamlit run app.py`, except the warm-up (warmup.py) begins
+before any browser connects instead of on the first visit. Streamlit runs
+app.py in this process, so sessions share the caches warmed here.
+"""
+import os
+import sys
+
+import datastore
+import warmup
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def main(argv=None):
+    from streamlit.web import cli
+
+    datastore.apply_settings()
+    warmup.start()
+    sys.argv = ["streamlit", "run", APP_PATH] + list(sys.argv[1:] if argv is None else argv)
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# Session statuses; only held sessions count as available to children
+STATUSES = ["held", "cancelled", "holiday"]
+
+
+class SessionCalendar:
+    """The Sundays that actually ran, with constant-time session counts
+
+    Built from rows of the sessions table: a row without a class_group
+    applies to every class, and a row for one class overrides it for that
+    class (e.g. a class-only session, or a class cancelled on a normal
+    Sunday). Prefix counts per class make "held sessions between two dates"
+    two array lookups.
+    """
+
+    def __init__(self, rows):
+        self._status = {}
+        for row in rows:
+            date = pd.Timestamp(row["session_date"]).normalize()
+            class_group = row.get("class_group")
+            status = row.get("status")
+            self._status[(None if pd.isna(class_group) else class_group, date)] = \
+                "held" if pd.isna(status) else status
+
+        self._all_dates = {date for _, date in self._status}
+        dates = sorted(self._all_dates)
+        self.origin = dates[0] if dates else None
+        days = (dates[-1] - self.origin).days + 1 if dates else 0
+
+        # Held sessions for all classes, then per class with its own overrides applied
+        base = np.zeros(days, dtype=np.int32)
+        for (class_group, date), status in self._status.items():
+            if class_group is None and status == "held":
+                base[(date - self.origin).days] = 1
+        self._prefix = {None: np.concatenate([[0], np.cumsum(base)])}
+        self._dates = {None: [d for d in dates if self._status.get((None, d)) == "held"]}
+        for class_group in {c for c, _ in self._status if c is not None}:
+            held = base.copy()
+            for (row_class, date), status in self._status.items():
+                if row_class == class_group:
+                    held[(date - self.origin).days] = int(status == "held")
+            self._prefix[class_group] = np.concatenate([[0], np.cumsum(held)])
+            self._dates[class_group] = [self.origin + pd.Timedelta(days=int(i)) for i in np.flatnonzero(held)]
+
+    @classmethod
+    def from_dates(cls, session_dates):
+        """Calendar of held sessions for every class on the given dates"""
+        return cls([{"session_date": date} for date in pd.unique(pd.Series(list(session_dates), dtype=object))])
+
+    def __len__(self):
+        return len(self._dates[None])
+
+    def _index(self, date, default):
+        if date is None:
+            return default
+        return (pd.Timestamp(date).normalize() - self.origin).days
+
+    def count(self, start=None, end=None, class_group=None):
+        """Held sessions from start to end inclusive (open-ended when None) for a class, or all classes"""
+        if self.origin is None:
+            return 0
+        prefix = self._prefix.get(class_group, self._prefix[None])
+        days = len(prefix) - 1
+        first = min(max(self._index(start, 0), 0), days)
+        last = min(max(self._index(end, days - 1) + 1, 0), days)
+        return int(prefix[last] - prefix[first]) if last > first else 0
+
+    def count_after(self, dates, end=None, class_group=None):
+        """Held sessions after each of the given dates up to end (or the last session), for one class
+
+        Vectorized form of count() for a whole roster; dates must not be missing.
+        """
+        dates = pd.to_datetime(pd.Series(list(dates), dtype=object))
+        if self.origin is None or dates.empty:
+            return np.zeros(len(dates), dtype=np.int64)
+        prefix = self._prefix.get(class_group, self._prefix[None])
+        days = len(prefix) - 1
+        first = np.clip((dates.dt.normalize() - self.origin).dt.days.to_numpy() + 1, 0, days)
+        last = min(max(self._index(end, days - 1) + 1, 0), days)
+        return np.maximum(prefix[last] - prefix[first], 0)
+
+    def dates(self, start=None, end=None, class_group=None):
+        """Held session dates from start to end inclusive for a class, or all classes"""
+        dates = self._dates.get(class_group, self._dates[None])
+        start = pd.Timestamp(start) if start is not None else None
+        end = pd.Timestamp(end) if end is not None else None
+        return [d for d in dates if (start is None or d >= start) and (end is None or d <= end)]
+
+    def has_session(self, date):
+        """Whether the date is already on the calendar, with any status"""
+        return pd.Timestamp(date).normalize() in self._all_dates
+
+    def status(self, date, class_group=None):
+        """Status of the session on a date for a class, or None when there is none"""
+        date = pd.Timestamp(date).normalize()
+        return self._status.get((class_group, date)) or self._status.get((None, date))
+
+
+def month_bounds(year, month):
+    """First and last day of a month as Timestamps"""
+    start = pd.Timestamp(year=int(year), month=int(month), day=1)
+    return start, start + pd.offsets.MonthEnd(0)
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import datastore
+import memo
+import warmup
+from benchmarks.synthetic import generate_attendance, generate_children, load_into
+from followups import AbsenceTracker
+from local_backend import LocalClient
+from rollups import RollupCube
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """An empty local database behind datastore, with fresh shared caches; yields a client on it
+
+    The client is a second connection to the same file, e.g. another teacher's app.
+    """
+    path = str(tmp_path / "sunday_school.db")
+    monkeypatch.setenv("SUNDAY_SCHOOL_SQLITE", path)
+    config.set_source(lambda: {"archive": {"dir": str(tmp_path / "archive")}, "http": {"retries": 0}})
+    datastore.reset_client()
+    monkeypatch.setattr(datastore, "_table_cache", None)
+    monkeypatch.setattr(datastore, "_replica", None)
+    monkeypatch.setattr(datastore, "_archive", None)
+    monkeypatch.setattr(datastore, "_merge_function_missing", False)
+    monkeypatch.setattr(datastore, "_enrollment_backfilled", False)
+    monkeypatch.setattr(datastore, "rollup_cube", RollupCube())
+    monkeypatch.setattr(datastore, "absence_tracker", AbsenceTracker())
+    # The app starts the process's warm-up; a test's own one is stopped with it
+    warmer = warmup.Warmup()
+    monkeypatch.setattr(warmup, "warmer", warmer)
+    memo.cache.clear()
+    yield LocalClient(path)
+    warmer.stop()
+    if warmer._thread is not None:
+        warmer._thread.join(30)
+    datastore.reset_client()
+    config.set_source(None)
+    memo.cache.clear()
+
+
+@pytest.fixture
+def congregation(backend):
+    """A small synthetic congregation with two years of attendance up to the end of 2025"""
+    children = generate_children(30, seed=1)
+    attendance = generate_attendance(children, years=2, end="2025-12-31", seed=1)
+    load_into(backend, children, attendance)
+    return children, attendance
@@ -0,0 +1,114 @@
+import functools
+from datetime import date
+
+import pytest
+
+import cli
+import datastore
+import reports
+from errors import DataError
+
+
+def count(client, year):
+    return client.table("attendance").select("id", count="exact").gte(
+        "session_date", f"{year}-01-01"
+    ).lt("session_date", f"{year + 1}-01-01").execute().count
+
+
+def test_archive_round_trip_can_keep_the_rows(backend, congregation):
+    before = datastore.load_attendance_between("2024-01-01", "2025-01-01")
+    rows_2024 = count(backend, 2024)
+
+    meta = datastore.archive_year(2024, delete=False)
+
+    assert meta["rows"] == rows_2024
+    assert count(backend, 2024) == rows_2024
+    assert datastore.archived_years() == [2024]
+    stored = datastore.get_archive().read("2024-01-01", "2025-01-01")
+    assert sorted(stored["id"]) == sorted(before["id"])
+
+
+def test_archive_deletes_the_rows_by_default_and_serves_the_year_from_it(backend, congregation):
+    before = datastore.load_attendance_between("2024-06-01", "2024-07-01")
+    day = before["session_date"].iloc[0]
+    before_day = datastore.load_attendance_on(day)
+
+    datastore.archive_year(2024)
+
+    assert count(backend, 2024) == 0
+    assert count(backend, 2025) > 0
+    after = datastore.load_attendance_between("2024-06-01", "2024-07-01")
+    columns = ["id", "child_id", "session_date", "present", "early", "has_book", "has_pen", "has_bible"]
+    assert after.sort_values("id")[columns].values.tolist() == before.sort_values("id")[columns].values.tolist()
+    assert sorted(datastore.load_attendance_on(day)["id"]) == sorted(before_day["id"])
+
+
+def counts(tmp_path, name):
+    """The pivot, CLI rollup and a profile's totals, as the app shows them"""
+    cube, archived = datastore.load_rollup(), datastore.load_archive_summary()
+    pivot = cube.pivot("month", "class_group", "attended", extra=archived)
+    output = tmp_path / f"{name}.csv"
+    cli.main(["rollup", "--group-by", "month", "--output", str(output)])
+    children_df, attendance_df = datastore.load_children(), datastore.load_attendance()
+    child = children_df.iloc[0].to_dict()
+    classmates = children_df.loc[children_df["class_group"] == child["class_group"], "id"]
+    history_df = datastore.with_archived_history(attendance_df, tuple(sorted({child["id"], *classmates})))
+    profile = reports.child_profile(children_df, history_df, child, datastore.load_calendar())
+    return (pivot.values.sum(), output.read_text(), history_df["child_id"].isin(classmates).sum(),
+            profile["present_count"], profile["total_available_sessions"])
+
+
+@pytest.mark.parametrize("delete", [False, True])
+def test_archived_years_are_counted_once(backend, congregation, tmp_path, delete):
+    before = counts(tmp_path, "before")
+
+    datastore.archive_year(2024, delete=delete)
+
+    assert counts(tmp_path, "after") == before
+
+
+def test_partly_deleted_year_counts_the_rest_from_the_archive(backend, congregation, tmp_path):
+    before = counts(tmp_path, "before")
+    datastore.archive_year(2024, delete=False)
+    ids = datastore.load_attendance_between("2024-03-01", "2024-04-01")["id"].tolist()
+    response = backend.table("attendance").delete().in_("id", ids).execute()
+    datastore._publish_write("attendance", "DELETE", response.data)
+
+    assert counts(tmp_path, "after") == before
+
+
+def test_archive_reads_every_page(backend, congregation, monkeypatch):
+    monkeypatch.setattr(
+        datastore, "_select_attendance_paged", functools.partial(datastore._select_attendance_paged, page_size=7)
+    )
+
+    meta = datastore.archive_year(2024, delete=False)
+
+    assert meta["rows"] == count(backend, 2024)
+
+
+def test_archive_is_not_written_when_the_count_differs(backend, congregation, monkeypatch):
+    monkeypatch.setattr(datastore, "_count_attendance", lambda supabase, between: 1)
+
+    with pytest.raises(DataError, match="database counts 1"):
+        datastore.archive_year(2024, delete=True)
+
+    assert datastore.archived_years() == []
+    assert count(backend, 2024) > 0
+
+
+def test_archive_is_discarded_when_the_read_back_differs(backend, congregation, monkeypatch):
+    archive = datastore.get_archive()
+    read = archive.read
+    monkeypatch.setattr(archive, "read", lambda *args, **kwargs: read(*args, **kwargs).iloc[1:])
+
+    with pytest.raises(DataError, match="discarded"):
+        datastore.archive_year(2024, delete=True)
+
+    assert archive.years() == []
+    assert count(backend, 2024) > 0
+
+
+def test_only_closed_years_are_archived(backend, congregation):
+    with pytest.raises(ValueError, match="not closed"):
+        datastore.archive_year(date.today().year)
@@ -0,0 +1,135 @@
+import os
+from datetime import date
+
+import datastore
+from flag_bits import FLAG_BITS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUNDAY = "2025-06-01"
+
+
+def add_child(client, name="Amani Mwangi", class_group="Chosen Nation(grade 1–3)"):
+    return client.table("children").insert({"full_name": name, "class_group": class_group}).execute().data[0]["id"]
+
+
+def saved_mark(client, child_id):
+    return client.table("attendance").select("*").eq("child_id", child_id).eq("session_date", SUNDAY).execute().data
+
+
+def loaded_mark(child_id):
+    day = datastore.load_attendance_on(SUNDAY)
+    return day[day["child_id"] == child_id].to_dict("records")[0]
+
+
+def test_teachers_editing_the_same_copy_keep_each_others_flags(backend):
+    child_id = add_child(backend)
+    datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True})
+    base = loaded_mark(child_id)
+
+    first = datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True, "early": True}, base)
+    second = datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True, "has_pen": True}, base)
+
+    assert not first["merged"]
+    assert second["merged"]
+    [row] = saved_mark(backend, child_id)
+    assert row["early"] and row["has_pen"]
+    assert row["version"] == 3
+
+
+def test_unmarked_base_detects_a_mark_saved_meanwhile(backend):
+    child_id = add_child(backend)
+    backend.rpc("merge_attendance", {
+        "p_child_id": child_id, "p_session_date": SUNDAY,
+        "p_mask": FLAG_BITS["present"] | FLAG_BITS["has_bible"],
+        "p_values": FLAG_BITS["present"] | FLAG_BITS["has_bible"],
+    }).execute()
+
+    saved = datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True, "early": True})
+
+    assert saved["merged"]
+    [row] = saved_mark(backend, child_id)
+    assert row["has_bible"] and row["early"]
+
+
+def test_unchanged_mark_is_not_written(backend):
+    child_id = add_child(backend)
+    datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True})
+    base = loaded_mark(child_id)
+
+    saved = datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True}, base)
+
+    assert saved == {**base, "merged": False}
+    assert saved_mark(backend, child_id)[0]["version"] == 1
+
+
+def test_local_updates_bump_the_version_like_the_postgres_trigger(backend):
+    child_id = add_child(backend)
+    row = backend.table("attendance").insert({"child_id": child_id, "session_date": SUNDAY, "present": True}).execute().data[0]
+
+    updated = backend.table("attendance").update({"early": True}).eq("id", row["id"]).execute().data[0]
+    upserted = backend.table("attendance").upsert(
+        [{"child_id": child_id, "session_date": SUNDAY, "has_pen": True}], on_conflict="child_id,session_date"
+    ).execute().data[0]
+
+    assert (row["version"], updated["version"], upserted["version"]) == (1, 2, 3)
+    assert updated["updated_at"] is not None
+
+
+def test_fallback_save_reports_real_versions(backend, monkeypatch):
+    monkeypatch.setattr(datastore, "_merge_function_missing", True)
+    starts = []
+    monkeypatch.setattr(datastore, "_update_enrollment_start", lambda supabase, child_id, day: starts.append(child_id))
+    child_id = add_child(backend)
+
+    created = datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True})
+    base = loaded_mark(child_id)
+    updated = datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True, "early": True}, base)
+
+    assert created["version"] == 1
+    assert updated["version"] == 2 and not updated["merged"]
+    # Only the new mark moves the enrollment start; the edit does not
+    assert starts == [child_id]
+
+
+def open_attendance_page(day):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+    app.run()
+    app.text_input[0].input("Sundayschool2025").run()
+    app.sidebar.selectbox[0].select("🗓️ Attendance").run()
+    app.date_input[0].set_value(day).run()
+    return app
+
+
+def untick(app, box, child_id):
+    next(checkbox for checkbox in app.checkbox if checkbox.key.startswith(f"{box}_{child_id}_")).uncheck()
+
+
+def save(app):
+    next(button for button in app.button if button.label == "Save Attendance").click().run()
+    assert not app.exception
+
+
+def test_attendance_page_clears_unticked_flags(backend):
+    child_id = add_child(backend)
+    datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True, "has_pen": True})
+    app = open_attendance_page(date(2025, 6, 1))
+
+    untick(app, "pen", child_id)
+    save(app)
+
+    [row] = saved_mark(backend, child_id)
+    assert row["present"] and not row["has_pen"]
+
+
+def test_attendance_page_removes_the_mark_when_present_is_unticked(backend):
+    child_id = add_child(backend)
+    datastore.save_attendance({"child_id": child_id, "session_date": SUNDAY, "present": True, "has_pen": True})
+    app = open_attendance_page(date(2025, 6, 1))
+
+    untick(app, "present", child_id)
+    save(app)
+
+    assert saved_mark(backend, child_id) == []
+    assert datastore.load_attendance_on(SUNDAY).empty
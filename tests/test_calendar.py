@@ -0,0 +1,32 @@
+import functools
+
+import datastore
+from session_calendar import SessionCalendar
+
+
+def test_calendar_counts_held_sessions_per_class():
+    calendar = SessionCalendar([
+        {"session_date": "2025-06-01", "status": "held", "class_group": None},
+        {"session_date": "2025-06-08", "status": "held", "class_group": None},
+        {"session_date": "2025-06-15", "status": "cancelled", "class_group": None},
+        {"session_date": "2025-06-08", "status": "holiday", "class_group": "Teens"},
+    ])
+
+    assert calendar.count("2025-06-01", "2025-07-01") == 2
+    assert calendar.count("2025-06-01", "2025-07-01", "Teens") == 1
+    assert calendar.has_session("2025-06-15") and calendar.status("2025-06-15") == "cancelled"
+
+
+def test_calendar_falls_back_to_every_page_of_attendance_dates(backend, congregation, monkeypatch):
+    children, attendance = congregation
+    monkeypatch.setattr(
+        datastore, "_select_column_paged", functools.partial(datastore._select_column_paged, page_size=100)
+    )
+
+    calendar = datastore.load_calendar()
+
+    dates = attendance["session_date"].unique()
+    assert len(calendar) == len(dates) > 1
+    assert all(calendar.has_session(day) for day in dates)
+    # Copied into the sessions table for next time
+    assert len(backend.table("sessions").select("*").execute().data) == len(dates)
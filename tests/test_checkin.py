@@ -0,0 +1,117 @@
+import pytest
+
+import checkin
+import datastore
+from errors import DataError
+
+SUNDAY = "2025-06-01"
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(save, present_on=lambda session_date: [], **kwargs):
+        options = {"flush_seconds": 0.01, "base_delay": 0.001, "max_delay": 0.01, **kwargs}
+        queues.append(checkin.CheckInQueue(save, present_on, **options))
+        return queues[-1]
+    yield make
+    for queue in queues:
+        queue.stop()
+
+
+def test_check_ins_are_saved_in_one_batch(make_queue):
+    batches = []
+    queue = make_queue(lambda batch: batches.append(batch) or len(batch))
+
+    for child_id in (1, 2, 3):
+        assert queue.check_in(child_id, SUNDAY, early=child_id == 1)
+
+    assert queue.flush(5)
+    assert [len(batch) for batch in batches] == [3]
+    assert batches[0][0] == {"child_id": 1, "session_date": SUNDAY, "early": True}
+    assert queue.stats()["saved"] == 3
+
+
+def test_repeats_and_children_already_present_are_not_saved_again(make_queue):
+    queue = make_queue(len, present_on=lambda session_date: [2])
+
+    assert queue.check_in(1, SUNDAY, early=False)
+    assert not queue.check_in(1, SUNDAY, early=False)
+    assert not queue.check_in(2, SUNDAY, early=False)
+
+    assert queue.flush(5)
+    assert queue.stats()["repeats"] == 2
+
+
+def test_failing_batch_is_split_and_refused_rows_dead_lettered(make_queue):
+    calls = []
+
+    def save(batch):
+        calls.append([c["child_id"] for c in batch])
+        if len(batch) > 1 or batch[0]["child_id"] == 2:
+            raise DataError("saving check-ins", ValueError("violates foreign key constraint"))
+        return 1
+    queue = make_queue(save, retries=2)
+
+    for child_id in (1, 2, 3):
+        queue.check_in(child_id, SUNDAY, early=False)
+
+    assert queue.flush(5)
+    # The batch is tried once and retried twice, then row by row
+    assert calls == [[1, 2, 3]] * 3 + [[1], [2], [3]]
+    assert [letter["child_id"] for letter in queue.dead_letters] == [2]
+    assert "foreign key" in queue.dead_letters[0]["error"]
+    stats = queue.stats()
+    assert (stats["saved"], stats["dead_letters"], stats["pending"]) == (2, 1, 0)
+
+
+def test_check_ins_wait_out_an_outage(make_queue):
+    state = {"down": True, "saved": []}
+
+    def save(batch):
+        if state["down"]:
+            raise DataError("saving check-ins", ConnectionError("connection refused"))
+        state["saved"].extend(batch)
+        return len(batch)
+    queue = make_queue(save, retries=1)
+
+    queue.check_in(1, SUNDAY, early=False)
+    queue.check_in(2, SUNDAY, early=True)
+
+    assert not queue.flush(0.3)
+    assert queue.stats()["pending"] == 2
+    assert queue.dead_letters == []
+    state["down"] = False
+    assert queue.flush(5)
+    assert sorted(c["child_id"] for c in state["saved"]) == [1, 2]
+
+
+def test_present_children_are_loaded_outside_the_lock(make_queue):
+    def present_on(session_date):
+        # A lock held here would deadlock stats()
+        queue.stats()
+        return [5]
+    queue = make_queue(len, present_on=present_on)
+
+    assert not queue.check_in(5, SUNDAY, early=False)
+
+
+def test_save_checkins_keeps_teachers_flags(backend):
+    child_id = backend.table("children").insert({"full_name": "Amani Mwangi"}).execute().data[0]["id"]
+    backend.table("attendance").insert(
+        {"child_id": child_id, "session_date": SUNDAY, "present": True, "has_bible": True}
+    ).execute()
+
+    assert datastore.save_checkins([{"child_id": child_id, "session_date": SUNDAY, "early": True}]) == 1
+
+    [row] = backend.table("attendance").select("*").eq("child_id", child_id).execute().data
+    assert row["early"] and row["has_bible"]
+    assert row["version"] == 2
+
+
+def test_local_time_follows_the_configured_timezone():
+    ahead, behind = checkin.local_now("Pacific/Kiritimati"), checkin.local_now("Pacific/Pago_Pago")
+
+    assert ahead.tzinfo is None
+    assert round((ahead - behind).total_seconds() / 3600) == 25
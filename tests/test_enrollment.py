@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+import datastore
+import reports
+
+START = reports.PROGRAM_START
+
+
+def test_enrollment_start_moves_only_for_earlier_attendance_outside_the_window():
+    assert reports.next_enrollment_start(None, "2025-03-16") == START
+    assert reports.next_enrollment_start(None, "2025-07-06") == pd.Timestamp("2025-07-06")
+    assert reports.next_enrollment_start("2025-07-06", "2025-06-01") == pd.Timestamp("2025-06-01")
+    assert reports.next_enrollment_start("2025-07-06", "2025-08-03") == pd.Timestamp("2025-07-06")
+    assert reports.next_enrollment_start(START, "2025-06-01") == START
+
+
+def test_stored_starts_are_read_and_missing_ones_are_not_enrolled():
+    children = pd.DataFrame({"id": [1, 2], "enrollment_start": ["2025-07-06", None]})
+
+    starts = reports.enrollment_starts(children)
+
+    assert starts.to_dict() == {1: pd.Timestamp("2025-07-06")}
+    assert not reports.is_new_enrollment(starts.get(2))
+
+
+@pytest.mark.parametrize("start", ["2025-06-01", "2025-06-02", "2025-06-07", "2025-12-31"])
+def test_sundays_are_counted_like_a_weekly_range(start):
+    end = pd.Timestamp("2026-01-04 10:00")
+
+    assert reports.sundays_since(start, end) == len(pd.date_range(start, end, freq="W-SUN"))
+
+
+def test_children_without_a_stored_start_get_one_on_first_load(backend, congregation, monkeypatch):
+    monkeypatch.setattr(datastore, "ARCHIVE_PAGE", 50)
+    children, attendance = congregation
+    expected = reports.compute_enrollment_starts(attendance)
+
+    starts = reports.enrollment_starts(datastore.load_children())
+
+    assert starts.to_dict() == expected.to_dict()
+    stored = backend.table("children").select("id, enrollment_start").execute().data
+    assert sum(row["enrollment_start"] is not None for row in stored) == len(expected)
+
+
+def test_a_new_mark_stores_the_childs_start(backend):
+    child_id = backend.table("children").insert({"full_name": "Amani Mwangi"}).execute().data[0]["id"]
+    datastore.load_children()
+
+    datastore.save_attendance({"child_id": child_id, "session_date": "2025-08-03", "present": True})
+    datastore.save_attendance({"child_id": child_id, "session_date": "2025-07-06", "present": True})
+
+    assert reports.enrollment_starts(datastore.load_children())[child_id] == pd.Timestamp("2025-07-06")
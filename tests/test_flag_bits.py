@@ -0,0 +1,49 @@
+import itertools
+
+import pandas as pd
+
+import datastore
+from flag_bits import FLAG_COLUMNS, FLAGS_DTYPE, flag_counts, pack, pack_frame, pack_row, unpack_frame
+
+
+def every_combination():
+    return pd.DataFrame(list(itertools.product([False, True], repeat=len(FLAG_COLUMNS))), columns=FLAG_COLUMNS)
+
+
+def test_every_combination_of_flags_round_trips():
+    frame = every_combination()
+
+    packed = pack_frame(frame)
+    unpacked = unpack_frame(pd.DataFrame({"flags": packed}))
+
+    assert packed.dtype == FLAGS_DTYPE and packed.nunique() == 64
+    assert unpacked[FLAG_COLUMNS].equals(frame)
+    assert flag_counts(packed) == {name: 32 for name in FLAG_COLUMNS}
+    assert list(packed) == [pack(row) for row in frame.to_dict("records")]
+
+
+def test_partial_updates_keep_the_flags_they_do_not_name():
+    old = pack_row({"id": 1, "present": True, "has_bible": True, "early": False})
+
+    updated = pack_row({"id": 1, "early": True, "has_bible": False}, old)
+
+    assert updated["flags"] == pack({"present": True, "early": True})
+    assert pack_row(updated) is updated
+
+
+def test_missing_flags_count_as_unset():
+    frame = pd.DataFrame({"present": [True, None], "early": [None, True]})
+
+    assert list(pack_frame(frame)) == [pack({"present": True}), pack({"early": True})]
+
+
+def test_saved_flags_are_read_back_unpacked(backend):
+    child_id = backend.table("children").insert({"full_name": "Amani Mwangi"}).execute().data[0]["id"]
+    for row, record in enumerate(every_combination().to_dict("records")):
+        day = f"2025-{row // 28 + 1:02d}-{row % 28 + 1:02d}"
+        backend.table("attendance").insert({"child_id": child_id, "session_date": day, **record}).execute()
+
+    attendance = datastore.load_attendance().sort_values("session_date", ignore_index=True)
+
+    assert attendance[FLAG_COLUMNS].equals(every_combination())
+    assert attendance["flags"].dtype == FLAGS_DTYPE
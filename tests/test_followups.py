@@ -0,0 +1,78 @@
+import pandas as pd
+
+import datastore
+from flag_bits import FLAG_BITS
+from followups import AbsenceTracker
+from session_calendar import SessionCalendar
+
+SUNDAYS = [f"2025-06-{day:02d}" for day in (1, 8, 15, 22, 29)]
+TODAY = "2025-06-30"
+
+
+def mark(row_id, child_id, date, *flags):
+    return {"id": row_id, "child_id": child_id, "session_date": date,
+            "flags": FLAG_BITS["present"] | sum(FLAG_BITS[flag] for flag in flags)}
+
+
+def children(*ids):
+    return pd.DataFrame({"id": list(ids), "full_name": [f"Child {i}" for i in ids], "class_group": "Teens",
+                         "parent1_name": "Parent", "parent1_contact": "0712345678"})
+
+
+def missed(tracker, calendar, min_absences=1):
+    follow_ups = tracker.follow_ups(children(1, 2), calendar, min_absences, today=TODAY)
+    return dict(zip(follow_ups["Name"], follow_ups["Missed Sundays"]))
+
+
+def test_streaks_count_held_sessions_since_last_seen():
+    tracker = AbsenceTracker()
+    tracker.rebuild([mark(1, 1, SUNDAYS[0]), mark(2, 2, SUNDAYS[3])])
+    calendar = SessionCalendar([{"session_date": day} for day in SUNDAYS] +
+                               [{"session_date": SUNDAYS[2], "status": "cancelled"}])
+
+    assert missed(tracker, calendar) == {"Child 1": 3, "Child 2": 1}
+    assert missed(tracker, calendar, min_absences=2) == {"Child 1": 3}
+
+
+def test_saves_and_deletes_move_the_streak_without_a_rebuild():
+    tracker = AbsenceTracker()
+    tracker.rebuild([mark(1, 1, SUNDAYS[0])])
+    calendar = SessionCalendar.from_dates(SUNDAYS)
+
+    tracker.apply("attendance", None, mark(2, 1, SUNDAYS[3]))
+    assert tracker.last_seen(1) == SUNDAYS[3]
+    assert missed(tracker, calendar)["Child 1"] == 1
+
+    tracker.apply("attendance", mark(2, 1, SUNDAYS[3]), None)
+    assert tracker.last_seen(1) == SUNDAYS[0]
+    assert missed(tracker, calendar)["Child 1"] == 4
+    assert not tracker.stale
+
+
+def test_a_refetch_marks_the_tracker_stale():
+    tracker = AbsenceTracker()
+    tracker.rebuild([])
+
+    tracker.apply("attendance", None, None)
+
+    assert tracker.stale
+
+
+def test_trend_compares_recent_participation_with_before():
+    tracker = AbsenceTracker()
+    tracker.rebuild([mark(i, 1, day, "early", "has_book", "has_pen", "has_bible", "gave_offering")
+                     for i, day in enumerate(SUNDAYS[:4])] + [mark(9, 1, "2025-07-06")])
+
+    assert tracker.trend(1, sessions=2) == -50.0
+    assert tracker.trend(2) is None
+
+
+def test_saved_attendance_reaches_the_shared_tracker(backend):
+    child_id = backend.table("children").insert({"full_name": "Amani Mwangi"}).execute().data[0]["id"]
+    datastore.save_attendance({"child_id": child_id, "session_date": SUNDAYS[0], "present": True})
+    tracker = datastore.load_absence_tracker()
+
+    datastore.save_attendance({"child_id": child_id, "session_date": SUNDAYS[2], "present": True})
+
+    assert not tracker.stale
+    assert tracker.last_seen(child_id) == SUNDAYS[2]
@@ -0,0 +1,180 @@
+import threading
+
+import pytest
+
+import datastore
+from live_updates import LocalChangeFeed, TableCache
+
+
+class Source:
+    """Rows served to the cache per table, counting fetches; on_fetch runs mid-fetch"""
+
+    def __init__(self, **tables):
+        self.tables = {"children": [], "attendance": [], "sessions": [], **tables}
+        self.fetches = 0
+        self.on_fetch = None
+
+    def __call__(self, table):
+        self.fetches += 1
+        if self.on_fetch is not None:
+            self.on_fetch(table)
+        return [dict(row) for row in self.tables[table]]
+
+
+@pytest.fixture
+def source():
+    return Source(children=[{"id": 1, "full_name": "Amani"}, {"id": 2, "full_name": "Baraka"}])
+
+
+@pytest.fixture
+def cache(source):
+    cache = TableCache(source, ttl=None)
+    cache.ensure_loaded(["children"])
+    return cache
+
+
+def test_events_insert_update_and_delete_rows(cache):
+    changes = []
+    cache.observe(lambda table, old, new: changes.append((old and old["id"], new and new["full_name"])))
+    version = cache.version
+
+    cache.apply("children", "INSERT", {"id": 3, "full_name": "Chebet"}, {})
+    cache.apply("children", "UPDATE", {"id": 1, "full_name": "Amani M."}, {})
+    cache.apply("children", "DELETE", {}, {"id": 2})
+
+    assert cache.row("children", 1)["full_name"] == "Amani M."
+    assert cache.row("children", 2) is None
+    assert cache.row("children", 3)["full_name"] == "Chebet"
+    assert changes == [(None, "Chebet"), (1, "Amani M."), (2, None)]
+    assert cache.version == version + 3
+    assert sorted(cache.frame("children")["id"]) == [1, 3]
+
+
+def test_events_during_a_fetch_are_replayed_on_top_of_it(cache, source):
+    source.tables["attendance"] = [{"id": 10, "child_id": 1, "session_date": "2025-06-01", "version": 1}]
+
+    def change_while_fetching(table):
+        cache.apply("attendance", "INSERT", {"id": 11, "child_id": 2, "session_date": "2025-06-01", "version": 1}, {})
+        cache.apply("attendance", "UPDATE", {"id": 10, "child_id": 1, "session_date": "2025-06-08", "version": 2}, {})
+    source.on_fetch = change_while_fetching
+
+    assert cache.ensure_loaded(["attendance"]) == ["attendance"]
+
+    assert cache.row("attendance", 11)["child_id"] == 2
+    assert cache.row("attendance", 10)["session_date"] == "2025-06-08"
+
+
+def test_older_versions_do_not_overwrite_newer_rows(cache, source):
+    source.tables["attendance"] = [{"id": 10, "child_id": 1, "session_date": "2025-06-01", "version": 3}]
+    cache.ensure_loaded(["attendance"])
+    version = cache.version
+
+    cache.apply("attendance", "UPDATE", {"id": 10, "child_id": 1, "session_date": "2025-06-08", "version": 2}, {})
+
+    assert cache.row("attendance", 10)["version"] == 3
+    assert cache.version == version
+    cache.apply("attendance", "UPDATE", {"id": 10, "child_id": 1, "session_date": "2025-06-08", "version": 4}, {})
+    assert cache.row("attendance", 10)["session_date"] == "2025-06-08"
+
+
+def test_connection_changes_force_a_resync(cache, source):
+    feed = LocalChangeFeed()
+    feed.subscribe(cache.apply)
+    feed.on_status(cache.set_connected)
+    feed.start()
+    fetches = source.fetches
+
+    source.tables["children"].append({"id": 3, "full_name": "Chebet"})
+    feed.stop()
+
+    assert not cache.is_fresh("children")
+    cache.ensure_loaded(["children"])
+    assert source.fetches == fetches + 1
+    assert cache.row("children", 3)["full_name"] == "Chebet"
+
+
+def test_ttl_expires_tables_only_without_a_feed(source, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("live_updates.time.monotonic", lambda: now[0])
+    cache = TableCache(source, ttl=30)
+    cache.ensure_loaded(["children"])
+
+    now[0] += 31
+    assert not cache.is_fresh("children")
+    cache.set_connected(True)
+    cache.ensure_loaded(["children"])
+    now[0] += 31
+    assert cache.is_fresh("children")
+
+
+def test_failed_refetch_keeps_serving_the_last_copy(cache, source):
+    cache.invalidate("children")
+
+    def fail(table):
+        raise ConnectionError("offline")
+    source.on_fetch = fail
+
+    assert cache.ensure_loaded(["children"]) == []
+    assert isinstance(cache.last_error, ConnectionError)
+    assert cache.row("children", 1)["full_name"] == "Amani"
+
+
+def test_stale_tables_are_fetched_together(source):
+    started, release = [], threading.Event()
+
+    def wait_for_both(table):
+        started.append(table)
+        # Both fetches must be in flight at once for this to return
+        if len(started) == 2:
+            release.set()
+        assert release.wait(5)
+    source.on_fetch = wait_for_both
+    cache = TableCache(source, ttl=None)
+
+    assert sorted(cache.ensure_loaded(["children", "attendance"])) == ["attendance", "children"]
+    assert sorted(started) == ["attendance", "children"]
+
+
+def test_concurrent_loads_share_one_fetch(source):
+    release = threading.Event()
+    source.on_fetch = lambda table: release.wait(5)
+    cache = TableCache(source, ttl=None)
+    threads = [threading.Thread(target=cache.ensure_loaded, args=(["children"],)) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert source.fetches == 1
+
+
+def test_frames_are_built_once_per_version(cache):
+    builds = []
+
+    def named(cache):
+        builds.append(cache.version)
+        return cache.frame("children").assign(upper=lambda df: df["full_name"].str.upper())
+
+    assert cache.frame("children_upper", named) is cache.frame("children_upper", named)
+    cache.apply("children", "INSERT", {"id": 3, "full_name": "Chebet"}, {})
+    assert cache.frame("children_upper", named)["upper"].tolist() == ["AMANI", "BARAKA", "CHEBET"]
+    assert len(builds) == 2
+
+
+def test_attendance_is_named_from_the_shared_children_frame(congregation, monkeypatch):
+    fetched = []
+    fetch_rows = datastore._fetch_rows
+    monkeypatch.setattr(datastore, "_fetch_rows", lambda table, supabase: fetched.append(table) or fetch_rows(
+        table, supabase
+    ))
+
+    frames = datastore.load_tables("children", "attendance")
+    assert sorted(fetched) == ["attendance", "children"]
+    assert frames["children"] is datastore.load_children()
+    assert frames["attendance"] is datastore.load_attendance()
+    assert sorted(fetched) == ["attendance", "children"]
+
+    names = dict(zip(frames["children"]["id"], frames["children"]["full_name"]))
+    assert (frames["attendance"]["full_name"] == frames["attendance"]["child_id"].map(names)).all()
@@ -0,0 +1,57 @@
+import pandas as pd
+
+import memo
+
+
+def names(rows, length=40):
+    return pd.DataFrame({"full_name": ["x" * length] * rows})
+
+
+def test_frames_are_sized_with_their_strings():
+    short, long = names(1000, 1), names(1000, 400)
+
+    assert memo.estimate_size(long) > memo.estimate_size(short) + 1000 * 300
+
+
+def test_least_recently_used_results_are_evicted_by_size():
+    cache = memo.MemoCache(max_bytes=memo.estimate_size(names(1000)) * 2.5)
+
+    for rows in (1000, 1001):
+        cache.get_or_compute("names", names, (rows,), {})
+    assert cache.get_or_compute("names", names, (1000,), {})[1]
+    cache.get_or_compute("names", names, (1002,), {})
+
+    assert cache.evictions == 1
+    assert cache.bytes <= cache.max_bytes
+    # 1000 was used again, so 1001 went first
+    assert cache.get_or_compute("names", names, (1000,), {})[1]
+    assert not cache.get_or_compute("names", names, (1001,), {})[1]
+
+
+def test_arguments_kept_alive_count_once_until_released():
+    frame = names(5000)
+    size = memo.estimate_size(frame)
+    cache = memo.MemoCache()
+
+    for rows in (1, 2, 3):
+        cache.get_or_compute("head", lambda df, n: df.head(n), (frame, rows), {})
+    results = sum(memo.estimate_size(frame.head(rows)) for rows in (1, 2, 3))
+
+    assert cache.bytes == size + results
+    cache.max_bytes = size
+    cache.get_or_compute("small", lambda n: n, (1,), {})
+    assert cache.bytes <= size
+    assert cache.stats()["entries"] == 1
+
+
+def test_a_new_data_version_drops_every_result():
+    version = {"token": 1}
+    cache = memo.MemoCache(version=lambda: version["token"])
+    cache.get_or_compute("names", names, (10,), {})
+
+    version["token"] = 2
+    result, hit = cache.get_or_compute("names", names, (10,), {})
+
+    assert not hit
+    assert cache.stats()["entries"] == 1
+    assert cache.bytes == memo.estimate_size(result)
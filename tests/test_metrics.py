@@ -0,0 +1,75 @@
+import json
+import logging
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics.MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+    return registry
+
+
+def test_spans_are_summed_per_operation(registry):
+    for rows in (10, 20):
+        with metrics.track("db.load") as span:
+            span.rows = rows
+            span.cache_hit = rows == 10
+    with pytest.raises(ValueError):
+        with metrics.track("db.load"):
+            raise ValueError("bad")
+
+    [row] = registry.snapshot().to_dict("records")
+    assert (row["Calls"], row["Errors"], row["Rows"], row["Cache Hit %"]) == (3, 1, 30, 50.0)
+    assert 'sundayschool_duration_ms_count{op="db.load"} 3' in registry.to_prometheus()
+
+
+def test_timed_counts_the_rows_returned(registry):
+    load = metrics.timed("db.rows")(lambda: [1, 2, 3])
+
+    load()
+
+    assert registry.snapshot()["Rows"].tolist() == [3]
+
+
+def test_spans_are_buffered_and_written_outside_the_lock(registry, tmp_path, monkeypatch):
+    path = tmp_path / "metrics.jsonl"
+    registry.metrics_file = str(path)
+    monkeypatch.setattr(metrics, "FLUSH_SPANS", 3)
+    monkeypatch.setattr(metrics, "FLUSH_SECONDS", 60)
+    writes = []
+    real_open = open
+
+    def watched_open(*args, **kwargs):
+        writes.append(registry._lock.locked())
+        return real_open(*args, **kwargs)
+    monkeypatch.setattr(metrics, "open", watched_open, raising=False)
+
+    for _ in range(2):
+        with metrics.track("db.load"):
+            pass
+    assert not path.exists()
+    with metrics.track("db.load"):
+        pass
+
+    assert writes == [False]
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["db.load"] * 3
+    with metrics.track("db.save"):
+        pass
+    registry.flush()
+    assert len(path.read_text().splitlines()) == 4
+
+
+def test_unwritable_metrics_file_is_dropped_with_a_warning(registry, tmp_path, caplog):
+    registry.metrics_file = str(tmp_path / "missing" / "metrics.jsonl")
+    with metrics.track("db.load"):
+        pass
+
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        registry.flush()
+
+    assert registry.metrics_file is None
+    assert "no longer writing it" in caplog.text
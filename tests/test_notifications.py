@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from notifications import DispatchQueue, FileTransport, normalize_contact
+
+
+class Gateway:
+    """Transport that records batches; fail maps a contact to the errors of its next sends"""
+
+    name = "gateway"
+
+    def __init__(self):
+        self.batches = []
+        self.fail = {}
+
+    def send_batch(self, messages):
+        self.batches.append([message["contact"] for message in messages])
+        errors = [self.fail[m["contact"]].pop(0) if self.fail.get(m["contact"]) else None for m in messages]
+        return errors
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(transport, **kwargs):
+        options = {"base_delay": 0.001, "max_delay": 0.01, **kwargs}
+        queues.append(DispatchQueue(transport, **options))
+        return queues[-1]
+    yield make
+    for queue in queues:
+        queue.stop()
+
+
+def settled(queue, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(d["status"] not in ("queued", "retrying") for d in queue.snapshot()):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_contacts_are_normalized():
+    assert normalize_contact(" 0712-345 (678) ") == "0712345678"
+    assert normalize_contact(float("nan")) is None
+    assert normalize_contact("  ") is None
+
+
+def test_messages_are_sent_and_repeats_skipped(make_queue):
+    gateway = Gateway()
+    queue = make_queue(gateway)
+
+    assert queue.enqueue("0712 345 678", "Hello", "Parent") is not None
+    assert settled(queue)
+    assert queue.enqueue("0712345678", "Hello") is None
+
+    [delivery] = queue.snapshot()
+    assert (delivery["contact"], delivery["status"], delivery["attempts"]) == ("0712345678", "sent", 1)
+    assert gateway.batches == [["0712345678"]]
+
+
+def test_failed_messages_are_retried_then_marked_failed(make_queue):
+    gateway = Gateway()
+    gateway.fail = {"1": ["busy"], "2": ["rejected"] * 3}
+    queue = make_queue(gateway, retries=2)
+
+    queue.enqueue("1", "Hello")
+    queue.enqueue("2", "Hello")
+
+    assert settled(queue)
+    statuses = {d["contact"]: (d["status"], d["attempts"], d["error"]) for d in queue.snapshot()}
+    assert statuses == {"1": ("sent", 2, None), "2": ("failed", 3, "rejected")}
+
+
+def test_snapshot_is_a_copy(make_queue):
+    queue = make_queue(Gateway())
+    queue.enqueue("1", "Hello")
+
+    rows = queue.snapshot()
+    rows[0]["status"] = "changed"
+
+    assert settled(queue)
+    assert queue.snapshot()[0]["status"] == "sent"
+
+
+def test_file_transport_appends_json_lines(tmp_path):
+    path = tmp_path / "outbox" / "messages.jsonl"
+    transport = FileTransport(str(path))
+
+    assert transport.send_batch([{"id": 1, "contact": "1", "text": "Hi"}] * 2) == [None, None]
+    assert len(path.read_text().splitlines()) == 2
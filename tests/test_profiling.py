@@ -0,0 +1,87 @@
+import sys
+import threading
+
+import pandas as pd
+import pytest
+
+import metrics
+import profiling
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics.MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+    return registry
+
+
+def busy_page():
+    with metrics.track("db.load_tables") as span:
+        frame = pd.DataFrame({"class_group": ["Ruby", "Pearl"] * 500, "present": [True, False] * 500})
+        span.rows = len(frame)
+    # Ended on another thread, so not part of this rerun
+    other = threading.Thread(target=lambda: metrics.track("db.elsewhere").__enter__().end())
+    other.start()
+    other.join()
+    return frame.groupby("class_group")["present"].sum()
+
+
+def test_a_capture_profiles_one_rerun_and_unhooks(registry):
+    capture = profiling.Capture("🗓️ Attendance", interval=0.001).start()
+    busy_page()
+    capture.stop()
+
+    assert [span["Operation"] for span in capture.spans] == ["db.load_tables"]
+    assert capture.spans[0]["Rows"] == 1000
+    assert registry.listeners == ()
+    assert capture.top_functions()["Function"].str.contains("busy_page").any()
+    assert capture.pandas_operations()["Operation"].str.startswith("groupby").any()
+
+
+def test_saved_profiles_load_back_newest_first(registry, tmp_path):
+    pages = ["📊 Reports", "👤 Profile", "🗓️ Attendance"]
+
+    for page in pages:
+        capture = profiling.Capture(page).start()
+        busy_page()
+        capture.stop().save(str(tmp_path))
+    assert [name.split("-", 3)[3] for name in profiling.list_profiles(str(tmp_path))] == \
+        ["attendance", "profile", "reports"]
+    profiling._prune(str(tmp_path), keep=2)
+    names = profiling.list_profiles(str(tmp_path))
+
+    assert [name.split("-", 3)[3] for name in names] == ["attendance", "profile"]
+    profile = profiling.load_profile(str(tmp_path), names[0])
+    assert profile["meta"]["page"] == "🗓️ Attendance"
+    assert profile["spans"]["Operation"].tolist() == ["db.load_tables"]
+    assert profile["prof"] and not profile["top"].empty
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="earlier Pythons allow several profilers at once")
+def test_only_one_capture_runs_at_a_time(registry):
+    capture = profiling.begin("📊 Reports")
+    try:
+        assert profiling.begin("👤 Profile") is None
+    finally:
+        capture.stop()
+    assert registry.listeners == ()
+
+
+def test_listeners_see_spans_until_removed(registry):
+    seen = []
+
+    class Recorder:
+        def record(self, span):
+            seen.append(span.name)
+    recorder = Recorder()
+    # A bound method is a new object each time it is looked up
+    registry.add_listener(recorder.record)
+
+    with metrics.track("db.first"):
+        pass
+    registry.remove_listener(recorder.record)
+    with metrics.track("db.second"):
+        pass
+
+    assert seen == ["db.first"]
+    assert registry.listeners == ()
@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from register_import import plan_import
+
+CHILDREN = pd.DataFrame({
+    "id": [1, 2, 3],
+    "full_name": ["Amani Mwangi", "Baraka Otieno", "Chebet Wambui"],
+    "class_group": ["Chosen Nation", "Chosen Nation", "Priesthood"],
+})
+
+
+def sheet(**columns):
+    return pd.DataFrame({"Name": ["Amani Mwangi", "Baraka Otieno", "Chebet Wambui"], **columns})
+
+
+def flags(plan, child_id, session_date):
+    marks = plan["marks"]
+    row = marks[(marks["child_id"] == child_id) & (marks["session_date"] == session_date)]
+    return {name for name in ["present", "early", "has_book", "has_pen", "has_bible", "gave_offering"]
+            if row[name].iloc[0]}
+
+
+def test_letter_codes_set_their_flags():
+    plan = plan_import(sheet(**{"2025-06-01": ["PEB", "p, o", "KN"]}), CHILDREN)
+
+    assert flags(plan, 1, "2025-06-01") == {"present", "early", "has_bible"}
+    assert flags(plan, 2, "2025-06-01") == {"present", "gave_offering"}
+    assert flags(plan, 3, "2025-06-01") == {"present", "has_book", "has_pen"}
+
+
+@pytest.mark.parametrize("mark", ["YES", "TRUE", "yes", "x", "1", "✓"])
+def test_present_marks_set_only_present(mark):
+    plan = plan_import(sheet(**{"2025-06-01": [mark, "", "A"]}), CHILDREN)
+
+    assert flags(plan, 1, "2025-06-01") == {"present"}
+    assert list(plan["marks"]["child_id"]) == [1]
+
+
+def test_unknown_codes_are_rejected():
+    plan = plan_import(sheet(**{"2025-06-01": ["PZ", "P", "P"]}), CHILDREN)
+
+    assert list(plan["marks"]["child_id"]) == [2, 3]
+    assert plan["rejects"]["Value"].tolist() == ["PZ"]
+
+
+def test_dates_are_month_first_by_default():
+    plan = plan_import(sheet(**{"06/01/2025": ["P", "P", "P"]}), CHILDREN)
+
+    assert set(plan["marks"]["session_date"]) == {"2025-06-01"}
+
+
+def test_dayfirst_reads_day_first_but_not_iso_headers():
+    plan = plan_import(sheet(**{"08/06/2025": ["P", "", ""], "2025-06-15": ["P", "", ""]}), CHILDREN, dayfirst=True)
+
+    assert sorted(plan["marks"]["session_date"]) == ["2025-06-08", "2025-06-15"]
+
+
+def test_non_sunday_columns_are_rejected():
+    plan = plan_import(sheet(**{"06/01/2025": ["P", "P", "P"], "06/02/2025": ["P", "P", "P"]}), CHILDREN)
+
+    assert set(plan["marks"]["session_date"]) == {"2025-06-01"}
+    [reject] = plan["rejects"].to_dict("records")
+    assert reject["Row"] == 1 and reject["Column"] == "06/02/2025"
+    assert "Monday" in reject["Reason"]
+
+
+def test_day_month_mix_up_is_reported():
+    with pytest.raises(ValueError, match="day first"):
+        plan_import(sheet(**{"01/06/2025": ["P", "P", "P"]}), CHILDREN)
+
+
+def test_misspelt_names_match_by_spelling():
+    plan = plan_import(
+        pd.DataFrame({"Name": ["amani  mwangi", "Barakka Otieno"], "2025-06-01": ["P", "P"]}), CHILDREN
+    )
+
+    assert plan["matches"]["Match"].tolist() == ["exact", "fuzzy"]
+    assert sorted(plan["marks"]["child_id"]) == [1, 2]
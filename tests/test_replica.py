@@ -0,0 +1,91 @@
+import pytest
+
+import config
+import datastore
+import memo
+from replica import AnalyticsReplica
+
+
+@pytest.fixture
+def replica(congregation):
+    cache = datastore.get_table_cache()
+    cache.ensure_loaded(["children", "attendance"])
+    replica = AnalyticsReplica()
+    cache.observe(replica.record)
+    replica.sync(cache)
+    return replica
+
+
+def same_report(backend, replica, name, **params):
+    return replica.rpc(name, **params) == backend.rpc(name, params).execute().data
+
+
+def test_replica_answers_reports_like_the_database(backend, replica):
+    assert same_report(backend, replica, "sunday_summary", p_date="2025-06-01")
+    assert same_report(backend, replica, "monthly_summary", p_year=2025, p_month=6)
+
+
+def test_sync_applies_inserts_updates_and_deletes(backend, replica):
+    cache = datastore.get_table_cache()
+    day = datastore.load_attendance_on("2025-06-01")
+    absent = next(int(child_id) for child_id in datastore.load_children()["id"] if child_id not in set(day["child_id"]))
+    edited, removed = day.to_dict("records")[:2]
+
+    datastore.save_attendance({"child_id": absent, "session_date": "2025-06-01", "present": True, "early": True})
+    datastore.save_attendance({**edited, "has_pen": not edited["has_pen"]}, edited)
+    response = backend.table("attendance").delete().eq("id", removed["id"]).execute()
+    datastore._publish_write("attendance", "DELETE", response.data)
+
+    # The new mark may also store the child's enrollment start, a children change
+    assert replica.sync(cache) >= 3
+    assert replica.watermark == cache.version
+    assert same_report(backend, replica, "sunday_summary", p_date="2025-06-01")
+
+
+def test_failed_sync_rebuilds_on_the_next_one(backend, replica, monkeypatch):
+    cache = datastore.get_table_cache()
+    day = datastore.load_attendance_on("2025-06-01")
+    mark = day.to_dict("records")[0]
+    datastore.save_attendance({**mark, "has_bible": not mark["has_bible"]}, mark)
+
+    monkeypatch.setattr(replica, "_apply", lambda changes: (_ for _ in ()).throw(OSError("disk full")))
+    with pytest.raises(OSError):
+        replica.sync(cache)
+    assert replica.stale
+
+    monkeypatch.undo()
+    replica.sync(cache)
+    assert not replica.stale
+    assert same_report(backend, replica, "sunday_summary", p_date="2025-06-01")
+
+
+def test_too_many_changes_trigger_a_rebuild(backend, replica, monkeypatch):
+    monkeypatch.setattr("replica.MAX_PENDING", 1)
+    day = datastore.load_attendance_on("2025-06-01").to_dict("records")
+
+    for mark in day[:3]:
+        datastore.save_attendance({**mark, "early": not mark["early"]}, mark)
+
+    assert replica.stale
+    replica.sync(datastore.get_table_cache())
+    assert same_report(backend, replica, "sunday_summary", p_date="2025-06-01")
+
+
+def test_reports_ask_the_database_until_the_replica_is_built(backend, congregation, monkeypatch):
+    config.set_source(lambda: {"replica": {"enabled": True}, "http": {"retries": 0}})
+    answered = []
+    rpc = AnalyticsReplica.rpc
+    monkeypatch.setattr(AnalyticsReplica, "rpc", lambda self, name, **params: answered.append(name) or rpc(
+        self, name, **params
+    ))
+    expected = backend.rpc("sunday_summary", {"p_date": "2025-06-01"}).execute().data
+
+    assert datastore.call_report_function("sunday_summary", p_date="2025-06-01") == expected
+    assert answered == []
+    datastore._replica_rebuild.join(5)
+    memo.cache.clear()
+
+    assert datastore.call_report_function("sunday_summary", p_date="2025-06-01") == expected
+    assert datastore.call_report_function("monthly_summary", p_year=2025, p_month=6) == \
+        backend.rpc("monthly_summary", {"p_year": 2025, "p_month": 6}).execute().data
+    assert answered == ["sunday_summary", "monthly_summary"]
@@ -0,0 +1,64 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import datastore
+import reports
+
+def numbers(value):
+    """A report's counts and rates as plain rounded numbers, without the frames it carries, for comparing"""
+    if isinstance(value, dict):
+        return {key: numbers(item) for key, item in value.items() if not isinstance(item, pd.DataFrame)}
+    if isinstance(value, list):
+        return [numbers(item) for item in value]
+    value = value.item() if hasattr(value, "item") else value
+    return round(value, 6) if isinstance(value, float) else value
+
+
+@pytest.mark.parametrize("day", [date(2025, 6, 1), date(2024, 11, 3)])
+def test_sunday_summary_matches_the_report_from_the_tables(backend, congregation, day):
+    children_df, attendance_df = datastore.load_children(), datastore.load_attendance()
+    summary = datastore.call_report_function("sunday_summary", p_date=day.isoformat())
+    daily = datastore.load_attendance_on(day.isoformat())
+
+    from_tables = reports.sunday_report(children_df, attendance_df, day)
+    from_summary = reports.sunday_report_from_summary(summary, children_df, daily)
+
+    assert from_summary["total_present"] > 0
+    assert numbers(from_summary) == numbers(from_tables)
+
+
+@pytest.mark.parametrize("year, month", [(2025, 6), (2024, 12)])
+def test_monthly_summary_matches_the_report_from_the_tables(backend, congregation, year, month):
+    children_df, attendance_df = datastore.load_children(), datastore.load_attendance()
+    calendar = datastore.load_calendar()
+    summary = datastore.call_report_function("monthly_summary", p_year=year, p_month=month)
+
+    from_tables = reports.monthly_report(children_df, attendance_df, year, month, calendar)
+    from_summary = reports.monthly_report_from_summary(summary, year, month, calendar)
+
+    assert from_summary["total_sessions"] > 0
+    assert numbers(from_summary) == numbers(from_tables)
+
+
+def test_child_tallies_match_the_ones_from_the_tables(backend, congregation):
+    children_df, attendance_df = datastore.load_children(), datastore.load_attendance()
+
+    tallies = datastore.call_report_function(
+        "monthly_child_tallies", p_year=2025, p_month=6, **reports.program_params()
+    )
+
+    columns = ["child_id", "full_name", "class_group", "first_attendance", "sessions_attended",
+               "sessions_since_tracking", "is_new"]
+    expected = reports.monthly_child_tallies(children_df, attendance_df, 2025, 6)
+    assert len(tallies) > 0
+    assert [{c: tally[c] for c in columns} for tally in tallies] == \
+        [{c: numbers(tally[c]) for c in columns} for tally in expected]
+
+
+def test_missing_functions_fall_back_to_none(backend, monkeypatch):
+    monkeypatch.setattr(datastore, "_missing_functions", set())
+
+    assert datastore.call_report_function("not_installed", p_date="2025-06-01") is None
+    assert "not_installed" in datastore._missing_functions
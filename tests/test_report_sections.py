@@ -0,0 +1,128 @@
+import threading
+from datetime import date
+
+import pytest
+
+import datastore
+import exports
+import reports
+
+SUNDAY = date(2025, 6, 1)
+
+
+def paged_table():
+    import pandas as pd
+    import streamlit as st
+
+    from views.paging import paged_dataframe
+
+    rows = st.session_state.get("rows", 120)
+    paged_dataframe(pd.DataFrame({"n": range(rows)}), "numbers", page_rows=50)
+
+
+def toggled_section():
+    import streamlit as st
+
+    from views.paging import opened
+
+    if opened("Show children", key="section"):
+        st.session_state["computed"] = st.session_state.get("computed", 0) + 1
+
+
+def run(script, **state):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(script, default_timeout=30)
+    for key, value in state.items():
+        app.session_state[key] = value
+    return app.run()
+
+
+def test_long_tables_are_sent_one_page_at_a_time():
+    app = run(paged_table)
+    assert len(app.dataframe[0].value) == 50
+
+    app.number_input(key="numbers_page").set_value(3).run()
+    assert app.dataframe[0].value["n"].tolist() == list(range(100, 120))
+
+    # A shrinking table keeps the page number in range
+    app.session_state["rows"] = 60
+    app.run()
+    assert app.number_input(key="numbers_page").value == 2
+    assert app.dataframe[0].value["n"].tolist() == list(range(50, 60))
+
+
+def test_short_tables_are_shown_whole():
+    app = run(paged_table, rows=50)
+
+    assert len(app.number_input) == 0
+    assert len(app.dataframe[0].value) == 50
+
+
+def test_closed_sections_compute_nothing():
+    app = run(toggled_section)
+    app.run()
+    assert "computed" not in app.session_state
+
+    app.toggle(key="section").set_value(True).run()
+    assert app.session_state["computed"] == 1
+
+
+def test_class_details_cover_the_sunday_report(congregation):
+    children_df, daily = datastore.load_children(), datastore.load_attendance_on(SUNDAY.isoformat())
+    report = reports.sunday_report(children_df, datastore.load_attendance(), SUNDAY)
+
+    present_names, absent_names = [], []
+    for section in report["classes"]:
+        present_details, absent_children = reports.sunday_class_details(children_df, daily, section["name"])
+        present = 0 if present_details is None else len(present_details)
+        absent = 0 if absent_children is None else len(absent_children)
+        assert (present, absent) == (section["present"], section["absent"])
+        present_names += [] if present_details is None else present_details["Name"].tolist()
+        absent_names += [] if absent_children is None else absent_children["full_name"].tolist()
+
+    named = dict(zip(children_df["id"], children_df["full_name"]))
+    assert sorted(present_names) == sorted(named[child_id] for child_id in daily["child_id"])
+    assert len(present_names) + len(absent_names) == len(children_df)
+
+
+def test_sunday_export_uses_the_same_sections(congregation):
+    children_df, daily = datastore.load_children(), datastore.load_attendance_on(SUNDAY.isoformat())
+    report = reports.sunday_report(children_df, datastore.load_attendance(), SUNDAY)
+
+    sheets = exports.sunday_sheets(report, SUNDAY)
+
+    assert len(sheets["Present"]) == report["total_present"]
+    assert len(sheets["Absent"]) == report["total_absent"]
+    ocm_present, ocm_absent = reports.sunday_ocm_details(children_df, daily)
+    if ocm_present is not None:
+        assert sheets["OCM Present"].equals(ocm_present)
+    if ocm_absent is not None:
+        assert len(sheets["OCM Absent"]) == len(ocm_absent)
+
+
+def test_failed_exports_are_built_again():
+    cache = exports.ExportCache(max_workers=1)
+    attempts = []
+
+    def build():
+        attempts.append(threading.current_thread().name)
+        if len(attempts) == 1:
+            raise OSError("disk full")
+        return {"xlsx": b"workbook"}
+
+    with pytest.raises(OSError):
+        cache.request(("sunday", SUNDAY, 1), build).result(5)
+    assert cache.request(("sunday", SUNDAY, 1), build).result(5) == {"xlsx": b"workbook"}
+    assert cache.request(("sunday", SUNDAY, 1), build).result(5) == {"xlsx": b"workbook"}
+    assert len(attempts) == 2
+    assert attempts[0].startswith("report-export")
+
+
+def test_oldest_exports_are_dropped_first():
+    cache = exports.ExportCache(max_entries=2, max_workers=1)
+
+    for version in (1, 2, 3):
+        cache.request(("sunday", SUNDAY, version), lambda: {"xlsx": b""}).result(5)
+
+    assert [key[2] for key in cache._futures] == [2, 3]
@@ -0,0 +1,107 @@
+import sqlite3
+
+import httpx
+import pytest
+
+import resilient_client
+from local_backend import LocalClient
+from resilient_client import CircuitBreaker, CircuitOpenError, ResilientClient, is_transient
+
+
+class Flaky:
+    """execute() that fails with the given errors in turn, then returns "ok" """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class Coded(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(resilient_client.time, "sleep", lambda seconds: None)
+    return ResilientClient(LocalClient(), retries=2, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=30))
+
+
+def test_transient_errors_are_told_apart():
+    assert is_transient(httpx.ConnectError("refused"))
+    assert is_transient(sqlite3.OperationalError("database is locked"))
+    assert is_transient(Coded("503")) and is_transient(Coded("40001"))
+    assert not is_transient(Coded("23505"))
+    assert not is_transient(ValueError("bad filter"))
+
+
+def test_idempotent_calls_are_retried_until_they_succeed(client):
+    execute = Flaky(httpx.ReadTimeout("slow"), Coded("503"))
+
+    assert client.call("select", execute) == "ok"
+    assert execute.calls == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_inserts_and_bad_requests_are_not_retried(client):
+    insert = Flaky(httpx.ReadTimeout("slow"))
+    with pytest.raises(httpx.ReadTimeout):
+        client.call("insert", insert)
+    bad = Flaky(Coded("23505"))
+    with pytest.raises(Coded):
+        client.call("select", bad)
+
+    assert (insert.calls, bad.calls) == (1, 1)
+    # The bad request reached the database, so it counts as a success for the breaker
+    assert client.breaker.failures == 0
+
+
+def test_breaker_opens_after_repeated_failures_then_lets_one_probe_through(client, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilient_client.time, "monotonic", lambda: now[0])
+    for _ in range(2):
+        with pytest.raises(httpx.ConnectError):
+            client.call("select", Flaky(*[httpx.ConnectError("down")] * 3))
+
+    assert client.breaker.state == "open"
+    never_called = Flaky()
+    with pytest.raises(CircuitOpenError):
+        client.call("select", never_called)
+    assert never_called.calls == 0 and client.stats()["rejected"] == 1
+
+    now[0] += 30
+    assert client.breaker.allow()
+    assert not client.breaker.allow()
+    client.breaker.record_success()
+    assert client.call("select", Flaky()) == "ok"
+    assert client.stats()["circuit"] == "closed"
+
+
+def test_failed_probe_opens_the_breaker_again(client, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilient_client.time, "monotonic", lambda: now[0])
+    client.breaker.failures = 1
+    client.breaker.record_failure()
+    now[0] += 30
+
+    with pytest.raises(httpx.ConnectError):
+        client.call("select", Flaky(*[httpx.ConnectError("down")] * 3))
+
+    assert client.breaker.state == "open" and client.breaker.times_opened == 2
+    assert client.breaker.retry_in() == 30
+
+
+def test_queries_pass_through_the_wrapper(client):
+    client.table("children").insert({"full_name": "Amani Mwangi"}).execute()
+
+    rows = client.table("children").select("full_name").eq("full_name", "Amani Mwangi").execute().data
+
+    assert rows == [{"full_name": "Amani Mwangi"}]
+    assert client.stats()["calls"] == 2
@@ -0,0 +1,90 @@
+import pandas as pd
+
+import datastore
+from flag_bits import pack
+from rollups import DIMENSIONS, MEASURES, RollupCube
+
+CHILDREN = [
+    {"id": 1, "class_group": "Teens", "sponsored": True, "gender": "F", "grade": 7},
+    {"id": 2, "class_group": "Teens", "sponsored": False, "gender": "M", "grade": 8},
+    {"id": 3, "class_group": "Tots", "sponsored": False, "gender": "F", "grade": None},
+]
+
+
+def mark(row_id, child_id, date, **flags):
+    return {"id": row_id, "child_id": child_id, "session_date": date, "flags": pack({"present": True, **flags})}
+
+
+ATTENDANCE = [
+    mark(1, 1, "2025-06-01", early=True),
+    mark(2, 2, "2025-06-01", has_bible=True),
+    mark(3, 3, "2025-06-08"),
+    mark(4, 1, "2025-07-06", early=True, has_pen=True),
+]
+
+
+def brute_force(group_by, attendance=ATTENDANCE):
+    """The slice computed row by row, to check the cube against"""
+    children = {child["id"]: child for child in CHILDREN}
+    rows = []
+    for row in attendance:
+        child = children[row["child_id"]]
+        rows.append({"month": row["session_date"][:7], **{dim: child[dim] for dim in DIMENSIONS[1:]},
+                     "attended": 1, **{m: int(bool(row["flags"] & pack({m: True}))) for m in MEASURES[1:]}})
+    return pd.DataFrame(rows).groupby(group_by, dropna=False)[MEASURES].sum().reset_index()
+
+
+def cube(attendance=ATTENDANCE):
+    cube = RollupCube(capacity=2)
+    cube.rebuild(CHILDREN, attendance)
+    return cube
+
+
+def test_slices_match_counting_every_row():
+    for group_by in (["month"], ["class_group", "gender"], ["sponsored"]):
+        expected = brute_force(group_by).sort_values(group_by, ignore_index=True)
+        assert cube().slice(group_by).sort_values(group_by, ignore_index=True).equals(expected)
+
+
+def test_filters_and_extra_cells_are_counted():
+    archived = pd.DataFrame([{"month": "2024-12", "class_group": "Teens", "sponsored": True, "gender": "F",
+                              "grade": 7, **{m: 1 for m in MEASURES}}])
+
+    table = cube().slice(["month"], filters={"class_group": "Teens"}, extra=archived)
+
+    assert table.set_index("month")["attended"].to_dict() == {"2024-12": 1, "2025-06": 2, "2025-07": 1}
+    assert cube().pivot("class_group", "month", "early").loc["Teens"].tolist() == [1, 1]
+
+
+def test_attendance_changes_move_counts_between_cells():
+    incremental = cube(ATTENDANCE[:2])
+    child_of = {child["id"]: child for child in CHILDREN}.get
+
+    incremental.apply("attendance", None, ATTENDANCE[2], child_of)
+    incremental.apply("attendance", None, ATTENDANCE[3], child_of)
+    incremental.apply("attendance", ATTENDANCE[1], mark(2, 2, "2025-06-01"), child_of)
+    incremental.apply("attendance", ATTENDANCE[0], None, child_of)
+
+    expected = [mark(2, 2, "2025-06-01"), ATTENDANCE[2], ATTENDANCE[3]]
+    group_by = ["month", "class_group"]
+    table = incremental.slice(group_by)
+    assert table[table["attended"] > 0].reset_index(drop=True).equals(cube(expected).slice(group_by))
+    assert not incremental.stale
+
+
+def test_a_child_moving_class_marks_the_cube_stale():
+    moved = cube()
+
+    moved.apply("children", CHILDREN[0], {**CHILDREN[0], "class_group": "Tots"}, None)
+
+    assert moved.stale
+
+
+def test_saves_reach_the_shared_cube(backend, congregation):
+    before = datastore.load_rollup().slice(["month"]).set_index("month")["attended"]
+    child_id = int(datastore.load_children()["id"].iloc[0])
+
+    datastore.save_attendance({"child_id": child_id, "session_date": "2026-01-04", "present": True})
+
+    after = datastore.load_rollup().slice(["month"]).set_index("month")["attended"]
+    assert after["2026-01"] == before.get("2026-01", 0) + 1
@@ -0,0 +1,57 @@
+import time
+
+import datastore
+import memo
+import warmup
+
+
+def test_a_failing_step_does_not_stop_the_run():
+    done = []
+
+    def fail():
+        raise ConnectionError("offline")
+    run = warmup.Warmup().run_once([("first", fail), ("second", lambda: done.append(True))])
+
+    assert [step["error"] for step in run["steps"]] == ["offline", None]
+    assert done == [True]
+
+
+def test_warm_up_runs_again_with_each_data_version(backend, monkeypatch):
+    monkeypatch.setattr(warmup, "VERSION_MARGIN", 0.01)
+    monkeypatch.setattr(datastore, "seconds_to_next_version", lambda: 0.0)
+    warmer = warmup.Warmup()
+    monkeypatch.setattr(warmup, "warmer", warmer)
+
+    assert warmup.start({})
+    try:
+        deadline = time.monotonic() + 5
+        while warmer.stats()["runs"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        warmer.stop()
+        # A run still in flight would load tables into the next test's cache
+        warmer._thread.join(5)
+
+    assert warmer.stats()["runs"] >= 3
+
+
+def warmed():
+    """Whether the calendar is memoized for the current data version"""
+    return memo.cache.get_or_compute("datastore.load_calendar", datastore.load_calendar.__wrapped__, (), {})[1]
+
+
+def test_warmed_results_last_until_the_version_changes(backend, congregation, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("datastore.time.monotonic", lambda: now[0])
+    assert datastore.seconds_to_next_version() == datastore.CACHE_TTL - 1000.0 % datastore.CACHE_TTL
+
+    # The first load copies the attendance dates into the sessions table, a new version
+    datastore.load_calendar()
+    steps = [("sessions calendar", datastore.load_calendar)]
+    warmup.Warmup().run_once(steps)
+    assert warmed()
+
+    now[0] += warmup.until_next_version()
+    assert not warmed()
+    warmup.Warmup().run_once(steps)
+    assert warmed()
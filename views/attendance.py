@@ -0,0 +1,135 @@
+import streamlit as st
+from datetime import date
+from database import save_attendance, delete_attendance, save_session, clear_cache, load_attendance_on
+from session_calendar import STATUSES
+
+# Datasets this page needs; the router in app.py loads only these
+DATA = ("children",)
+
+def render(children_df):
+    """Sunday attendance form"""
+    st.title("🗓️ Sunday Attendance")
+    
+    if not children_df.empty:
+        # Extract unique class groups from the children data
+        unique_classes = sorted(children_df['class_group'].dropna().unique())
+        selected_class = st.selectbox("Filter by Class Group", ["All Classes"] + unique_classes)
+
+        # Filter the dataframe based on selected class group
+        if selected_class != "All Classes":
+            filtered_children = children_df[children_df['class_group'] == selected_class]
+        else:
+            filtered_children = children_df
+
+        session_date = st.date_input("Sunday Date", date.today())
+
+        # Marks already saved for this date, possibly by another teacher; each save only
+        # writes the boxes changed from these. Kept from when the form was first shown, as
+        # the submit rerun would otherwise reload them with other teachers' saves in
+        if st.session_state.get("attendance_base", (None,))[0] != session_date:
+            day_df = load_attendance_on(session_date.isoformat())
+            st.session_state["attendance_base"] = (
+                session_date, {row['child_id']: row for row in day_df.to_dict('records')} if not day_df.empty else {}
+            )
+        marks = st.session_state["attendance_base"][1]
+        
+        with st.form("attendance_form"):
+            st.write("Mark Sunday attendance for each child:")
+            
+            # Header
+            col1, col2, col3, col4, col5, col6, col7 = st.columns([3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5])
+            with col1:
+                st.write("**Name**")
+            with col2:
+                st.write("**Present**")
+            with col3:
+                st.write("**Early**")
+            with col4:
+                st.write("**Book**")
+            with col5:
+                st.write("**Pen**")
+            with col6:
+                st.write("**Bible**")
+            with col7:
+                st.write("**Offering**")
+            
+            attendance_records = []
+            
+            with st.container():
+                for _, child in filtered_children.iterrows():
+                    mark = marks.get(child["id"], {})
+                    # Keyed by date and save too, so the boxes show each date's saved marks
+                    key = f"{child['id']}_{session_date.isoformat()}_{st.session_state.get('attendance_saves', 0)}"
+                    col1, col2, col3, col4, col5, col6, col7 = st.columns([3, 1.5, 1.5, 1.5, 1.5, 1.5, 1.5])
+                    with col1:
+                        st.write(child["full_name"])
+                    with col2:
+                        present = st.checkbox("Present", bool(mark.get("present")), key=f"present_{key}")
+                    with col3:
+                        early = st.checkbox("Early", bool(mark.get("early")), key=f"early_{key}")
+                    with col4:
+                        book = st.checkbox("Book", bool(mark.get("has_book")), key=f"book_{key}")
+                    with col5:
+                        pen = st.checkbox("Pen", bool(mark.get("has_pen")), key=f"pen_{key}")
+                    with col6:
+                        bible = st.checkbox("Bible", bool(mark.get("has_bible")), key=f"bible_{key}")
+                    with col7:
+                        offering = st.checkbox("Offering", bool(mark.get("gave_offering")), key=f"offering_{key}")
+                    
+                    # A saved mark is sent even when Present is unticked, so it is removed
+                    if present or mark:
+                        attendance_records.append(({
+                            "child_id": child["id"],
+                            "session_date": session_date.isoformat(),
+                            "present": present,
+                            "early": early,
+                            "has_book": book,
+                            "has_pen": pen,
+                            "has_bible": bible,
+                            "gave_offering": offering
+                        }, mark or None, child["full_name"]))
+            
+            submitted = st.form_submit_button("Save Attendance")
+            
+            if submitted:
+                try:
+                    saved = [
+                        (save_attendance(record, mark) if record['present'] else
+                         delete_attendance(record['child_id'], record['session_date']), name)
+                        for record, mark, name in attendance_records
+                    ]
+                    failed = sum(not row for row, _ in saved)
+                    merged = [name for row, name in saved if isinstance(row, dict) and row['merged']]
+                    if failed:
+                        st.warning(f"{failed} of {len(attendance_records)} marks were not saved")
+                    else:
+                        st.success("✅ Attendance saved successfully!")
+                    if merged:
+                        st.warning(
+                            f"⚠️ Someone else changed {len(merged)} of these marks since you opened the form; "
+                            f"only the boxes you changed were saved over theirs: {', '.join(merged)}"
+                        )
+                    clear_cache('attendance')
+                    # The next rerun starts from the saved marks, other teachers' changes included, in new
+                    # boxes, so a second save cannot undo their edits
+                    st.session_state.pop("attendance_base", None)
+                    st.session_state["attendance_saves"] = st.session_state.get("attendance_saves", 0) + 1
+                except Exception as e:
+                    st.error(f"Error saving attendance: {str(e)}")
+        
+        # Sessions calendar: mark Sundays that did not run so they are not counted as absences
+        with st.expander("Sessions Calendar"):
+            with st.form("session_form"):
+                status = st.selectbox("Status", STATUSES, index=STATUSES.index("cancelled"))
+                session_class = st.selectbox("Applies to", ["All Classes"] + unique_classes)
+                note = st.text_input("Note", "")
+                if st.form_submit_button(f"Save {session_date.isoformat()}"):
+                    if save_session({
+                        "session_date": session_date.isoformat(),
+                        "status": status,
+                        "class_group": None if session_class == "All Classes" else session_class,
+                        "note": note or None
+                    }):
+                        st.success("✅ Session saved successfully!")
+    else:
+        st.warning("No children registered yet!")
@@ -0,0 +1,74 @@
+import time
+import streamlit as st
+from database import import_attendance
+from register_import import CODES, PRESENT_MARKS, read_sheet, plan_import
+from views.paging import paged_dataframe
+
+# Datasets this page needs; the router in app.py loads only these
+DATA = ("children",)
+
+def render(children_df):
+    """Bulk import of attendance typed in from paper registers"""
+    st.title("📥 Attendance Import")
+
+    if children_df.empty:
+        st.warning("No children registered yet!")
+        return
+
+    st.markdown(
+        "Upload a register with one row per child and one column per Sunday: a **Name** column, "
+        "an optional **Class** column to tell namesakes apart, then a column headed with each date."
+    )
+    st.caption(
+        "In each cell: " + ", ".join(f"{code} {flag.replace('_', ' ')}" for code, flag in CODES.items())
+        + f" (e.g. PEB); {', '.join(PRESENT_MARKS[:3])} for present only; blank or A for absent."
+    )
+    upload = st.file_uploader("Register (CSV or Excel)", type=["csv", "xlsx"])
+    dayfirst = st.checkbox("Dates are day first (01/06/2025 is 1 June)", key="import_dayfirst")
+    if upload is None:
+        return
+
+    try:
+        plan = plan_import(read_sheet(upload, upload.name), children_df, dayfirst=dayfirst)
+    except Exception as e:
+        st.error(f"Could not read the register: {str(e)}")
+        return
+
+    marks, matches, rejects = plan['marks'], plan['matches'], plan['rejects']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Marks to save", len(marks))
+    with col2:
+        st.metric("Children", marks['child_id'].nunique())
+    with col3:
+        st.metric("Sundays", marks['session_date'].nunique())
+    with col4:
+        st.metric("Rejected", len(rejects))
+    if plan['ignored_columns']:
+        st.caption(f"Ignored columns (not dates): {', '.join(map(str, plan['ignored_columns']))}")
+
+    fuzzy = matches[matches['Match'] == 'fuzzy']
+    if not fuzzy.empty:
+        st.markdown("**Names matched by spelling — check these:**")
+        paged_dataframe(fuzzy, "import_fuzzy", hide_index=True)
+
+    if not rejects.empty:
+        st.markdown("**Rejected cells and rows:**")
+        paged_dataframe(rejects, "import_rejects", hide_index=True)
+        st.download_button(
+            "⬇️ Reject report", rejects.to_csv(index=False), file_name="import_rejects.csv", mime="text/csv"
+        )
+
+    st.markdown("**Preview:**")
+    paged_dataframe(marks, "import_preview", hide_index=True)
+
+    if marks.empty:
+        st.info("Nothing to import")
+        return
+    st.caption("Imported marks replace any already saved for the same child and date.")
+    if st.button(f"Import {len(marks)} marks"):
+        start = time.perf_counter()
+        with st.spinner("Saving..."):
+            saved = import_attendance(marks)
+        if saved is not None:
+            st.success(f"✅ {saved} marks saved in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,100 @@
+import streamlit as st
+from datetime import datetime
+from database import update_child, delete_child, clear_cache
+
+# Datasets this page needs; the router in app.py loads only these
+DATA = ("children",)
+
+def render(children_df):
+    """Edit or delete a child's record"""
+    st.title("✏️ Edit or Delete Child Profile")
+
+    if not children_df.empty:
+        # 1. Filter by class_group
+        class_options = ["All Classes"] + sorted(children_df["class_group"].dropna().unique().tolist())
+        selected_class = st.selectbox("Select Class Group", class_options)
+
+        filtered_df = children_df if selected_class == "All Classes" else children_df[children_df["class_group"] == selected_class]
+
+        # 2. Search and select name
+        search_name = st.text_input("Search by Name")
+        if search_name:
+            filtered_df = filtered_df[filtered_df["full_name"].str.lower().str.contains(search_name.lower())]
+
+        if not filtered_df.empty:
+            selected_child = st.selectbox("Select Child", filtered_df["full_name"].tolist())
+            child_info = filtered_df[filtered_df["full_name"] == selected_child].iloc[0]
+
+            # 3. Delete button
+            if st.button("🗑️ Delete Profile"):
+                try:
+                    if delete_child(child_info["id"]):
+                        st.success(f"✅ Deleted {selected_child}'s profile")
+                        clear_cache()
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"Error deleting: {e}")
+
+            # 4. Edit Form
+            with st.form("edit_form"):
+                full_name = st.text_input("Full Name", value=child_info["full_name"])
+                gender = st.selectbox("Gender", ["", "Male", "Female"], index=["", "Male", "Female"].index(child_info["gender"]) if child_info["gender"] else 0)
+
+                dob = st.date_input("Date of Birth", value=datetime.strptime(child_info["date_of_birth"], "%Y-%m-%d").date())
+
+                school = st.text_input("School", value=child_info["school"])
+                grade_list = ["PP1", "PP2", "Grade 1", "Grade 2", "Grade 3", "Grade 4", "Grade 5", "Grade 6",
+                              "Grade 7", "Grade 8", "Grade 9", "Grade 10", "Grade 11", "Grade 12",
+                              "Form 1", "Form 2", "Form 3", "Form 4"]
+                grade = st.selectbox("Grade / Form", [""] + grade_list,
+                                     index=([""] + grade_list).index(child_info["grade"]) if child_info["grade"] else 0)
+
+                class_group_list = [
+                    "Chosen Generation(grade PP1–PP2)",
+                    "Chosen Nation(grade 1–3)",
+                    "Priesthood (grade 4–6)",
+                    "Preisthood 2(grade 7–12)",
+                    "Priesthood 2(form 1–4)"
+                ]
+                class_group = st.selectbox("Group/Class", class_group_list,
+                                           index=class_group_list.index(child_info["class_group"]) if child_info["class_group"] else 0)
+
+                residence = st.text_input("Residence", value=child_info["residence"])
+                parent1 = st.text_input("Parent 1", value=child_info["parent1_name"])
+                contact1 = st.text_input("Contact 1", value=child_info["parent1_contact"])
+                parent2 = st.text_input("Parent 2", value=child_info["parent2_name"])
+                contact2 = st.text_input("Contact 2", value=child_info["parent2_contact"])
+                sponsored = st.checkbox("Sponsored by OCM", value=child_info["sponsored"])
+
+                submitted = st.form_submit_button("💾 Save Changes")
+
+                if submitted:
+                    try:
+                        updated_record = {
+                            "full_name": full_name,
+                            "gender": gender,
+                            "date_of_birth": dob.isoformat(),
+                            "school": school,
+                            "grade": grade,
+                            "class_group": class_group,
+                            "residence": residence,
+                            "parent1_name": parent1,
+                            "parent1_contact": contact1,
+                            "parent2_name": parent2,
+                            "parent2_contact": contact2,
+                            "sponsored": sponsored
+                        }
+
+                        if update_child(child_info["id"], updated_record):
+                            st.success("✅ Profile updated successfully!")
+                            clear_cache('children')
+                            st.rerun()
+                        else:
+                            st.error("Update failed.")
+                    except Exception as e:
+                        st.error(f"Update error: {e}")
+
+        else:
+            st.warning("No matching children found.")
+    else:
+        st.warning("No child records yet.")
@@ -0,0 +1,81 @@
+import pandas as pd
+import streamlit as st
+from database import load_absence_tracker, load_calendar, get_config
+from followups import DEFAULT_MIN_ABSENCES
+from notifications import DEFAULT_TEMPLATE, get_dispatcher, parent_messages
+
+# Datasets this page needs; the router in app.py loads only these. Attendance
+# history comes from the absence tracker, kept current as attendance is saved.
+DATA = ("children",)
+
+def render(children_df):
+    """Children who missed several Sundays in a row, with their parents' contacts"""
+    st.title("📞 Absence Follow-up")
+
+    if children_df.empty:
+        st.warning("No children registered yet!")
+        return
+
+    tracker = load_absence_tracker()
+    if tracker is None:
+        return
+
+    default_absences = get_config("followup").get("absences", DEFAULT_MIN_ABSENCES)
+    col1, col2 = st.columns(2)
+    with col1:
+        min_absences = st.number_input("Missed Sundays in a row", min_value=1, value=int(default_absences))
+    with col2:
+        class_options = ["All Classes"] + sorted(children_df["class_group"].dropna().unique().tolist())
+        selected_class = st.selectbox("Filter by Class Group", class_options)
+
+    follow_ups = tracker.follow_ups(children_df, load_calendar(), min_absences)
+    if selected_class != "All Classes":
+        follow_ups = follow_ups[follow_ups["Class"] == selected_class]
+
+    if follow_ups.empty:
+        st.success(f"✅ No child has missed {min_absences} Sundays in a row")
+        return
+
+    st.metric("Children to follow up", len(follow_ups))
+    st.caption("Participation Trend compares the last 4 Sundays attended with the 4 before, in percentage points")
+    st.dataframe(follow_ups, use_container_width=True, hide_index=True)
+    st.download_button(
+        "⬇️ Follow-up list (CSV)",
+        follow_ups.to_csv(index=False),
+        file_name="absence_follow_up.csv",
+        mime="text/csv"
+    )
+
+    message_parents(follow_ups)
+
+def message_parents(follow_ups):
+    """Queue one message per parent contact; sending happens on the dispatcher's background thread"""
+    st.subheader("✉️ Message Parents")
+    config = get_config("notifications")
+    template = st.text_area(
+        "Message ({parent}, {children} and {missed} are filled in)",
+        config.get("template", DEFAULT_TEMPLATE)
+    )
+    try:
+        messages = parent_messages(follow_ups, template)
+    except (KeyError, IndexError, ValueError) as e:
+        st.error(f"Error in message template: {str(e)}")
+        return
+    st.caption(f"{len(messages)} parent contacts; siblings sharing a contact get one message")
+
+    dispatcher = get_dispatcher(config)
+    if st.button("Queue messages", disabled=not messages):
+        queued = sum(dispatcher.enqueue(*message) is not None for message in messages)
+        skipped = len(messages) - queued
+        st.success(f"✅ {queued} messages queued" + (f", {skipped} already sent today" if skipped else ""))
+
+    deliveries = dispatcher.snapshot()
+    if deliveries:
+        st.json(dispatcher.stats())
+        deliveries = pd.DataFrame(deliveries)
+        st.dataframe(
+            deliveries[['contact', 'recipient', 'status', 'attempts', 'error', 'updated_at']].iloc[::-1],
+            use_container_width=True,
+            hide_index=True
+        )
+        st.button("Refresh status")
@@ -0,0 +1,72 @@
+import streamlit as st
+from database import get_config
+from checkin import get_checkin_queue, checkin_code, local_now, parse_code, parse_cutoff
+from errors import DataError
+
+# Datasets this page needs; the router in app.py loads only these
+DATA = ("children",)
+
+def render(children_df):
+    """Self check-in at the door: children type or scan their code and are marked present"""
+    st.title("🚪 Check-in")
+
+    if children_df.empty:
+        st.warning("No children registered yet!")
+        return
+
+    config = get_config("kiosk")
+    cutoff = parse_cutoff(config.get("early_before", "09:00"))
+    queue = get_checkin_queue(config)
+    # The date and the early cutoff follow the church's clock, not the server's
+    now = local_now(config.get("timezone"))
+    today = now.date().isoformat()
+
+    # Scanners type the code and press Enter, which submits the form and clears the box
+    with st.form("checkin_form", clear_on_submit=True):
+        code = st.text_input("Type or scan your code", key="checkin_code")
+        submitted = st.form_submit_button("Check in")
+
+    if submitted and code:
+        child_id = parse_code(code)
+        names = children_df.set_index("id")["full_name"]
+        if child_id not in names.index:
+            st.error(f"❌ No child with code {code.strip()} — please ask a teacher")
+        else:
+            early = cutoff is not None and now.time() < cutoff
+            try:
+                if queue.check_in(child_id, today, early, names[child_id]):
+                    st.success(f"✅ Welcome, {names[child_id]}!" + (" You're early! ⭐" if early else ""))
+                else:
+                    st.info(f"👋 {names[child_id]}, you're already checked in today")
+            except DataError as e:
+                st.error(str(e))
+
+    stats = queue.stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Checked in", stats["checked_in"])
+    with col2:
+        st.metric("Waiting to save", stats["pending"])
+    with col3:
+        st.metric("Saved", stats["saved"])
+    if stats["last_error"]:
+        st.warning(f"Check-ins are kept and will be saved when the database answers: {stats['last_error']}")
+    if stats["dead_letters"]:
+        st.error(f"{stats['dead_letters']} check-ins could not be saved; please mark them on the Attendance page:")
+        st.dataframe(queue.dead_letters, use_container_width=True, hide_index=True)
+    if cutoff is not None:
+        st.caption(f"Check-ins before {cutoff.strftime('%H:%M')} are marked early")
+
+    if queue.recent:
+        st.markdown("**Recent check-ins:**")
+        st.dataframe(queue.recent, use_container_width=True, hide_index=True)
+
+    # Codes for printing on cards or badges
+    codes = children_df[["full_name", "class_group", "id"]].rename(
+        columns={"full_name": "Name", "class_group": "Class", "id": "Code"}
+    )
+    codes["Code"] = codes["Code"].map(checkin_code)
+    st.download_button(
+        "⬇️ Check-in codes", codes.sort_values(["Class", "Name"]).to_csv(index=False),
+        file_name="checkin_codes.csv", mime="text/csv"
+    )
@@ -0,0 +1,37 @@
+import streamlit as st
+
+# Rows sent to the browser per page of a large table
+PAGE_ROWS = 50
+
+
+def paged_dataframe(df, key, page_rows=PAGE_ROWS, **kwargs):
+    """Show a frame one page at a time, so only the visible rows are sent to the browser
+
+    Small frames are shown whole. The page number is kept per key and
+    clamped when the frame shrinks, e.g. after the data changes.
+    """
+    total = len(df)
+    if total <= page_rows:
+        st.dataframe(df, **kwargs)
+        return
+
+    pages = -(-total // page_rows)
+    page_key = f"{key}_page"
+    # Seeded through session_state only, as a widget given both a value and a set key warns
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    elif st.session_state[page_key] > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (page - 1) * page_rows
+    st.dataframe(df.iloc[start:start + page_rows], **kwargs)
+    st.caption(f"Rows {start + 1}-{min(start + page_rows, total)} of {total}")
+
+
+def opened(label, key):
+    """Toggle for a section whose contents are computed and rendered only while it is on
+
+    Unlike st.expander, whose body runs on every rerun even when collapsed,
+    nothing under a closed section is computed.
+    """
+    return st.toggle(label, key=key)
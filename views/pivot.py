@@ -0,0 +1,77 @@
+import pandas as pd
+import streamlit as st
+from database import load_rollup, load_archive_summary
+from rollups import DIMENSIONS
+
+# Datasets this page needs; the router in app.py loads only these. The page
+# reads the rollup cube, which loads its own tables on first use.
+DATA = ()
+
+DIMENSION_LABELS = {
+    "month": "Month",
+    "class_group": "Class",
+    "sponsored": "OCM Sponsored",
+    "gender": "Gender",
+    "grade": "Grade",
+}
+
+MEASURE_LABELS = {
+    "attended": "Attendance",
+    "early": "Early",
+    "has_book": "Books",
+    "has_pen": "Pens",
+    "has_bible": "Bibles",
+    "gave_offering": "Offering",
+}
+
+def _format_value(value):
+    return "(none)" if value is None else str(value)
+
+def render():
+    """Pivot table of attendance over any combination of month, class, sponsorship, gender and grade"""
+    st.title("🧮 Attendance Pivot")
+
+    cube = load_rollup()
+    # Archived years are counted from the summaries stored with them
+    archived = load_archive_summary()
+    if cube is None or (len(cube) == 0 and (archived is None or archived.empty)):
+        st.warning("No attendance data available yet!")
+        return
+
+    # Choices are shown by label and mapped back to cube dimensions and measures
+    dimensions = {label: dim for dim, label in DIMENSION_LABELS.items()}
+    measures = {label: measure for measure, label in MEASURE_LABELS.items()}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        rows = dimensions[st.selectbox("Rows", list(dimensions))]
+    with col2:
+        columns = st.selectbox("Columns", ["(none)"] + [label for label, dim in dimensions.items() if dim != rows])
+        columns = dimensions.get(columns)
+    with col3:
+        measure = measures[st.selectbox("Measure", list(measures))]
+
+    # Filters: an empty selection keeps every value of that dimension
+    filters = {}
+    with st.expander("Filters"):
+        for dim in DIMENSIONS:
+            values = set(cube.dimension_values(dim))
+            if archived is not None:
+                values.update(None if pd.isna(value) else value for value in archived[dim].unique())
+            values = sorted(values, key=_format_value)
+            selected = st.multiselect(DIMENSION_LABELS[dim], values, format_func=_format_value, key=f"pivot_{dim}")
+            if selected:
+                filters[dim] = selected
+
+    table = cube.pivot(rows, columns, measure, filters, extra=archived)
+    if table.empty:
+        st.info("No attendance matches these filters")
+        return
+
+    # Dimension values can be booleans or numbers; show them all as text
+    table.index = table.index.map(_format_value).rename(DIMENSION_LABELS[rows])
+    if columns:
+        table.columns = table.columns.map(_format_value).rename(DIMENSION_LABELS[columns])
+    else:
+        table = table.rename(columns=MEASURE_LABELS)
+    st.dataframe(table, use_container_width=True)
+    st.bar_chart(table)
@@ -0,0 +1,138 @@
+import streamlit as st
+from reports import child_profile
+from database import load_calendar, with_archived_history
+
+# Datasets this page needs; the router in app.py loads only these
+DATA = ("children", "attendance")
+
+def render(children_df, attendance_df):
+    """Personal details and attendance history for one child"""
+    st.title("👤 Child Profile")
+    
+    if not children_df.empty:
+        # Add class filter
+        class_options = ["All Classes"] + sorted(children_df["class_group"].unique().tolist())
+        selected_class = st.selectbox("Select Class", class_options)
+        
+        # Filter children by class if a specific class is selected
+        filtered_df = children_df if selected_class == "All Classes" else children_df[children_df["class_group"] == selected_class]
+        
+        # Add search box
+        search_name = st.text_input("Search by Name", "")
+        
+        # Filter by search if provided
+        if search_name:
+            filtered_df = filtered_df[filtered_df["full_name"].str.lower().str.contains(search_name.lower())]
+        
+        if not filtered_df.empty:
+            selected_child = st.selectbox("Select a Child", sorted(filtered_df["full_name"].tolist()))
+            child_info = filtered_df[filtered_df["full_name"] == selected_child].iloc[0]
+        
+        st.subheader("📋 Personal Info")
+        
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            st.info("📷 No profile photo available")
+        
+        with col2:
+            for column in children_df.columns:
+                if column != "full_name":
+                    st.write(f"**{column}:** {child_info[column]}")
+        
+        # Show attendance records
+        st.subheader("📅 Attendance Records")
+        
+        try:
+            # Ensure child_info has the required id field
+            if 'id' not in child_info:
+                st.error("Error: Child record is missing ID field")
+                st.stop()
+            
+            # Include archived years for the child and their class, so the class comparison covers the same years
+            classmates = children_df.loc[children_df['class_group'] == child_info['class_group'], 'id']
+            history_df = with_archived_history(attendance_df, [child_info['id'], *classmates])
+            profile = child_profile(children_df, history_df, child_info, load_calendar())
+            
+            if profile is not None:
+                first_attendance_date = profile['first_attendance_date']
+                if profile['is_new_child']:
+                    st.info(f"📝 New child! First attendance: {first_attendance_date.strftime('%Y-%m-%d')}")
+                else:
+                    st.info(f"👥 Existing child - Attendance tracked from {first_attendance_date.strftime('%B %Y')}")
+                
+                attendance_rate = profile['attendance_rate']
+                rates = profile['rates']
+                
+                # Display attendance summary
+                st.markdown("#### 📊 Attendance Summary")
+                st.markdown(f"**Tracking Start Date:** {first_attendance_date.strftime('%Y-%m-%d')}")
+                st.markdown(f"**Total Available Sessions:** {profile['total_available_sessions']}")
+                
+                # Display metrics in two rows
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Sessions Present", profile['present_count'])
+                with col2:
+                    st.metric("Sessions Absent", profile['absent_count'])
+                with col3:
+                    st.metric("Attendance Rate", f"{attendance_rate:.1f}%")
+                
+                col1, col2, col3, col4, col5 = st.columns(5)
+                with col1:
+                    st.metric("Early Rate", f"{rates['early']:.1f}%")
+                with col2:
+                    st.metric("Book Rate", f"{rates['has_book']:.1f}%")
+                with col3:
+                    st.metric("Pen Rate", f"{rates['has_pen']:.1f}%")
+                with col4:
+                    st.metric("Bible Rate", f"{rates['has_bible']:.1f}%")
+                with col5:
+                    st.metric("Offering Rate", f"{rates['gave_offering']:.1f}%")
+                
+                # Show detailed attendance records
+                st.markdown("#### 📅 Detailed Attendance Records")
+                st.dataframe(profile['display_df'], use_container_width=True)
+                
+                # Show trends
+                st.markdown("#### 📈 Attendance Trends")
+                monthly_attendance = profile['monthly_attendance']
+                st.line_chart(
+                    monthly_attendance.set_index('Month')[['Attendance', 'Early', 'Book', 'Pen', 'Bible', 'Offering']]
+                )
+                
+                # Compare with class averages
+                st.markdown("#### 🔄 Comparison with Class Averages")
+                class_rates = profile['class_comparison']
+                
+                if class_rates is not None:
+                    participation = (rates['has_book'] + rates['has_pen'] + rates['has_bible']) / 3
+                    class_participation = (class_rates['has_book'] + class_rates['has_pen'] + class_rates['has_bible']) / 3
+                    
+                    # Display comparison
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric(
+                            "Attendance vs Class",
+                            f"{attendance_rate:.1f}%",
+                            f"{(attendance_rate - class_rates['present']):.1f}%"
+                        )
+                    with col2:
+                        st.metric(
+                            "Early vs Class",
+                            f"{rates['early']:.1f}%",
+                            f"{(rates['early'] - class_rates['early']):.1f}%"
+                        )
+                    with col3:
+                        st.metric(
+                            "Participation vs Class",
+                            f"{participation:.1f}%",
+                            f"{(participation - class_participation):.1f}%"
+                        )
+            else:
+                st.info("No attendance records found for this child")
+        except Exception as e:
+            st.error(f"Error displaying attendance records: {str(e)}")
+        else:
+            st.warning("No children found matching the selected criteria!")
+    else:
+        st.warning("No children registered yet!")
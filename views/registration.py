@@ -0,0 +1,68 @@
+import streamlit as st
+from datetime import date
+from database import save_child, clear_cache
+
+# Datasets this page needs; the router in app.py loads only these
+DATA = ("children",)
+
+def render(children_df):
+    """Registration form for new children"""
+    st.title("📋 Register or Update Child Record")
+    
+    existing_names = children_df["full_name"].tolist() if not children_df.empty else []
+
+    st.markdown("### ✍️ New or Incomplete Registration")
+
+    with st.form("child_form"):
+        full_name = st.text_input("Full Name")
+        class_group = st.selectbox("Group/Class", [
+            "Chosen Generation(grade PP1–PP2)",
+            "Chosen Nation(grade 1–3)",
+            "Priesthood (grade 4–6)",
+            "Preisthood 2(grade 7–12)",
+            "Priesthood 2(form 1–4)"
+        ])
+        
+        gender = st.selectbox("Gender", ["", "Male", "Female"])
+        dob = st.date_input("Date of Birth", value=date.today(), max_value=date.today())
+        school = st.text_input("School Name")
+        grade = st.selectbox("Grade / Form", [""] + [
+            "PP1", "PP2", "Grade 1", "Grade 2", "Grade 3", "Grade 4", "Grade 5", "Grade 6",
+            "Grade 7", "Grade 8", "Grade 9", "Grade 10", "Grade 11", "Grade 12",
+            "Form 1", "Form 2", "Form 3", "Form 4"
+        ])
+        residence = st.text_input("Where do they live?")
+        parent1 = st.text_input("Parent/Guardian 1 Name")
+        contact1 = st.text_input("Contact for Parent 1")
+        parent2 = st.text_input("Parent/Guardian 2 Name (optional)")
+        contact2 = st.text_input("Contact for Parent 2")
+        sponsored = st.checkbox("Sponsored by OCM")
+
+        submitted = st.form_submit_button("💾 Save")
+
+    if submitted and full_name:
+        try:
+            # Prepare new record
+            new_record = {
+                "full_name": full_name,
+                "gender": gender,
+                "date_of_birth": dob.isoformat(),
+                "school": school,
+                "grade": grade,
+                "class_group": class_group,
+                "residence": residence,
+                "parent1_name": parent1,
+                "parent1_contact": contact1,
+                "parent2_name": parent2,
+                "parent2_contact": contact2,
+                "sponsored": sponsored
+            }
+            
+            # Save to Supabase
+            if save_child(new_record):
+                st.success(f"✅ {'Updated' if full_name in existing_names else 'Added'} record for {full_name}")
+                # Clear cache to refresh data
+                clear_cache('children')
+                
+        except Exception as e:
+            st.error(f"Error saving record: {str(e)}")
@@ -0,0 +1,384 @@
+import streamlit as st
+from datetime import datetime, date
+from concurrent.futures import wait
+from reports import (
+    sunday_report,
+    sunday_report_from_summary,
+    monthly_report,
+    monthly_report_from_summary,
+    monthly_class_details,
+    monthly_class_details_from_tallies,
+    monthly_ocm_details,
+    monthly_ocm_details_from_tallies,
+    monthly_child_tallies,
+    program_params,
+    sunday_class_details,
+    sunday_ocm_details
+)
+from database import (
+    call_report_function,
+    load_attendance_on,
+    load_attendance,
+    load_attendance_between,
+    is_archived,
+    archived_years,
+    load_calendar,
+    data_version,
+    get_supabase_client
+)
+from exports import exporter, report_files, sunday_sheets, monthly_sheets, MIME_TYPES
+from views.paging import paged_dataframe, opened
+import metrics
+
+# Seconds to wait for export files before leaving them to finish in the background
+EXPORT_WAIT_SECONDS = 10
+
+# Datasets this page needs; the router in app.py loads only these. Reports are
+# aggregated by database functions, and the attendance table is only loaded
+# when those are not installed.
+DATA = ("children",)
+
+def export_section(report_type, period, build_sheets):
+    """Download buttons for the report as Excel and PDF, built in the background and cached per data version"""
+    st.markdown("### 📥 Export")
+    state_key = f"export_{report_type}"
+    if st.button("Prepare Excel and PDF files", key=f"{state_key}_button"):
+        st.session_state[state_key] = period
+    # Requested for this period; a change in the data only rebuilds the files
+    if st.session_state.get(state_key) != period:
+        return
+
+    title = f"{report_type} - {period}"
+    future = exporter.request((report_type, period, data_version()), lambda: report_files(title, build_sheets()))
+    if not future.done():
+        with st.spinner("Preparing export files..."):
+            wait([future], timeout=EXPORT_WAIT_SECONDS)
+    if not future.done():
+        st.info("Still preparing the files; they keep building in the background")
+        st.button("Check again", key=f"{state_key}_check")
+        return
+
+    try:
+        files = future.result()
+    except Exception as e:
+        st.error(f"Error exporting report: {str(e)}")
+        return
+
+    file_name = f"{report_type.lower().replace(' ', '_')}_{period}"
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ Excel", files['xlsx'], file_name=f"{file_name}.xlsx", mime=MIME_TYPES['xlsx'])
+    with col2:
+        st.download_button("⬇️ PDF summary", files['pdf'], file_name=f"{file_name}.pdf", mime=MIME_TYPES['pdf'])
+
+def render(children_df):
+    """Sunday and Monthly attendance reports"""
+    st.title("📊 Sunday Attendance Reports")
+    
+    if not children_df.empty:
+        report_type = st.selectbox(
+            "Select Report Type",
+            ["Sunday Attendance", "Weekly Summary", "Monthly Summary"]
+        )
+        report_span = metrics.begin(f"report.{report_type}")
+        
+        if report_type == "Sunday Attendance":
+            selected_date = st.date_input("Select Sunday Date", date.today())
+            # Archived days are no longer in the database; report on the archived rows
+            archived = is_archived(selected_date.isoformat())
+            summary = None if archived else call_report_function('sunday_summary', p_date=selected_date.isoformat())
+            if summary is not None:
+                daily_attendance = load_attendance_on(selected_date.isoformat())
+                report = sunday_report_from_summary(summary, children_df, daily_attendance)
+            elif archived:
+                report = sunday_report(children_df, load_attendance_on(selected_date.isoformat()), selected_date)
+            else:
+                report = sunday_report(children_df, load_attendance(), selected_date)
+            
+            # Display overall statistics
+            st.markdown("### 📈 Overall Attendance")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Children", report['total_children'])
+            with col2:
+                st.metric("Present", report['total_present'])
+            with col3:
+                st.metric("Absent", report['total_absent'])
+            
+            if report['participation'] is not None:
+                st.markdown("### 📚 Overall Participation")
+                counts = report['participation']
+                total_present = report['total_present']
+                
+                col1, col2, col3, col4, col5 = st.columns(5)
+                with col1:
+                    st.metric("Early Arrival", f"{counts['early']} ({(counts['early']/total_present*100):.1f}%)")
+                with col2:
+                    st.metric("With Books", f"{counts['has_book']} ({(counts['has_book']/total_present*100):.1f}%)")
+                with col3:
+                    st.metric("With Pens", f"{counts['has_pen']} ({(counts['has_pen']/total_present*100):.1f}%)")
+                with col4:
+                    st.metric("With Bibles", f"{counts['has_bible']} ({(counts['has_bible']/total_present*100):.1f}%)")
+                with col5:
+                    st.metric("With Offering", f"{counts['gave_offering']} ({(counts['gave_offering']/total_present*100):.1f}%)")
+            
+            # Class-wise Statistics
+            st.markdown("### 📊 Class-wise Attendance")
+            for section in report['classes']:
+                st.markdown(f"#### {section['name']}")
+                class_present = section['present']
+                
+                # Basic attendance metrics
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total", section['total'])
+                with col2:
+                    st.metric("Present", class_present)
+                with col3:
+                    st.metric("Absent", section['absent'])
+                
+                # Detailed participation metrics for this class
+                if class_present > 0:
+                    counts = section['participation']
+                    
+                    st.markdown("**Class Participation:**")
+                    col1, col2, col3, col4, col5 = st.columns(5)
+                    with col1:
+                        st.metric("Early", f"{counts['early']} ({(counts['early']/class_present*100):.1f}%)")
+                    with col2:
+                        st.metric("Books", f"{counts['has_book']} ({(counts['has_book']/class_present*100):.1f}%)")
+                    with col3:
+                        st.metric("Pens", f"{counts['has_pen']} ({(counts['has_pen']/class_present*100):.1f}%)")
+                    with col4:
+                        st.metric("Bibles", f"{counts['has_bible']} ({(counts['has_bible']/class_present*100):.1f}%)")
+                    with col5:
+                        st.metric("Offering", f"{counts['gave_offering']} ({(counts['gave_offering']/class_present*100):.1f}%)")
+                    
+                # Name lists are computed only for the classes opened
+                if opened(f"Show {section['name']} children", key=f"sunday_class_{section['name']}"):
+                    present_details, absent_children = sunday_class_details(
+                        report['children'], report['daily_attendance'], section['name']
+                    )
+                    if class_present > 0:
+                        st.markdown("**Present Children Details:**")
+                        if present_details is not None:
+                            paged_dataframe(present_details, f"sunday_present_{section['name']}", use_container_width=True)
+                        else:
+                            st.warning("No display columns available in the data")
+                    
+                    # Show absent children in this class
+                    if absent_children is not None:
+                        st.markdown("**Absent Children:**")
+                        paged_dataframe(absent_children, f"sunday_absent_{section['name']}")
+                
+                st.markdown("---")  # Add a separator between classes
+            
+            # OCM Children Statistics
+            st.markdown("### 👥 OCM Children Attendance")
+            ocm = report['ocm']
+            if ocm is not None:
+                ocm_present = ocm['present']
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Total OCM Children", ocm['total'])
+                with col2:
+                    st.metric("Present", ocm_present)
+                with col3:
+                    st.metric("Absent", ocm['absent'])
+                
+                if ocm_present > 0:
+                    counts = ocm['participation']
+                    
+                    st.markdown("**OCM Children Participation:**")
+                    col1, col2, col3, col4, col5 = st.columns(5)
+                    with col1:
+                        st.metric("Early", f"{counts['early']} ({(counts['early']/ocm_present*100):.1f}%)")
+                    with col2:
+                        st.metric("Books", f"{counts['has_book']} ({(counts['has_book']/ocm_present*100):.1f}%)")
+                    with col3:
+                        st.metric("Pens", f"{counts['has_pen']} ({(counts['has_pen']/ocm_present*100):.1f}%)")
+                    with col4:
+                        st.metric("Bibles", f"{counts['has_bible']} ({(counts['has_bible']/ocm_present*100):.1f}%)")
+                    with col5:
+                        st.metric("Offering", f"{counts['gave_offering']} ({(counts['gave_offering']/ocm_present*100):.1f}%)")
+                    
+                if opened("Show OCM children", key="sunday_ocm"):
+                    present_details, absent_children = sunday_ocm_details(report['children'], report['daily_attendance'])
+                    if present_details is not None:
+                        st.markdown("**Present OCM Children Details:**")
+                        paged_dataframe(present_details, "sunday_ocm_present")
+                    
+                    # Show absent OCM children
+                    if absent_children is not None:
+                        st.markdown("**Absent OCM Children:**")
+                        paged_dataframe(absent_children, "sunday_ocm_absent")
+            
+            export_section(
+                report_type, selected_date.isoformat(),
+                lambda: sunday_sheets(report, selected_date.isoformat())
+            )
+        elif report_type == "Monthly Summary":
+            st.markdown("### 📊 Monthly Attendance Overview")
+            
+            # Get current month and year
+            current_date = datetime.now()
+            selected_month = st.selectbox(
+                "Select Month",
+                range(1, 13),
+                index=current_date.month - 1
+            )
+            # Archived years stay selectable however old they are
+            years = list(range(min([current_date.year - 2] + archived_years()), current_date.year + 1))
+            selected_year = st.selectbox(
+                "Select Year",
+                years,
+                index=len(years) - 1
+            )
+            
+            calendar = load_calendar()
+            month_start = date(selected_year, selected_month, 1)
+            month_end = date(selected_year + selected_month // 12, selected_month % 12 + 1, 1)
+            archived = is_archived(month_start, month_end)
+            summary = None if archived else call_report_function(
+                'monthly_summary', p_year=selected_year, p_month=selected_month
+            )
+            if summary is not None:
+                report = monthly_report_from_summary(summary, selected_year, selected_month, calendar)
+            else:
+                attendance_df = load_attendance_between(month_start, month_end) if archived else load_attendance()
+                report = monthly_report(children_df, attendance_df, selected_year, selected_month, calendar)
+            
+            if report is not None:
+                total_sessions = report['total_sessions']
+                
+                # Display overall statistics
+                st.markdown("#### 📈 Overall Statistics")
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Sessions", total_sessions)
+                with col2:
+                    st.metric("Total Children", report['total_children'])
+                with col3:
+                    st.metric("Avg. Attendance", f"{report['avg_attendance']:.1f}")
+                with col4:
+                    st.metric("Attendance Rate", f"{report['attendance_rate']:.1f}%")
+                
+                # Participation Trends
+                st.markdown("#### 📊 Monthly Participation Trends")
+                trends_df = report['trends_df']
+                st.line_chart(trends_df.set_index('Date')[['Present', 'Early', 'Books', 'Pens', 'Bibles', 'Offering']])
+                
+                # Class-wise Monthly Statistics
+                st.markdown("#### 📚 Class-wise Monthly Statistics")
+                
+                for section in report['classes']:
+                    st.markdown(f"**{section['name']}**")
+                    
+                    if section['attended'] > 0:
+                        # Display class metrics
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("Total Children", section['total'])
+                        with col2:
+                            st.metric("Avg. Attendance", f"{section['avg_attendance']:.1f}")
+                        with col3:
+                            st.metric("Attendance Rate", f"{section['attendance_rate']:.1f}%")
+                        
+                        # Display participation metrics
+                        rates = section['participation']
+                        col1, col2, col3, col4, col5 = st.columns(5)
+                        with col1:
+                            st.metric("Early %", f"{rates['early']:.1f}%")
+                        with col2:
+                            st.metric("Books %", f"{rates['has_book']:.1f}%")
+                        with col3:
+                            st.metric("Pens %", f"{rates['has_pen']:.1f}%")
+                        with col4:
+                            st.metric("Bibles %", f"{rates['has_bible']:.1f}%")
+                        with col5:
+                            st.metric("Offering %", f"{rates['gave_offering']:.1f}%")
+                        
+                        # Show attendance details
+                        if opened("View Detailed Attendance", key=f"monthly_class_{section['name']}"):
+                            if summary is not None:
+                                tallies = call_report_function(
+                                    'monthly_child_tallies', p_year=selected_year, p_month=selected_month,
+                                    p_class_group=section['name'], **program_params()
+                                )
+                                details_df = monthly_class_details_from_tallies(tallies or [], total_sessions, calendar)
+                            else:
+                                details_df = monthly_class_details(
+                                    attendance_df, section['children'], section['attendance'], total_sessions, calendar
+                                )
+                            if details_df is not None:
+                                paged_dataframe(details_df, f"monthly_details_{section['name']}", use_container_width=True)
+                
+                # OCM Children Monthly Statistics
+                st.markdown("#### 👥 OCM Children Monthly Statistics")
+                ocm = report['ocm']
+                
+                if ocm is not None:
+                    if ocm['attended'] > 0:
+                        # Display OCM metrics
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("Total OCM Children", ocm['total'])
+                        with col2:
+                            st.metric("Avg. Attendance", f"{ocm['avg_attendance']:.1f}")
+                        with col3:
+                            st.metric("Attendance Rate", f"{ocm['attendance_rate']:.1f}%")
+                        
+                        # Display participation metrics
+                        rates = ocm['participation']
+                        col1, col2, col3, col4, col5 = st.columns(5)
+                        with col1:
+                            st.metric("Early %", f"{rates['early']:.1f}%")
+                        with col2:
+                            st.metric("Books %", f"{rates['has_book']:.1f}%")
+                        with col3:
+                            st.metric("Pens %", f"{rates['has_pen']:.1f}%")
+                        with col4:
+                            st.metric("Bibles %", f"{rates['has_bible']:.1f}%")
+                        with col5:
+                            st.metric("Offering %", f"{rates['gave_offering']:.1f}%")
+                        
+                        # Show OCM attendance details
+                        if opened("View Detailed OCM Attendance", key="monthly_ocm"):
+                            if summary is not None:
+                                tallies = call_report_function(
+                                    'monthly_child_tallies', p_year=selected_year, p_month=selected_month,
+                                    p_sponsored=True, **program_params()
+                                )
+                                ocm_counts = monthly_ocm_details_from_tallies(tallies or [], total_sessions)
+                            else:
+                                ocm_counts = monthly_ocm_details(ocm['children'], ocm['attendance'], total_sessions)
+                            paged_dataframe(ocm_counts, "monthly_ocm_details", use_container_width=True)
+                else:
+                    st.info("No OCM sponsored children registered")
+                
+                period = f"{selected_year}-{selected_month:02d}"
+                if summary is not None:
+                    # Resolve the client here; the export worker has no Streamlit context
+                    supabase = get_supabase_client()
+                    
+                    def build_sheets():
+                        tallies = call_report_function(
+                            'monthly_child_tallies', supabase, p_year=selected_year, p_month=selected_month,
+                            **program_params()
+                        )
+                        ocm_tallies = call_report_function(
+                            'monthly_child_tallies', supabase, p_year=selected_year, p_month=selected_month,
+                            p_sponsored=True, **program_params()
+                        )
+                        return monthly_sheets(report, period, tallies, ocm_tallies, calendar)
+                else:
+                    def build_sheets():
+                        tallies = monthly_child_tallies(children_df, attendance_df, selected_year, selected_month)
+                        return monthly_sheets(report, period, tallies, [t for t in tallies if t['sponsored']], calendar)
+                export_section(report_type, period, build_sheets)
+            else:
+                st.info(f"No attendance records found for {datetime(selected_year, selected_month, 1).strftime('%B %Y')}")
+        report_span.end()
+    else:
+        st.warning("No attendance data available yet!")
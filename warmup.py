@@ -0,0 +1,182 @@
+import threading
+import time
+from datetime import date, datetime
+
+import datastore
+from metrics import track
+from reports import (
+    sunday_report,
+    sunday_report_from_summary,
+    monthly_report,
+    monthly_report_from_summary,
+    program_params
+)
+
+# Recent warm-up runs kept for the admin panel
+MAX_RUNS = 20
+
+# Seconds into a new data version before warming it, so the clock has surely moved on
+VERSION_MARGIN = 0.5
+
+
+def _sunday_report(day):
+    """The Sunday report as the Reports page first opens it"""
+    summary = datastore.call_report_function('sunday_summary', p_date=day.isoformat())
+    children_df = datastore.load_children()
+    if summary is not None:
+        return sunday_report_from_summary(summary, children_df, datastore.load_attendance_on(day.isoformat()))
+    return sunday_report(children_df, datastore.load_attendance(), day)
+
+
+def _monthly_report(day):
+    """The Monthly Summary as the Reports page first opens it"""
+    calendar = datastore.load_calendar()
+    summary = datastore.call_report_function('monthly_summary', p_year=day.year, p_month=day.month)
+    if summary is not None:
+        return monthly_report_from_summary(summary, day.year, day.month, calendar)
+    return monthly_report(datastore.load_children(), datastore.load_attendance(), day.year, day.month, calendar)
+
+
+def warm_steps(day=None):
+    """(name, callable) pairs that fill the shared caches, in order
+
+    Loads the tables, builds the frames, indexes and rollups derived from
+    them, and computes the reports the Reports page opens with, so they are
+    memoized for the current data version.
+    """
+    day = day or date.today()
+    return [
+        ("tables", lambda: datastore.load_tables("children", "attendance")),
+        ("sessions calendar", datastore.load_calendar),
+        ("rollup cube", datastore.load_rollup),
+        ("absence tracker", datastore.load_absence_tracker),
+        ("sunday report", lambda: _sunday_report(day)),
+        ("monthly report", lambda: _monthly_report(day)),
+        ("monthly_child_tallies", lambda: datastore.call_report_function(
+            'monthly_child_tallies', p_year=day.year, p_month=day.month, **program_params())),
+    ]
+
+
+class Warmup:
+    """Runs the warm-up steps in a background thread, once per process or every refresh_seconds
+
+    Sessions never wait for it: a page that needs a table being fetched
+    joins that fetch in the table cache. Step timings are kept for the
+    admin panel and recorded as warmup.* spans.
+    """
+
+    def __init__(self):
+        self.state = "idle"
+        self.runs = []
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, refresh_seconds=0, steps=warm_steps):
+        """Start warming unless already started; returns whether this call started it
+
+        refresh_seconds is the pause between runs (0 for a single run), or a
+        function returning it after each run.
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.state = "running"
+            self._thread = threading.Thread(
+                target=self._run, args=(refresh_seconds, steps), name="cache-warmup", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        """Wait for the first run to finish; returns whether it did"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if any(run["finished"] is not None for run in self.runs):
+                    return True
+                thread = self._thread
+            if thread is None or not thread.is_alive():
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def _run(self, refresh_seconds, steps):
+        while True:
+            self.run_once(steps())
+            delay = refresh_seconds() if callable(refresh_seconds) else refresh_seconds
+            if not delay or self._stop.wait(delay):
+                return
+
+    def run_once(self, steps):
+        """Run each step, carrying on past failures; returns the run record"""
+        run = {"started": datetime.now().isoformat(timespec="seconds"), "finished": None,
+               "seconds": None, "steps": []}
+        with self._lock:
+            self.state = "running"
+            self.runs.append(run)
+            del self.runs[:-MAX_RUNS]
+        start = time.perf_counter()
+        for name, func in steps:
+            step_start = time.perf_counter()
+            error = None
+            try:
+                with track(f"warmup.{name}"):
+                    func()
+            except Exception as e:
+                error = str(e)
+            with self._lock:
+                run["steps"].append({
+                    "step": name,
+                    "seconds": round(time.perf_counter() - step_start, 3),
+                    "error": error,
+                })
+        with self._lock:
+            run["finished"] = datetime.now().isoformat(timespec="seconds")
+            run["seconds"] = round(time.perf_counter() - start, 3)
+            self.state = "failed" if any(step["error"] for step in run["steps"]) else "done"
+        return run
+
+    def stats(self):
+        """State and the latest run, for the admin panel"""
+        with self._lock:
+            last = self.runs[-1] if self.runs else None
+            return {
+                "state": self.state,
+                "runs": len(self.runs),
+                "started": last and last["started"],
+                "seconds": last and last["seconds"],
+                "steps": [dict(step) for step in last["steps"]] if last else [],
+            }
+
+
+# One warm-up per process, shared by every session
+warmer = Warmup()
+
+
+def until_next_version():
+    """Seconds until just after the data version next changes with the clock
+
+    Without a live feed, results memoized for one version are dropped when
+    the next begins; warming again then keeps them warm. With a feed, only
+    changes start a new version, and the warm-up looks again every CACHE_TTL.
+    """
+    seconds = datastore.seconds_to_next_version()
+    return datastore.CACHE_TTL if seconds is None else seconds + VERSION_MARGIN
+
+
+def start(config=None):
+    """Start the process's warm-up as set in the [warmup] config section
+
+    Called when the server starts (serve.py) and again by every session
+    before login; only the first call does anything. Unless refresh_seconds
+    is set, it warms again with each new data version.
+    """
+    config = datastore.get_config("warmup") if config is None else config
+    if not config.get("enabled", True):
+        return False
+    return warmer.start(refresh_seconds=config.get("refresh_seconds", until_next_version))